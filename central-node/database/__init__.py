@@ -1,3 +1,5 @@
 from .db_handler import Database
+from .blob_store import LocalBlobStore, GridFSBlobStore
+from .spool import DiskSpool, SpoolReplayer
 
-__all__ = ['Database']
+__all__ = ['Database', 'LocalBlobStore', 'GridFSBlobStore', 'DiskSpool', 'SpoolReplayer']
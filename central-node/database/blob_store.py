@@ -0,0 +1,105 @@
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger("central-node")
+
+
+def content_key(data: bytes) -> str:
+    """Alamat konten: sha256 dari payload"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class LocalBlobStore:
+    """Blob store content-addressed di filesystem lokal (root/ab/cd/<sha256>).
+
+    mtime blob = waktu terakhir dirujuk dokumen (di-refresh saat konten sama
+    disimpan ulang), sehingga prune() bisa membuang blob yang semua dokumennya
+    sudah kedaluwarsa oleh TTL sensor_stream.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    def put(self, data: bytes) -> str:
+        key = content_key(data)
+        path = self._path(key)
+        # Konten identik cukup disimpan sekali
+        try:
+            os.utime(path)
+            return key
+        except FileNotFoundError:
+            pass
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        # Nama temp unik per panggilan: beberapa writer thread bisa menyimpan blob yang sama bersamaan
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=f"{key}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        return key
+
+    def get(self, key: str) -> bytes:
+        with open(self._path(key), "rb") as f:
+            return f.read()
+
+    def prune(self, max_age_s: float) -> int:
+        """Hapus blob yang tidak dirujuk lebih dari `max_age_s` detik; return jumlah yang dihapus"""
+        cutoff = time.time() - max_age_s
+        removed = 0
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                path = os.path.join(directory, name)
+                try:
+                    if os.stat(path).st_mtime < cutoff:
+                        os.remove(path)
+                        removed += 1
+                except FileNotFoundError:
+                    continue
+        return removed
+
+
+class GridFSBlobStore:
+    """Blob store content-addressed di GridFS (_id = sha256)"""
+
+    def __init__(self, db, bucket_name: str = "payloads"):
+        import gridfs
+
+        self.bucket = gridfs.GridFSBucket(db, bucket_name=bucket_name)
+        self.files = db[f"{bucket_name}.files"]
+
+    def put(self, data: bytes) -> str:
+        key = content_key(data)
+        # uploadDate = waktu terakhir dirujuk (dasar prune), sama seperti mtime di LocalBlobStore
+        if not self.files.update_one({"_id": key}, {"$currentDate": {"uploadDate": True}}).matched_count:
+            self.bucket.upload_from_stream_with_id(key, key, data)
+        return key
+
+    def get(self, key: str) -> bytes:
+        return self.bucket.open_download_stream(key).read()
+
+    def prune(self, max_age_s: float) -> int:
+        from gridfs.errors import NoFile
+
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=max_age_s)
+        removed = 0
+        for doc in self.files.find({"uploadDate": {"$lt": cutoff}}, {"_id": 1}):
+            try:
+                self.bucket.delete(doc["_id"])
+                removed += 1
+            except NoFile:
+                continue
+        return removed
@@ -1,10 +1,421 @@
 import os
+import queue
 import logging
-from pymongo import MongoClient
+import threading
+import time
+from pymongo import MongoClient, UpdateOne, ASCENDING
+from pymongo.errors import BulkWriteError, WriteError
 from datetime import datetime
 
+from .blob_store import LocalBlobStore, GridFSBlobStore
+from .schema import migrate
+from .spool import DiskSpool, SpoolReplayer
+
 logger = logging.getLogger("central-node")
 
+# Field rollup yang dijumlah antar flush (upsert pipeline)
+ROLLUP_SUMS = ("count", "bytes_sent", "bytes_original", "decompress_us", "latency_sum")
+ROLLUP_DERIVED = {
+    "ratio": {"$cond": [
+        {"$gt": ["$bytes_original", 0]}, {"$divide": ["$bytes_sent", "$bytes_original"]}, 1.0,
+    ]},
+    # Byte dihemat per ms CPU dekompresi server
+    "bytes_saved_per_cpu_ms": {"$cond": [
+        {"$gt": ["$decompress_us", 0]},
+        {"$divide": [{"$subtract": ["$bytes_original", "$bytes_sent"]}, {"$divide": ["$decompress_us", 1000]}]},
+        0.0,
+    ]},
+}
+
+
+class BatchWriter:
+    """Write-behind batcher: antrian terbatas antara gRPC receive dan Mongo (insert_many)
+
+    Kebijakan saat antrian penuh (overflow_policy):
+      drop_newest - tolak dokumen baru (default lama)
+      drop_oldest - buang dokumen tertua, data terbaru tetap masuk
+      block       - tunggu maks block_timeout (backpressure ke gRPC), lalu drop
+      sample      - di atas sample_watermark hanya 1 dari sample_every dokumen diterima
+      spool       - tumpahkan ke spool disk lokal, di-replay setelah Mongo mengejar
+
+    Dengan spool, dokumen juga dialihkan ke disk selama Mongo tidak tersedia
+    (insert gagal) sampai SpoolReplayer memastikan Mongo pulih.
+    """
+
+    POLICIES = ("drop_newest", "drop_oldest", "block", "sample", "spool")
+
+    def __init__(self, collection, batch_size: int = 500, flush_interval: float = 0.2, max_queue: int = 50000,
+                 blob_store=None, workers: int = 1, overflow_policy: str = "drop_newest",
+                 block_timeout: float = 1.0, sample_every: int = 10, sample_watermark: float = 0.8,
+                 spool: DiskSpool = None, available: bool = True):
+        if overflow_policy not in self.POLICIES:
+            raise ValueError(f"overflow policy tidak dikenal: {overflow_policy}")
+        if overflow_policy == "spool" and spool is None:
+            raise ValueError("overflow policy spool butuh spool disk (SPOOL_DIR)")
+        self.collection = collection
+        self.blob_store = blob_store
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.workers = max(1, workers)
+        self.policy = overflow_policy
+        self.block_timeout = block_timeout
+        self.sample_every = max(1, sample_every)
+        self.sample_threshold = int(max_queue * sample_watermark)
+        self.spool = spool
+        # False = Mongo dianggap down: dokumen langsung ke spool tanpa menunggu timeout insert
+        self.available = available
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        # Antrian ke thread spool (offload_spool): tulis disk tidak di thread pemanggil
+        self._spool_queue = None
+        self._stop = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._sample_seq = 0
+
+        # Counter untuk tuning
+        self.batches = 0
+        self.docs_written = 0
+        self.docs_failed = 0
+        self.docs_dropped = 0
+        self.max_batch = 0
+        # Histogram ukuran batch (bucket pangkat 2: 1, 2, 4, ... batch_size)
+        self.batch_size_hist = {}
+        # Counter overflow & stall storage (dipisah dari metrik jaringan)
+        self.docs_dropped_oldest = 0
+        self.docs_sampled_out = 0
+        self.blocked = 0
+        self.blocked_ms_total = 0.0
+        self.queue_high_watermark = 0
+        self.flush_ms_total = 0.0
+        self.flush_ms_max = 0.0
+        self.docs_spooled = 0
+        self.docs_replayed = 0
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"mongo-batch-writer-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _count(self, attr: str, n=1):
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + n)
+
+    def set_available(self, available: bool):
+        if available != self.available:
+            if not self.spool:
+                if available:
+                    logger.info("✅ MongoDB siap, antrian writer mulai di-flush")
+            elif available:
+                logger.info("✅ MongoDB pulih, replay spool dimulai")
+            else:
+                logger.warning("⚠️ MongoDB tidak tersedia, dokumen dialihkan ke spool disk")
+        self.available = available
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def _spool(self, docs: list) -> int:
+        accepted = self.spool.append_many(docs)
+        with self._lock:
+            self.docs_spooled += accepted
+            self.docs_dropped += len(docs) - accepted
+        return accepted
+
+    def offload_spool(self):
+        """Tulis spool dari submit() lewat thread sendiri (server aio: mmap + msync tidak di event loop)"""
+        if not self.spool or self._spool_queue is not None:
+            return
+        self._spool_queue = queue.Queue(maxsize=self.max_queue)
+        thread = threading.Thread(target=self._run_spool, name="mongo-spool-writer", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _run_spool(self):
+        while not (self._stop.is_set() and self._spool_queue.empty()):
+            try:
+                docs = [self._spool_queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            # Ambil sekaligus yang sudah antre: satu msync per batch, bukan per dokumen
+            while len(docs) < self.batch_size:
+                try:
+                    docs.append(self._spool_queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._spool(docs)
+
+    def _spool_doc(self, doc: dict) -> bool:
+        if self._spool_queue is None:
+            return self._spool([doc]) == 1
+        try:
+            self._spool_queue.put_nowait(doc)
+            return True
+        except queue.Full:
+            self._count("docs_dropped")
+            return False
+
+    def submit(self, doc: dict) -> bool:
+        """Masukkan dokumen ke antrian sesuai overflow policy. False jika dokumen tidak diterima."""
+        if self.spool and not self.available:
+            return self._spool_doc(doc)
+
+        if self.policy == "sample" and self._queue.qsize() >= self.sample_threshold:
+            # Di atas watermark: simpan 1 dari N, sisanya dibuang dengan sengaja
+            with self._lock:
+                self._sample_seq += 1
+                keep = self._sample_seq % self.sample_every == 0
+                if not keep:
+                    self.docs_sampled_out += 1
+            if not keep:
+                return False
+
+        try:
+            self._queue.put_nowait(doc)
+        except queue.Full:
+            if not self._overflow(doc):
+                return False
+
+        depth = self._queue.qsize()
+        if depth > self.queue_high_watermark:
+            self.queue_high_watermark = depth
+        return True
+
+    def _overflow(self, doc: dict) -> bool:
+        if self.policy == "spool":
+            # Mongo lebih lambat dari laju ingest: kelebihan ke disk, bukan dibuang
+            return self._spool_doc(doc)
+
+        if self.policy == "drop_oldest":
+            while True:
+                try:
+                    self._queue.get_nowait()
+                    self._count("docs_dropped_oldest")
+                except queue.Empty:
+                    pass
+                try:
+                    self._queue.put_nowait(doc)
+                    return True
+                except queue.Full:
+                    continue
+
+        if self.policy == "block":
+            # Backpressure: thread gRPC ikut menunggu storage (sampai batas waktu)
+            start = time.monotonic()
+            try:
+                self._queue.put(doc, timeout=self.block_timeout)
+                accepted = True
+            except queue.Full:
+                accepted = False
+            waited_ms = (time.monotonic() - start) * 1000
+            with self._lock:
+                self.blocked += 1
+                self.blocked_ms_total += waited_ms
+                if not accepted:
+                    self.docs_dropped += 1
+            return accepted
+
+        # drop_newest / sample yang tetap penuh
+        self._count("docs_dropped")
+        return False
+
+    def _run(self):
+        batch = []
+        deadline = None
+
+        while not (self._stop.is_set() and self._queue.empty()):
+            if not self.available and not self.spool:
+                # Mongo belum siap saat startup (tanpa spool): dokumen ditahan di antrian,
+                # overflow policy tetap berlaku kalau antrian penuh
+                if self._stop.wait(self.flush_interval):
+                    break
+                continue
+
+            timeout = self.flush_interval if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                doc = self._queue.get(timeout=timeout)
+                if not batch:
+                    deadline = time.monotonic() + self.flush_interval
+                batch.append(doc)
+            except queue.Empty:
+                pass
+
+            # Flush jika batch penuh atau waktu habis (mana yang duluan)
+            if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self._flush(batch)
+                batch = []
+                deadline = None
+
+        if batch:
+            self._flush(batch)
+
+    def _store_payloads(self, batch: list):
+        # Payload ke blob store, dokumen time-series cukup simpan referensinya
+        for doc in batch:
+            payload = doc.pop("_payload", None)
+            if payload is None:
+                continue
+            try:
+                doc["payload_ref"] = self.blob_store.put(payload)
+            except Exception as exc:
+                logger.error(f"❌ Gagal simpan payload ke blob store: {exc}")
+
+    def _flush(self, batch: list):
+        n = len(batch)
+        if self.spool and not self.available:
+            self._spool(batch)
+            return
+
+        start = time.monotonic()
+        if self.blob_store:
+            self._store_payloads(batch)
+        try:
+            self.collection.insert_many(batch, ordered=False)
+            written = n
+        except BulkWriteError as exc:
+            written = exc.details.get("nInserted", 0)
+            logger.error(f"❌ Batch insert sebagian gagal: {n - written}/{n} dokumen")
+        except Exception as exc:
+            if self.spool:
+                # Batch tidak hilang: ke spool, replayer yang mencoba ulang
+                self.set_available(False)
+                logger.error(f"❌ Gagal batch insert Mongo ({n} dokumen), dialihkan ke spool: {exc}")
+                self._spool(batch)
+                return
+            written = 0
+            logger.error(f"❌ Gagal batch insert Mongo ({n} dokumen): {exc}")
+
+        flush_ms = (time.monotonic() - start) * 1000
+        bucket = 1 << (n - 1).bit_length()
+        with self._lock:
+            self.flush_ms_total += flush_ms
+            self.flush_ms_max = max(self.flush_ms_max, flush_ms)
+            self.batches += 1
+            self.docs_written += written
+            self.docs_failed += n - written
+            self.max_batch = max(self.max_batch, n)
+            self.batch_size_hist[bucket] = self.batch_size_hist.get(bucket, 0) + 1
+
+    def insert_now(self, docs: list) -> bool:
+        """Insert sinkron untuk replay spool; False (dan tandai Mongo down) jika gagal"""
+        if self.blob_store:
+            self._store_payloads(docs)
+        try:
+            self.collection.insert_many(docs, ordered=False)
+            written = len(docs)
+        except BulkWriteError as exc:
+            # Error per dokumen (mis. duplikat _id dari replay ulang) tidak akan sembuh dengan retry
+            written = exc.details.get("nInserted", 0)
+        except Exception as exc:
+            logger.error(f"❌ Replay spool gagal ({len(docs)} dokumen): {exc}")
+            self.set_available(False)
+            return False
+        with self._lock:
+            self.docs_replayed += written
+            self.docs_failed += len(docs) - written
+        return True
+
+    def stats(self) -> dict:
+        spool = {f"spool_{k}": v for k, v in self.spool.stats().items()} if self.spool else {}
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "docs_written": self.docs_written,
+                "docs_failed": self.docs_failed,
+                "docs_dropped": self.docs_dropped,
+                "avg_batch": (self.docs_written + self.docs_failed) / self.batches if self.batches else 0.0,
+                "max_batch": self.max_batch,
+                "batch_size_hist": dict(sorted(self.batch_size_hist.items())),
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self.max_queue,
+                "queue_high_watermark": self.queue_high_watermark,
+                "spool_queue_depth": self._spool_queue.qsize() if self._spool_queue is not None else 0,
+                "docs_dropped_oldest": self.docs_dropped_oldest,
+                "docs_sampled_out": self.docs_sampled_out,
+                "blocked": self.blocked,
+                "blocked_ms_total": self.blocked_ms_total,
+                "flush_ms_total": self.flush_ms_total,
+                "flush_ms_max": self.flush_ms_max,
+                "mongo_available": int(self.available),
+                "docs_spooled": self.docs_spooled,
+                "docs_replayed": self.docs_replayed,
+                **spool,
+            }
+
+    def stop(self, timeout: float = 10.0):
+        """Hentikan thread setelah semua dokumen di antrian di-flush"""
+        self._stop.set()
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+
+
+# Profil client Mongo: trade-off durabilitas vs throughput dipilih eksplisit (DB_PROFILE)
+PROFILES = {
+    # Default pymongo (w=1, tanpa kompresi wire)
+    "default": {},
+    # Ingest cepat: ack primary tanpa menunggu journal, wire terkompresi, timeout pendek
+    "fast": {
+        "w": 1, "journal": False, "compressors": "zstd,zlib", "retryWrites": False,
+        "maxPoolSize": 16, "socketTimeoutMS": 5000, "waitQueueTimeoutMS": 2000,
+    },
+    # Aman: majority + journal, retry otomatis, wtimeout supaya replikasi lambat tidak menggantung
+    "safe": {
+        "w": "majority", "journal": True, "wTimeoutMS": 10000, "retryWrites": True, "retryReads": True,
+        "compressors": "zstd,zlib", "maxPoolSize": 32, "socketTimeoutMS": 30000,
+    },
+}
+
+# Override per opsi: env -> (nama opsi MongoClient, konversi)
+CLIENT_ENV = {
+    "DB_MAX_POOL_SIZE": ("maxPoolSize", int),
+    "DB_MIN_POOL_SIZE": ("minPoolSize", int),
+    "DB_MAX_IDLE_MS": ("maxIdleTimeMS", int),
+    "DB_WAIT_QUEUE_TIMEOUT_MS": ("waitQueueTimeoutMS", int),
+    "DB_CONNECT_TIMEOUT_MS": ("connectTimeoutMS", int),
+    "DB_SOCKET_TIMEOUT_MS": ("socketTimeoutMS", int),
+    "DB_SERVER_SELECTION_TIMEOUT_MS": ("serverSelectionTimeoutMS", int),
+    "DB_WRITE_CONCERN_W": ("w", lambda v: int(v) if v.isdigit() else v),
+    "DB_JOURNAL": ("journal", lambda v: v.lower() in ("1", "true", "yes")),
+    "DB_WTIMEOUT_MS": ("wTimeoutMS", int),
+    "DB_COMPRESSORS": ("compressors", str),
+    "DB_RETRY_WRITES": ("retryWrites", lambda v: v.lower() in ("1", "true", "yes")),
+    "DB_RETRY_READS": ("retryReads", lambda v: v.lower() in ("1", "true", "yes")),
+}
+
+# Modul Python yang dibutuhkan tiap kompresor wire
+COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": "zlib"}
+
+
+def client_options(profile: str) -> dict:
+    """Opsi MongoClient dari profil + override env; kompresor yang modulnya tidak ada dibuang"""
+    if profile not in PROFILES:
+        logger.warning(f"⚠️ DB_PROFILE={profile} tidak dikenal, pakai default")
+        profile = "default"
+    options = dict(PROFILES[profile])
+    for env, (option, convert) in CLIENT_ENV.items():
+        value = os.getenv(env)
+        if value:
+            options[option] = convert(value)
+
+    if options.get("compressors"):
+        available = []
+        for name in options["compressors"].split(","):
+            name = name.strip()
+            try:
+                __import__(COMPRESSOR_MODULES.get(name, name))
+                available.append(name)
+            except ImportError:
+                logger.warning(f"⚠️ Kompresor wire {name} tidak tersedia (modul tidak terpasang), dilewati")
+        if available:
+            options["compressors"] = ",".join(available)
+        else:
+            options.pop("compressors")
+    return options
+
+
 class Database:
     """MongoDB database handler"""
 
@@ -12,64 +423,316 @@ class Database:
         self.client = None
         self.db = None
         self.collection = None
-        
+        self.rollups = None
+        self.totals = None
+        self.writer = None
+        self.spool = None
+        self.replayer = None
+        self._schema_ready = False
+        # Diset begitu Mongo terjangkau & skema siap (startup latar / pulih dari spool)
+        self.mongo_ready = threading.Event()
+        self._closing = threading.Event()
+        self._connector = None
+
         # Config
         self.host = os.getenv("DB_HOST", "mongodb")
         self.port = int(os.getenv("DB_PORT", "27017"))
         self.db_name = os.getenv("DB_NAME", "iot_data")
+        # Profil client: default | fast | safe (+ override DB_MAX_POOL_SIZE, DB_WRITE_CONCERN_W, dst.)
+        self.profile = os.getenv("DB_PROFILE", "default").lower()
+        self.client_options = client_options(self.profile)
         self.col_name = "sensor_stream"
+        self.rollup_col_name = "sensor_rollup"
+        self.totals_col_name = "ingest_totals"
+        self.dict_col_name = "zstd_dicts"
+
+        # Config batch writer
+        self.batch_size = int(os.getenv("DB_BATCH_SIZE", "500"))
+        self.batch_interval = float(os.getenv("DB_BATCH_INTERVAL_MS", "200")) / 1000
+        self.batch_queue = int(os.getenv("DB_BATCH_QUEUE", "50000"))
+        self.writer_workers = int(os.getenv("DB_WRITER_WORKERS", "1"))
+        # Overflow antrian: drop_newest | drop_oldest | block | sample
+        self.overflow_policy = os.getenv("DB_OVERFLOW_POLICY", "drop_newest").lower()
+        self.block_timeout = float(os.getenv("DB_BLOCK_TIMEOUT_MS", "1000")) / 1000
+        self.sample_every = int(os.getenv("DB_SAMPLE_EVERY", "10"))
+        self.sample_watermark = float(os.getenv("DB_SAMPLE_WATERMARK", "0.8"))
+
+        # Spool write-ahead saat Mongo down / lambat (kosong = nonaktif, startup gagal tanpa Mongo)
+        self.spool_dir = os.getenv("SPOOL_DIR", "/app/data/spool")
+        self.spool_max_bytes = int(float(os.getenv("SPOOL_MAX_MB", "512")) * (1 << 20))
+        self.spool_segment_bytes = int(float(os.getenv("SPOOL_SEGMENT_MB", "16")) * (1 << 20))
+        self.spool_fsync = float(os.getenv("SPOOL_FSYNC_MS", "200")) / 1000
+        self.spool_retry = float(os.getenv("SPOOL_RETRY_S", "2"))
+
+        # Retensi & bucket time-series (0 = tanpa TTL)
+        self.retention_s = int(float(os.getenv("DB_RETENTION_DAYS", "7")) * 86400)
+        self.rollup_retention_s = int(float(os.getenv("DB_ROLLUP_RETENTION_DAYS", "90")) * 86400)
+        # Granularity kosong = dipilih dari laju pesan per sensor (DB_EXPECTED_RATE_HZ)
+        self.ts_granularity = os.getenv("DB_TS_GRANULARITY", "").lower()
+        self.expected_rate = float(os.getenv("DB_EXPECTED_RATE_HZ", "10"))
+        # >0: bucketMaxSpanSeconds = bucketRoundingSeconds (MongoDB >= 6.3), menggantikan granularity
+        self.bucket_span = int(os.getenv("DB_TS_BUCKET_SPAN_S", "0"))
+
+        # Retensi payload: none (hanya metrik) | inline (field raw_data, legacy) | file | gridfs
+        self.payload_store = os.getenv("PAYLOAD_STORE", "none").lower()
+        self.payload_dir = os.getenv("PAYLOAD_DIR", "/app/data/blobs")
+        # Interval sweep blob yang sudah tidak dirujuk (umur > DB_RETENTION_DAYS); 0 = nonaktif
+        self.payload_sweep_s = float(os.getenv("PAYLOAD_SWEEP_S", "3600"))
+        # Kolom nilai sensor hasil parse (readings.<field>) yang di-index untuk query rentang
+        self.readings_index = [f for f in os.getenv("PAYLOAD_INDEX_FIELDS", "temp,vibration").split(",") if f]
+
+    def _ping(self):
+        self.client.admin.command("ping")
+
+    def ensure_schema(self):
+        """Buat / migrasi time-series, retensi TTL & index (sekali; ditunda jika Mongo belum ada)"""
+        if self._schema_ready:
+            return
+        try:
+            migrate(self)
+            self._schema_ready = True
+        except Exception as e:
+            logger.warning(f"⚠️ Migrasi skema Mongo gagal: {e}")
+
+    def _on_available(self):
+        # Mongo terjangkau: migrasi skema dulu, baru dokumen boleh masuk (koleksi time-series
+        # tidak boleh terbuat implisit sebagai koleksi biasa oleh insert pertama)
+        self.ensure_schema()
+        if not self.mongo_ready.is_set():
+            logger.info(f"✅ Terhubung ke MongoDB: {self.host}:{self.port}/{self.db_name}")
+        self.mongo_ready.set()
+
+    def _await_mongo(self):
+        """Thread startup tanpa spool: ping dengan backoff sampai Mongo siap, lalu buka antrian writer"""
+        delay = 0.5
+        while not self._closing.is_set():
+            try:
+                self._ping()
+            except Exception as exc:
+                logger.warning(f"⚠️ MongoDB belum tersedia ({exc}), coba lagi dalam {delay:.1f}s")
+                self._closing.wait(delay)
+                delay = min(delay * 2, 30.0)
+                continue
+            self._on_available()
+            self.writer.set_available(True)
+            return
+
+    def _sweep_blobs(self, blob_store):
+        """Blob store content-addressed tidak ikut TTL sensor_stream: buang blob yang lebih tua dari retensi"""
+        while not self._closing.wait(self.payload_sweep_s):
+            try:
+                removed = blob_store.prune(self.retention_s)
+            except Exception as exc:
+                logger.error(f"❌ Sweep blob payload gagal: {exc}")
+                continue
+            if removed:
+                logger.info(f"🧹 {removed} blob payload kedaluwarsa dihapus")
+
+    def accepting(self) -> bool:
+        """Siap menerima dokumen tanpa kehilangan: Mongo siap, atau ada spool disk sebagai penampung"""
+        return self.writer is not None and (self.spool is not None or self.mongo_ready.is_set())
+
+    def connect(self, wait: bool = True):
+        """Connect to MongoDB and prepare Time Series collection
 
-    def connect(self):
-        """Connect to MongoDB and prepare Time Series collection"""
+        wait=False: tidak ada I/O jaringan di sini (MongoClient connect di latar);
+        ping & migrasi skema dikerjakan SpoolReplayer (dengan spool) atau thread
+        mongo-connect (tanpa spool, dokumen ditahan di antrian writer sampai siap).
+        """
         try:
-            self.client = MongoClient(host=self.host, port=self.port)
+            self.client = MongoClient(host=self.host, port=self.port, **self.client_options)
             self.db = self.client[self.db_name]
-            
-            # Cek apakah collection sudah ada
-            curr_colls = self.db.list_collection_names()
-            
-            if self.col_name not in curr_colls:
-                # Buat Baru sebagai Time Series
-                try:
-                    self.db.create_collection(
-                        self.col_name,
-                        timeseries={
-                            "timeField": "timestamp_kirim", # Field penentu waktu
-                            "metaField": "sensor_id",       # Field metadata
-                            "granularity": "seconds"        # Data masuk tiap detik
-                        }
-                    )
-                    logger.info(f"✨ Membuat Time Series Collection: {self.col_name}")
-                except Exception as e:
-                    logger.warning(f"Info create collection: {e}")
-            
+
             self.collection = self.db[self.col_name]
+            self.rollups = self.db[self.rollup_col_name]
+            self.totals = self.db[self.totals_col_name]
 
-            # Ping cek koneksi
-            self.client.admin.command("ping")
-            logger.info(f"✅ Terhubung ke MongoDB: {self.host}:{self.port}/{self.db_name}")
+            # Ping cek koneksi; dengan spool, server tetap jalan dan menulis ke disk dulu
+            available = False
+            if wait:
+                try:
+                    self._ping()
+                    available = True
+                except Exception as exc:
+                    if not self.spool_dir:
+                        raise
+                    logger.warning(f"⚠️ MongoDB belum tersedia ({exc}), ingest ke spool {self.spool_dir}")
+
+            if available:
+                self._on_available()
+            logger.info(f"⚙️ Profil client Mongo: {self.profile} {self.client_options}")
+
+            if self.spool_dir:
+                self.spool = DiskSpool(
+                    self.spool_dir,
+                    max_bytes=self.spool_max_bytes,
+                    segment_bytes=self.spool_segment_bytes,
+                    fsync_interval=self.spool_fsync,
+                )
+
+            blob_store = None
+            if self.payload_store == "file":
+                blob_store = LocalBlobStore(self.payload_dir)
+            elif self.payload_store == "gridfs":
+                blob_store = GridFSBlobStore(self.db)
+            logger.info(f"🗃️ Penyimpanan payload: {self.payload_store}")
+            if blob_store and self.retention_s and self.payload_sweep_s > 0:
+                threading.Thread(
+                    target=self._sweep_blobs, args=(blob_store,), name="blob-sweeper", daemon=True
+                ).start()
+
+            self.writer = BatchWriter(
+                self.collection,
+                batch_size=self.batch_size,
+                flush_interval=self.batch_interval,
+                max_queue=self.batch_queue,
+                blob_store=blob_store,
+                workers=self.writer_workers,
+                overflow_policy=self.overflow_policy,
+                block_timeout=self.block_timeout,
+                sample_every=self.sample_every,
+                sample_watermark=self.sample_watermark,
+                spool=self.spool,
+                available=available,
+            )
+            self.writer.start()
+            logger.info(
+                f"📦 Batch writer: {self.writer_workers} worker, antrian {self.batch_queue}, overflow={self.overflow_policy}"
+            )
+
+            if self.spool:
+                self.replayer = SpoolReplayer(
+                    self.spool, self.writer, self._ping,
+                    batch_size=self.batch_size, interval=self.spool_retry, on_recover=self._on_available,
+                )
+                self.replayer.start()
+                logger.info(f"💾 Spool: {self.spool_dir} (maks {self.spool_max_bytes >> 20} MB)")
+            elif not available:
+                self._connector = threading.Thread(target=self._await_mongo, name="mongo-connect", daemon=True)
+                self._connector.start()
 
         except Exception as exc:
             logger.error(f"❌ Gagal koneksi MongoDB: {exc}")
             raise
 
-    def insert_sensor_data(self, data_dict: dict) -> bool:
-        """Insert data"""
+    @staticmethod
+    def _prepare(data_dict: dict) -> dict:
+        # Data dari gRPC masih float (unix timestamp), harus di-convert
+        if isinstance(data_dict.get("timestamp_kirim"), float):
+            data_dict["timestamp_kirim"] = datetime.fromtimestamp(data_dict["timestamp_kirim"])
+
+        # Tambah created_at server
+        data_dict["created_at"] = datetime.utcnow()
+        return data_dict
+
+    def enqueue_sensor_data(self, data_dict: dict, payload: bytes = None, payload_codec: str = None) -> bool:
+        """Antrikan data ke batch writer (non-blocking).
+
+        payload_codec: encoding payload yang disimpan jika berbeda dari compression_type
+        (reading batch disimpan sudah terdekompresi, compression_type tetap codec wire).
+        """
+        if payload is not None and self.payload_store != "none":
+            if payload_codec and payload_codec != data_dict.get("compression_type"):
+                data_dict["payload_codec"] = payload_codec
+            if self.payload_store == "inline":
+                data_dict["raw_data"] = payload
+            elif self.payload_store in ("file", "gridfs"):
+                # Ditulis ke blob store oleh writer thread
+                data_dict["_payload"] = payload
+        return self.writer.submit(self._prepare(data_dict))
+
+    def mongo_up(self) -> bool:
+        """Mongo siap dan writer tidak sedang menandai Mongo down (rollup dilewati tanpa menunggu timeout)"""
+        return self.mongo_ready.is_set() and (self.writer is None or self.writer.available)
+
+    def write_rollups(self, docs: list):
+        """Upsert rollup jendela (dipanggil thread rollup)"""
+        if not docs:
+            return
+        ops = []
+        for d in docs:
+            key = {k: d[k] for k in ("window", "ts", "sensor_id", "compression_type")}
+            # Persentil dari flush dengan sampel terbanyak: paket telat yang di-flush
+            # sendiri tidak menimpa kuantil jendela dengan estimasi satu sampel
+            larger = {"$gte": [d["count"], {"$ifNull": ["$latency_pct_count", 0]}]}
+            ops.append(UpdateOne(
+                key,
+                [
+                    # Paket telat untuk jendela yang sudah di-flush tetap terakumulasi
+                    {"$set": {
+                        **{k: {"$add": [{"$ifNull": [f"${k}", 0]}, d[k]]} for k in ROLLUP_SUMS},
+                        "latency_max": {"$max": ["$latency_max", d["latency_max"]]},
+                        **{k: {"$cond": [larger, d[k], f"${k}"]} for k in ("latency_p50", "latency_p95", "latency_p99")},
+                        "latency_pct_count": {"$max": [{"$ifNull": ["$latency_pct_count", 0]}, d["count"]]},
+                    }},
+                    # Rasio & efisiensi dihitung ulang dari jumlah kumulatif, bukan dari flush terakhir
+                    {"$set": ROLLUP_DERIVED},
+                ],
+                upsert=True,
+            ))
         try:
-            # Data dari gRPC masih float (unix timestamp), harus di-convert
-            if isinstance(data_dict.get("timestamp_kirim"), float):
-                data_dict["timestamp_kirim"] = datetime.fromtimestamp(data_dict["timestamp_kirim"])
-            
-            # Tambah created_at server
-            data_dict["created_at"] = datetime.utcnow()
-            
-            self.collection.insert_one(data_dict)
-            return True
-        except Exception as exc:
-            logger.error(f"❌ Gagal insert Mongo: {exc}")
-            return False
+            self.rollups.bulk_write(ops, ordered=False)
+        except BulkWriteError as exc:
+            if not exc.details.get("writeErrors"):
+                raise
+            # Dokumen ditolak Mongo tidak akan sembuh dengan retry (yang lain sudah tertulis)
+            raise ValueError(f"{len(exc.details['writeErrors'])}/{len(ops)} rollup ditolak Mongo") from exc
+
+    def write_totals(self, totals: dict, feed: tuple = None):
+        """Increment running total ingest_totals (dipanggil thread rollup).
+
+        feed=(epoch, seq): event live feed sampai seq ini sudah tercakup di Mongo
+        (live_seq.<epoch>), dashboard yang bootstrap dari Mongo melewati event tsb.
+        """
+        if not totals and not feed:
+            return
+        inc = {}
+        for ctype, (count, sent, orig, decompress_us) in totals.items():
+            inc["count"] = inc.get("count", 0) + count
+            inc["bytes_sent"] = inc.get("bytes_sent", 0) + sent
+            inc["bytes_original"] = inc.get("bytes_original", 0) + orig
+            inc["decompress_us"] = inc.get("decompress_us", 0) + decompress_us
+            inc[f"by_type.{ctype}.count"] = count
+            inc[f"by_type.{ctype}.bytes_sent"] = sent
+            inc[f"by_type.{ctype}.bytes_original"] = orig
+            inc[f"by_type.{ctype}.decompress_us"] = decompress_us
+        update = {"$currentDate": {"updated_at": True}}
+        if inc:
+            update["$inc"] = inc
+        if feed:
+            update["$max"] = {f"live_seq.{feed[0]}": feed[1]}
+        try:
+            self.totals.update_one({"_id": "all"}, update, upsert=True)
+        except WriteError as exc:
+            raise ValueError(f"total ingest ditolak Mongo: {exc}") from exc
+
+    def load_zstd_dicts(self) -> list:
+        """Semua dictionary zstd terdaftar: [{_id: dict_id, data, ...}]"""
+        return list(self.db[self.dict_col_name].find({}).sort("_id", ASCENDING))
+
+    def save_zstd_dict(self, dict_id: int, data: bytes, meta: dict):
+        self.db[self.dict_col_name].replace_one(
+            {"_id": dict_id},
+            {"_id": dict_id, "data": data, "size": len(data), "created_at": datetime.utcnow(), **meta},
+            upsert=True,
+        )
+
+    def writer_stats(self) -> dict:
+        return self.writer.stats() if self.writer else {}
 
     def close(self):
+        self._closing.set()
+        if self.replayer:
+            self.replayer.stop()
+            self.replayer = None
+        if self.writer:
+            self.writer.stop()
+            logger.info(f"📦 Batch writer berhenti: {self.writer.stats()}")
+            self.writer = None
+        if self.spool:
+            logger.info(f"💾 Spool ditutup: {self.spool.stats()}")
+            self.spool.close()
+            self.spool = None
         if self.client:
             self.client.close()
-            logger.info("🔌 Koneksi MongoDB ditutup")
\ No newline at end of file
+            logger.info("🔌 Koneksi MongoDB ditutup")
@@ -0,0 +1,155 @@
+import logging
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger("central-node")
+
+# Bucket time-series ditutup MongoDB setelah 1000 measurement (atau ~125KB)
+BUCKET_MAX_MEASUREMENTS = 1000
+GRANULARITIES = ("seconds", "minutes", "hours")
+# Rentang maksimum bucket per granularity (detik), dari dokumentasi MongoDB
+GRANULARITY_SPAN = {"seconds": 3600, "minutes": 86400, "hours": 2592000}
+
+
+def granularity_for_rate(rate_hz: float) -> str:
+    """Granularity terkecil yang rentangnya cukup untuk mengisi satu bucket penuh per sensor"""
+    fill_s = BUCKET_MAX_MEASUREMENTS / max(rate_hz, 1e-6)
+    for granularity in GRANULARITIES:
+        if fill_s <= GRANULARITY_SPAN[granularity]:
+            return granularity
+    return "hours"
+
+
+def _index_name(keys) -> str:
+    return "_".join(f"{field}_{direction}" for field, direction in keys)
+
+
+def _coll_mod(db, name: str, **options) -> bool:
+    try:
+        db.command("collMod", name, **options)
+        return True
+    except OperationFailure as exc:
+        logger.warning(f"⚠️ collMod {name} {options} gagal: {exc}")
+        return False
+
+
+def ensure_timeseries(db, name: str, time_field: str, meta_field: str, granularity: str,
+                      expire_after: int = 0, bucket_span: int = 0) -> list:
+    """Buat / migrasi koleksi time-series agar opsi retensi & bucket sesuai konfigurasi.
+
+    Mengembalikan daftar perubahan yang dilakukan (untuk log).
+    """
+    info = next(iter(db.list_collections(filter={"name": name})), None)
+
+    timeseries = {"timeField": time_field, "metaField": meta_field}
+    if bucket_span:
+        # Bucketing custom (MongoDB >= 6.3): span = rounding
+        timeseries.update(bucketMaxSpanSeconds=bucket_span, bucketRoundingSeconds=bucket_span)
+    else:
+        timeseries["granularity"] = granularity
+
+    if info is None:
+        options = {"timeseries": timeseries}
+        if expire_after:
+            options["expireAfterSeconds"] = expire_after
+        db.create_collection(name, **options)
+        return [f"create {timeseries} ttl={expire_after or 'off'}"]
+
+    options = info.get("options", {})
+    current = options.get("timeseries")
+    if not current:
+        logger.warning(f"⚠️ Koleksi {name} bukan time-series; migrasi in-place tidak didukung MongoDB, lewati")
+        return []
+
+    changes = []
+
+    # --- Retensi (TTL) ---
+    current_expire = options.get("expireAfterSeconds")
+    if expire_after and current_expire != expire_after:
+        if _coll_mod(db, name, expireAfterSeconds=expire_after):
+            changes.append(f"ttl {current_expire} -> {expire_after}")
+    elif not expire_after and current_expire is not None:
+        if _coll_mod(db, name, expireAfterSeconds="off"):
+            changes.append(f"ttl {current_expire} -> off")
+
+    # --- Bucket ---
+    if bucket_span:
+        if current.get("bucketMaxSpanSeconds") != bucket_span:
+            if _coll_mod(db, name, timeseries={"bucketMaxSpanSeconds": bucket_span, "bucketRoundingSeconds": bucket_span}):
+                changes.append(f"bucket span {current.get('bucketMaxSpanSeconds')} -> {bucket_span}")
+    elif current.get("granularity") != granularity:
+        old = current.get("granularity")
+        # MongoDB hanya mengizinkan granularity dinaikkan (seconds -> minutes -> hours)
+        if old in GRANULARITIES and GRANULARITIES.index(granularity) < GRANULARITIES.index(old):
+            logger.warning(f"⚠️ Granularity {name} tidak bisa diturunkan {old} -> {granularity}, tetap {old}")
+        elif _coll_mod(db, name, timeseries={"granularity": granularity}):
+            changes.append(f"granularity {old} -> {granularity}")
+
+    return changes
+
+
+def ensure_index(collection, keys, ttl: int = None, name: str = None, **kwargs) -> str:
+    """Buat index jika belum ada; untuk index TTL, sesuaikan expireAfterSeconds yang berubah.
+
+    ttl=None: index biasa, ttl=0: index TTL dimatikan (di-drop), ttl>0: detik retensi.
+    """
+    name = name or _index_name(keys)
+    existing = collection.index_information().get(name)
+
+    if ttl == 0:
+        if existing is not None:
+            collection.drop_index(name)
+            return f"drop {name}"
+        return ""
+
+    if existing is None:
+        if ttl is not None:
+            kwargs["expireAfterSeconds"] = ttl
+        collection.create_index(keys, name=name, **kwargs)
+        return f"create {name}"
+
+    if ttl is not None and existing.get("expireAfterSeconds") != ttl:
+        if _coll_mod(collection.database, collection.name, index={"name": name, "expireAfterSeconds": ttl}):
+            return f"ttl {name} {existing.get('expireAfterSeconds')} -> {ttl}"
+    return ""
+
+
+def migrate(database) -> None:
+    """Skema startup untuk sensor_stream (time-series) dan koleksi rollup"""
+    db = database.db
+
+    # --- 1. Time-series raw: retensi & bucket ---
+    granularity = database.ts_granularity or granularity_for_rate(database.expected_rate)
+    changes = ensure_timeseries(
+        db, database.col_name, "timestamp_kirim", "sensor_id", granularity,
+        expire_after=database.retention_s, bucket_span=database.bucket_span,
+    )
+
+    # --- 2. Index sesuai query: terbaru-dulu, per sensor, per tipe kompresi ($group controller) ---
+    stream = db[database.col_name]
+    for keys in (
+        [("timestamp_kirim", DESCENDING)],
+        [("sensor_id", ASCENDING), ("timestamp_kirim", DESCENDING)],
+        [("compression_type", ASCENDING), ("timestamp_kirim", DESCENDING)],
+    ):
+        changes.append(ensure_index(stream, keys))
+
+    # Nilai sensor hasil parse: query rentang (mis. temp.max > 90) dalam rentang waktu
+    for field in database.readings_index:
+        changes.append(ensure_index(stream, [(f"readings.{field}.max", ASCENDING), ("timestamp_kirim", DESCENDING)]))
+        changes.append(ensure_index(stream, [(f"readings.{field}.min", ASCENDING), ("timestamp_kirim", DESCENDING)]))
+
+    # --- 3. Rollup: query dashboard, kunci upsert, retensi TTL pada ts ---
+    rollups = db[database.rollup_col_name]
+    changes.append(ensure_index(rollups, [("window", ASCENDING), ("ts", DESCENDING)]))
+    changes.append(ensure_index(
+        rollups, [("window", ASCENDING), ("sensor_id", ASCENDING), ("compression_type", ASCENDING), ("ts", ASCENDING)]
+    ))
+    changes.append(ensure_index(rollups, [("ts", ASCENDING)], ttl=database.rollup_retention_s, name="ts_ttl"))
+
+    changes = [c for c in changes if c]
+    if changes:
+        logger.info(f"🛠️ Migrasi skema Mongo: {'; '.join(changes)}")
+    else:
+        logger.info("🛠️ Skema Mongo sudah sesuai")
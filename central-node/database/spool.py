@@ -0,0 +1,308 @@
+import glob
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+
+import bson
+from bson import ObjectId
+
+logger = logging.getLogger("central-node")
+
+# Header record: panjang payload (u32) + crc32 payload (u32); panjang 0 = akhir data segmen
+HEADER = struct.Struct("<II")
+
+
+class _Segment:
+    """Satu file segmen berukuran tetap, di-preallocate lalu di-mmap"""
+
+    def __init__(self, path: str, seq: int, size: int):
+        self.path = path
+        self.seq = seq
+        exists = os.path.exists(path)
+        self._file = open(path, "r+b" if exists else "w+b")
+        if not exists or os.path.getsize(path) < size:
+            self._file.truncate(size)
+        self.size = os.path.getsize(path)
+        self.map = mmap.mmap(self._file.fileno(), self.size)
+        self.tail = 0
+        self.records = 0
+
+    def scan(self, start: int = 0) -> int:
+        """Cari akhir data valid (crash-safe): berhenti di header kosong / CRC tidak cocok.
+
+        Mengembalikan jumlah record valid mulai dari offset `start`.
+        """
+        offset, records, valid_from_start = 0, 0, 0
+        while offset + HEADER.size <= self.size:
+            length, crc = HEADER.unpack_from(self.map, offset)
+            end = offset + HEADER.size + length
+            if length == 0 or end > self.size or zlib.crc32(self.map[offset + HEADER.size:end]) != crc:
+                break
+            if offset >= start:
+                valid_from_start += 1
+            offset = end
+            records += 1
+        # Sisa record setengah-tertulis dihapus supaya append berikutnya tidak terbaca sebagai data lama
+        if offset + HEADER.size <= self.size:
+            self.map[offset:offset + HEADER.size] = b"\0" * HEADER.size
+        self.tail = offset
+        self.records = records
+        return valid_from_start
+
+    def fits(self, n: int) -> bool:
+        return self.tail + HEADER.size + n <= self.size
+
+    def append(self, payload: bytes):
+        # Payload dulu, header terakhir: header yang sudah tertulis selalu menunjuk payload utuh
+        start = self.tail + HEADER.size
+        self.map[start:start + len(payload)] = payload
+        HEADER.pack_into(self.map, self.tail, len(payload), zlib.crc32(payload))
+        self.tail = start + len(payload)
+        if self.tail + HEADER.size <= self.size:
+            self.map[self.tail:self.tail + HEADER.size] = b"\0" * HEADER.size
+        self.records += 1
+
+    def read(self, offset: int, limit: int):
+        """Record mulai `offset` (maks `limit`) -> (list payload, offset berikutnya)"""
+        out = []
+        while len(out) < limit and offset < self.tail:
+            length, _ = HEADER.unpack_from(self.map, offset)
+            start = offset + HEADER.size
+            out.append(self.map[start:start + length])
+            offset = start + length
+        return out, offset
+
+    def flush(self):
+        self.map.flush()
+
+    def close(self, delete: bool = False):
+        self.map.close()
+        self._file.close()
+        if delete:
+            os.remove(self.path)
+
+
+class DiskSpool:
+    """Spool write-ahead append-only di disk lokal (segmen mmap) untuk dokumen yang belum masuk Mongo.
+
+    Dokumen di-encode BSON, dibungkus header panjang + CRC32. Posisi replay
+    disimpan di file cursor (ditulis atomik), sehingga setelah crash spool
+    dibuka ulang dari cursor dan berhenti di record terakhir yang utuh.
+    Total ukuran dibatasi `max_bytes`: jika penuh, segmen tertua dibuang.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 512 << 20, segment_bytes: int = 16 << 20,
+                 fsync_interval: float = 0.2):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_segments = max(2, max_bytes // segment_bytes)
+        self.fsync_interval = fsync_interval
+        os.makedirs(directory, exist_ok=True)
+
+        self._cursor_path = os.path.join(directory, "cursor.json")
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._segments = []
+
+        # Counter
+        self.pending = 0
+        self.spooled = 0
+        self.replayed = 0
+        self.dropped = 0
+        self.rejected = 0
+
+        self._open()
+
+    def _segment_path(self, seq: int) -> str:
+        return os.path.join(self.directory, f"spool-{seq:08d}.seg")
+
+    def _open(self):
+        cursor = {"segment": 0, "offset": 0}
+        if os.path.exists(self._cursor_path):
+            with open(self._cursor_path) as f:
+                cursor = json.load(f)
+
+        for path in sorted(glob.glob(os.path.join(self.directory, "spool-*.seg"))):
+            seq = int(os.path.basename(path)[6:-4])
+            if seq < cursor["segment"]:
+                # Sudah selesai di-replay sebelum crash
+                os.remove(path)
+                continue
+            segment = _Segment(path, seq, self.segment_bytes)
+            self.pending += segment.scan(cursor["offset"] if seq == cursor["segment"] else 0)
+            self._segments.append(segment)
+
+        if not self._segments:
+            self._segments.append(_Segment(self._segment_path(cursor["segment"]), cursor["segment"], self.segment_bytes))
+        self._read_seq = self._segments[0].seq
+        self._read_offset = cursor["offset"] if self._read_seq == cursor["segment"] else 0
+        if self.pending:
+            logger.info(f"💾 Spool dibuka: {self.pending} dokumen menunggu replay ({len(self._segments)} segmen)")
+
+    def _rotate(self):
+        # Dipanggil dengan lock dipegang
+        active = self._segments[-1]
+        active.flush()
+        if len(self._segments) >= self.max_segments:
+            oldest = self._segments.pop(0)
+            lost = oldest.records if oldest.seq != self._read_seq else len(oldest.read(self._read_offset, oldest.records)[0])
+            self.dropped += lost
+            self.pending -= lost
+            oldest.close(delete=True)
+            logger.warning(f"⚠️ Spool penuh: segmen {oldest.seq} dibuang ({lost} dokumen)")
+            if oldest.seq == self._read_seq:
+                self._read_seq, self._read_offset = self._segments[0].seq, 0
+                self._save_cursor()
+        seq = active.seq + 1
+        self._segments.append(_Segment(self._segment_path(seq), seq, self.segment_bytes))
+
+    def append_many(self, docs: list) -> int:
+        """Tulis dokumen ke spool; mengembalikan jumlah yang diterima"""
+        encoded = []
+        for doc in docs:
+            # _id ditetapkan sebelum encode: replay ulang setelah crash membawa _id yang sama
+            doc.setdefault("_id", ObjectId())
+            try:
+                encoded.append(bson.encode(doc))
+            except Exception as exc:
+                logger.error(f"❌ Dokumen tidak bisa di-encode ke spool: {exc}")
+                self.rejected += 1
+
+        accepted = 0
+        with self._lock:
+            for payload in encoded:
+                if HEADER.size * 2 + len(payload) > self.segment_bytes:
+                    self.rejected += 1
+                    continue
+                if not self._segments[-1].fits(len(payload) + HEADER.size):
+                    self._rotate()
+                self._segments[-1].append(payload)
+                accepted += 1
+            self.pending += accepted
+            self.spooled += accepted
+            now = time.monotonic()
+            if now - self._last_flush >= self.fsync_interval:
+                self._segments[-1].flush()
+                self._last_flush = now
+        return accepted
+
+    def append(self, doc: dict) -> bool:
+        return self.append_many([doc]) == 1
+
+    def peek(self, limit: int):
+        """Batch berikutnya untuk replay -> (dokumen, token commit); kosong jika spool habis"""
+        with self._lock:
+            for segment in self._segments:
+                if segment.seq < self._read_seq:
+                    continue
+                offset = self._read_offset if segment.seq == self._read_seq else 0
+                payloads, end = segment.read(offset, limit)
+                if payloads:
+                    return [bson.decode(p) for p in payloads], (segment.seq, end, len(payloads))
+        return [], None
+
+    def commit(self, token):
+        """Tandai batch hasil peek() sudah masuk Mongo; segmen yang habis dihapus"""
+        seq, offset, n = token
+        with self._lock:
+            self.replayed += n
+            if seq < self._segments[0].seq:
+                # Segmen sudah dibuang karena spool penuh (pending sudah dikurangi di _rotate)
+                return
+            self._read_seq, self._read_offset = seq, offset
+            self.pending -= n
+            while len(self._segments) > 1:
+                head = self._segments[0]
+                if head.seq == self._read_seq and self._read_offset < head.tail:
+                    break
+                if head.seq > self._read_seq:
+                    break
+                self._segments.pop(0).close(delete=True)
+                if head.seq == self._read_seq:
+                    self._read_seq, self._read_offset = self._segments[0].seq, 0
+            self._save_cursor()
+
+    def _save_cursor(self):
+        tmp = f"{self._cursor_path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"segment": self._read_seq, "offset": self._read_offset}, f)
+        os.replace(tmp, self._cursor_path)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "pending": self.pending,
+                "spooled": self.spooled,
+                "replayed": self.replayed,
+                "dropped": self.dropped,
+                "rejected": self.rejected,
+                "segments": len(self._segments),
+                # Byte yang belum di-replay
+                "bytes": sum(s.tail for s in self._segments) - self._read_offset,
+            }
+
+    def close(self):
+        with self._lock:
+            for segment in self._segments:
+                segment.flush()
+                segment.close()
+            self._segments = []
+
+
+class SpoolReplayer(threading.Thread):
+    """Thread latar: tunggu Mongo pulih (probe), lalu kuras spool dengan insert_many.
+
+    Replay at-least-once: crash di antara insert dan commit cursor bisa
+    menghasilkan duplikat. Semua dokumen di spool membawa _id tetap (ditetapkan
+    append_many), jadi duplikat ditolak koleksi biasa (BulkWriteError per dokumen)
+    dan bisa dikenali lewat _id di koleksi time-series (tanpa index unik _id).
+    """
+
+    def __init__(self, spool: DiskSpool, writer, probe, batch_size: int = 500, interval: float = 2.0,
+                 on_recover=None):
+        super().__init__(name="spool-replayer", daemon=True)
+        self.spool = spool
+        self.writer = writer
+        self.probe = probe
+        self.batch_size = batch_size
+        self.interval = interval
+        self.on_recover = on_recover
+        self._stop_event = threading.Event()
+
+    def _recover(self) -> bool:
+        try:
+            self.probe()
+        except Exception:
+            return False
+        if self.on_recover:
+            self.on_recover()
+        self.writer.set_available(True)
+        return True
+
+    def run(self):
+        while not self._stop_event.is_set():
+            if not self.writer.available and not self._recover():
+                self._stop_event.wait(self.interval)
+                continue
+            # Data live didahulukan: replay hanya saat antrian writer longgar
+            if self.writer.queue_depth() > self.writer.max_queue // 2:
+                self._stop_event.wait(self.writer.flush_interval)
+                continue
+
+            docs, token = self.spool.peek(self.batch_size)
+            if not docs:
+                self._stop_event.wait(self.interval)
+                continue
+            if self.writer.insert_now(docs):
+                self.spool.commit(token)
+            else:
+                self._stop_event.wait(self.interval)
+
+    def stop(self, timeout: float = 5.0):
+        self._stop_event.set()
+        self.join(timeout)
@@ -13,4 +13,7 @@ python -m grpc_tools.protoc \
     --grpc_python_out=./proto \
     ../proto/iot.proto
 
+# Import relatif supaya bisa di-import sebagai package "proto"
+sed -i 's/^import iot_pb2/from . import iot_pb2/' proto/iot_pb2_grpc.py
+
 echo "✅ Protobuf files generated successfully!"
@@ -1,9 +1,18 @@
-from .iot_pb2 import SensorData, ServerResponse
-from .iot_pb2_grpc import DataTransferServicer, add_DataTransferServicer_to_server
+from .iot_pb2 import (
+    SensorData, SensorBatch, Compression, ServerResponse, ServerFeedback, ModeStats, HealthRequest, HealthStatus,
+)
+from .iot_pb2_grpc import DataTransferServicer, DataTransferStub, add_DataTransferServicer_to_server
 
 __all__ = [
     'SensorData',
+    'SensorBatch',
+    'Compression',
     'ServerResponse',
+    'ServerFeedback',
+    'ModeStats',
+    'HealthRequest',
+    'HealthStatus',
     'DataTransferServicer',
+    'DataTransferStub',
     'add_DataTransferServicer_to_server'
 ]
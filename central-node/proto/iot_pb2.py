@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 # Generated by the protocol buffer compiler.  DO NOT EDIT!
 # source: iot.proto
+# Protobuf Python Version: 4.25.0
 """Generated protocol buffer code."""
 from google.protobuf import descriptor as _descriptor
 from google.protobuf import descriptor_pool as _descriptor_pool
@@ -11,18 +12,32 @@ from google.protobuf.internal import builder as _builder
 _sym_db = _symbol_database.Default()
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\tiot.proto\x12\x03iot\"V\n\nSensorData\x12\x11\n\tsensor_id\x18\x01 \x01(\t\x12\x11\n\ttimestamp\x18\x02 \x01(\x01\x12\x18\n\x10compression_type\x18\x03 \x01(\t\x12\x0c\n\x04data\x18\x04 \x01(\x0c\"3\n\x0eServerResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x10\n\x08message\x18\x02 \x01(\t2B\n\x0cDataTransfer\x12\x32\n\nSendStream\x12\x0f.iot.SensorData\x1a\x13.iot.ServerResponseB\t\xf8\x01\x01Z\x05./protob\x06proto3')
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\tiot.proto\x12\x03iot\"x\n\nSensorData\x12\x11\n\tsensor_id\x18\x01 \x01(\t\x12\x11\n\ttimestamp\x18\x02 \x01(\x01\x12\x18\n\x10\x63ompression_type\x18\x03 \x01(\t\x12\x0c\n\x04\x64\x61ta\x18\x04 \x01(\x0c\x12\x0f\n\x07\x64ict_id\x18\x05 \x01(\r\x12\x0b\n\x03seq\x18\x06 \x01(\x04\"\x9e\x01\n\x0bSensorBatch\x12\x11\n\tsensor_id\x18\x01 \x01(\t\x12%\n\x0b\x63ompression\x18\x02 \x01(\x0e\x32\x10.iot.Compression\x12\x12\n\ntimestamps\x18\x03 \x03(\x01\x12\x0f\n\x07lengths\x18\x04 \x03(\r\x12\x0c\n\x04\x64\x61ta\x18\x05 \x01(\x0c\x12\x0f\n\x07\x64ict_id\x18\x06 \x01(\r\x12\x11\n\tfirst_seq\x18\x07 \x01(\x04\"2\n\x0eServerResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"\xac\x01\n\tModeStats\x12\x18\n\x10\x63ompression_type\x18\x01 \x01(\t\x12\x0f\n\x07packets\x18\x02 \x01(\x04\x12\x16\n\x0elatency_p50_ms\x18\x03 \x01(\x01\x12\x16\n\x0elatency_p95_ms\x18\x04 \x01(\x01\x12\x15\n\rdecompress_us\x18\x05 \x01(\x01\x12\r\n\x05ratio\x18\x06 \x01(\x01\x12\x1e\n\x16\x62ytes_saved_per_cpu_ms\x18\x07 \x01(\x01\"\xb7\x01\n\x0eServerFeedback\x12\r\n\x05\x61\x63ked\x18\x01 \x01(\x04\x12\x13\n\x0bserver_time\x18\x02 \x01(\x01\x12\x15\n\ringest_lag_ms\x18\x03 \x01(\x01\x12\x13\n\x0bqueue_depth\x18\x04 \x01(\r\x12\x1c\n\x14\x64\x65\x63ompress_saturated\x18\x05 \x01(\x08\x12\x1d\n\x05modes\x18\x06 \x03(\x0b\x32\x0e.iot.ModeStats\x12\x18\n\x10recommended_mode\x18\x07 \x01(\t\"\x0f\n\rHealthRequest\"\x82\x01\n\x0cHealthStatus\x12\x12\n\nreplica_id\x18\x01 \x01(\t\x12\r\n\x05ready\x18\x02 \x01(\x08\x12\x10\n\x08\x64raining\x18\x03 \x01(\x08\x12\x16\n\x0e\x61\x63tive_streams\x18\x04 \x01(\r\x12\x10\n\x08received\x18\x05 \x01(\x04\x12\x13\n\x0bqueue_depth\x18\x06 \x01(\r*3\n\x0b\x43ompression\x12\x07\n\x03RAW\x10\x00\x12\x07\n\x03LZ4\x10\x01\x12\x08\n\x04GZIP\x10\x02\x12\x08\n\x04ZSTD\x10\x03\x32\xf1\x01\n\x0c\x44\x61taTransfer\x12\x34\n\nSendStream\x12\x0f.iot.SensorData\x1a\x13.iot.ServerResponse(\x01\x12>\n\x12StreamWithFeedback\x12\x0f.iot.SensorData\x1a\x13.iot.ServerFeedback(\x01\x30\x01\x12:\n\x0fSendBatchStream\x12\x10.iot.SensorBatch\x1a\x13.iot.ServerResponse(\x01\x12/\n\x06Health\x12\x12.iot.HealthRequest\x1a\x11.iot.HealthStatusB\tZ\x07./protob\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'iot_pb2', _globals)
 if _descriptor._USE_C_DESCRIPTORS == False:
-    DESCRIPTOR._options = None
-    DESCRIPTOR._serialized_options = b'\xf8\x01\x01Z\x05./proto'
-    _globals['_SENSORDATA']._serialized_start = 18
-    _globals['_SENSORDATA']._serialized_end = 104
-    _globals['_SERVERRESPONSE']._serialized_start = 106
-    _globals['_SERVERRESPONSE']._serialized_end = 157
-    _globals['_DATATRANSFER']._serialized_start = 159
-    _globals['_DATATRANSFER']._serialized_end = 225
+  _globals['DESCRIPTOR']._options = None
+  _globals['DESCRIPTOR']._serialized_options = b'Z\007./proto'
+  _globals['_COMPRESSION']._serialized_start=864
+  _globals['_COMPRESSION']._serialized_end=915
+  _globals['_SENSORDATA']._serialized_start=18
+  _globals['_SENSORDATA']._serialized_end=138
+  _globals['_SENSORBATCH']._serialized_start=141
+  _globals['_SENSORBATCH']._serialized_end=299
+  _globals['_SERVERRESPONSE']._serialized_start=301
+  _globals['_SERVERRESPONSE']._serialized_end=351
+  _globals['_MODESTATS']._serialized_start=354
+  _globals['_MODESTATS']._serialized_end=526
+  _globals['_SERVERFEEDBACK']._serialized_start=529
+  _globals['_SERVERFEEDBACK']._serialized_end=712
+  _globals['_HEALTHREQUEST']._serialized_start=714
+  _globals['_HEALTHREQUEST']._serialized_end=729
+  _globals['_HEALTHSTATUS']._serialized_start=732
+  _globals['_HEALTHSTATUS']._serialized_end=862
+  _globals['_DATATRANSFER']._serialized_start=918
+  _globals['_DATATRANSFER']._serialized_end=1159
 # @@protoc_insertion_point(module_scope)
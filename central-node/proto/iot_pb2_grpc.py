@@ -2,7 +2,7 @@
 """Client and server classes corresponding to protobuf-defined services."""
 import grpc
 
-import iot_pb2 as iot__pb2
+from . import iot_pb2 as iot__pb2
 
 
 class DataTransferStub(object):
@@ -15,11 +15,26 @@ class DataTransferStub(object):
         Args:
             channel: A grpc.Channel.
         """
-        self.SendStream = channel.stream_stream(
-            '/iot.DataTransfer/SendStream',
-            request_serializer=iot__pb2.SensorData.SerializeToString,
-            response_deserializer=iot__pb2.ServerResponse.FromString,
-        )
+        self.SendStream = channel.stream_unary(
+                '/iot.DataTransfer/SendStream',
+                request_serializer=iot__pb2.SensorData.SerializeToString,
+                response_deserializer=iot__pb2.ServerResponse.FromString,
+                )
+        self.StreamWithFeedback = channel.stream_stream(
+                '/iot.DataTransfer/StreamWithFeedback',
+                request_serializer=iot__pb2.SensorData.SerializeToString,
+                response_deserializer=iot__pb2.ServerFeedback.FromString,
+                )
+        self.SendBatchStream = channel.stream_unary(
+                '/iot.DataTransfer/SendBatchStream',
+                request_serializer=iot__pb2.SensorBatch.SerializeToString,
+                response_deserializer=iot__pb2.ServerResponse.FromString,
+                )
+        self.Health = channel.unary_unary(
+                '/iot.DataTransfer/Health',
+                request_serializer=iot__pb2.HealthRequest.SerializeToString,
+                response_deserializer=iot__pb2.HealthStatus.FromString,
+                )
 
 
 class DataTransferServicer(object):
@@ -33,39 +48,126 @@ class DataTransferServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def StreamWithFeedback(self, request_iterator, context):
+        """Dua arah: server mengirim ack periodik berisi kondisi ingest & efisiensi tiap mode,
+        supaya edge bisa memilih RAW / LZ4 / GZIP berdasarkan kondisi end-to-end
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SendBatchStream(self, request_iterator, context):
+        """Batch: N reading dikompresi sebagai satu block, framing gRPC/HTTP2 dibayar sekali
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def Health(self, request, context):
+        """Kesiapan replika (dipakai router untuk memilih / men-drain replika)
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_DataTransferServicer_to_server(servicer, server):
     rpc_method_handlers = {
-        'SendStream': grpc.stream_stream_rpc_method_handler(
-            servicer.SendStream,
-            request_deserializer=iot__pb2.SensorData.FromString,
-            response_serializer=iot__pb2.ServerResponse.SerializeToString,
-        ),
+            'SendStream': grpc.stream_unary_rpc_method_handler(
+                    servicer.SendStream,
+                    request_deserializer=iot__pb2.SensorData.FromString,
+                    response_serializer=iot__pb2.ServerResponse.SerializeToString,
+            ),
+            'StreamWithFeedback': grpc.stream_stream_rpc_method_handler(
+                    servicer.StreamWithFeedback,
+                    request_deserializer=iot__pb2.SensorData.FromString,
+                    response_serializer=iot__pb2.ServerFeedback.SerializeToString,
+            ),
+            'SendBatchStream': grpc.stream_unary_rpc_method_handler(
+                    servicer.SendBatchStream,
+                    request_deserializer=iot__pb2.SensorBatch.FromString,
+                    response_serializer=iot__pb2.ServerResponse.SerializeToString,
+            ),
+            'Health': grpc.unary_unary_rpc_method_handler(
+                    servicer.Health,
+                    request_deserializer=iot__pb2.HealthRequest.FromString,
+                    response_serializer=iot__pb2.HealthStatus.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
-        'iot.DataTransfer', rpc_method_handlers)
+            'iot.DataTransfer', rpc_method_handlers)
     server.add_generic_rpc_handlers((generic_handler,))
 
- # This class is part of an EXPERIMENTAL API.
-
 
+ # This class is part of an EXPERIMENTAL API.
 class DataTransfer(object):
     """Definisi Service (Fungsi yang bisa dipanggil)
     """
 
     @staticmethod
     def SendStream(request_iterator,
-                   target,
-                   options=(),
-                   channel_credentials=None,
-                   call_credentials=None,
-                   insecure=False,
-                   compression=None,
-                   wait_for_ready=None,
-                   timeout=None,
-                   metadata=None):
-        return grpc.experimental.stream_stream(request_iterator, target, '/iot.DataTransfer/SendStream',
-                                               iot__pb2.SensorData.SerializeToString,
-                                               iot__pb2.ServerResponse.FromString,
-                                               options, channel_credentials,
-                                               insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(request_iterator, target, '/iot.DataTransfer/SendStream',
+            iot__pb2.SensorData.SerializeToString,
+            iot__pb2.ServerResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def StreamWithFeedback(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(request_iterator, target, '/iot.DataTransfer/StreamWithFeedback',
+            iot__pb2.SensorData.SerializeToString,
+            iot__pb2.ServerFeedback.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def SendBatchStream(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(request_iterator, target, '/iot.DataTransfer/SendBatchStream',
+            iot__pb2.SensorBatch.SerializeToString,
+            iot__pb2.ServerResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def Health(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/iot.DataTransfer/Health',
+            iot__pb2.HealthRequest.SerializeToString,
+            iot__pb2.HealthStatus.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
@@ -0,0 +1,317 @@
+import hashlib
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from concurrent import futures
+
+import grpc
+
+from proto import HealthRequest, HealthStatus, DataTransferStub
+from utils import setup_logger
+
+logger = setup_logger()
+
+SERVICE = "iot.DataTransfer"
+
+
+def _identity(data: bytes) -> bytes:
+    return data
+
+
+def _deadline(context):
+    # Tanpa deadline dari klien, time_remaining() berisi nilai "tak hingga" yang tidak valid untuk hop berikutnya
+    remaining = context.time_remaining()
+    return remaining if remaining is not None and remaining < 86400 else None
+
+
+def _forward_metadata(context):
+    # Header transport (user-agent, grpc-*) diisi ulang oleh channel ke replika
+    return tuple((k, v) for k, v in context.invocation_metadata() if k != "user-agent" and not k.startswith("grpc-"))
+
+
+def peek_sensor_id(data: bytes) -> str:
+    """Ambil field 1 (sensor_id) dari SensorData / SensorBatch tanpa decode penuh"""
+    i = 0
+    while i < len(data):
+        # Tag varint
+        key, shift = 0, 0
+        while True:
+            b = data[i]
+            i += 1
+            key |= (b & 0x7F) << shift
+            shift += 7
+            if b < 0x80:
+                break
+        field, wire = key >> 3, key & 0x07
+        if wire == 0:
+            while data[i] & 0x80:
+                i += 1
+            i += 1
+        elif wire == 1:
+            i += 8
+        elif wire == 5:
+            i += 4
+        elif wire == 2:
+            length, shift = 0, 0
+            while True:
+                b = data[i]
+                i += 1
+                length |= (b & 0x7F) << shift
+                shift += 7
+                if b < 0x80:
+                    break
+            if field == 1:
+                return data[i:i + length].decode("utf-8", "replace")
+            i += length
+        else:
+            break
+    return ""
+
+
+class Backend:
+    """Satu replika central node beserta status Health terakhir"""
+
+    def __init__(self, address: str):
+        self.address = address
+        self.channel = grpc.insecure_channel(address)
+        self.health = DataTransferStub(self.channel).Health
+        self.status = None
+        self.ready = False
+
+    def poll(self, timeout: float):
+        try:
+            self.status = self.health(HealthRequest(), timeout=timeout)
+            self.ready = self.status.ready
+        except grpc.RpcError:
+            self.status = None
+            self.ready = False
+
+    def close(self):
+        self.channel.close()
+
+
+class ReplicaSet:
+    """Daftar replika + rendezvous hashing sensor_id -> replika.
+
+    Rendezvous (highest random weight): replika yang keluar/masuk hanya
+    memindahkan sensor miliknya, sensor lain tetap di replika yang sama
+    sehingga rollup per sensor tidak tersebar.
+    """
+
+    def __init__(self, specs: list, interval: float = 2.0):
+        self.specs = specs
+        self.interval = interval
+        self.backends = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="router-health", daemon=True)
+
+    @classmethod
+    def from_env(cls) -> "ReplicaSet":
+        specs = [s.strip() for s in os.getenv("ROUTER_BACKENDS", "central-node:50051").split(",") if s.strip()]
+        return cls(specs, interval=float(os.getenv("ROUTER_HEALTH_INTERVAL_S", "2")))
+
+    def _resolve(self) -> set:
+        # "dns:host:port" di-resolve ulang tiap interval (replika compose `deploy.replicas`)
+        addresses = set()
+        for spec in self.specs:
+            if not spec.startswith("dns:"):
+                addresses.add(spec)
+                continue
+            host, _, port = spec[4:].rpartition(":")
+            try:
+                infos = socket.getaddrinfo(host, int(port), type=socket.SOCK_STREAM)
+            except socket.gaierror as exc:
+                logger.warning(f"⚠️ Resolve {host} gagal: {exc}")
+                continue
+            addresses.update(f"{info[4][0]}:{port}" for info in infos)
+        return addresses
+
+    def refresh(self):
+        addresses = self._resolve()
+        with self._lock:
+            for address in addresses - self.backends.keys():
+                self.backends[address] = Backend(address)
+                logger.info(f"➕ Replika baru: {address}")
+            removed = [self.backends.pop(a) for a in self.backends.keys() - addresses]
+            backends = list(self.backends.values())
+        for backend in removed:
+            logger.info(f"➖ Replika hilang: {backend.address}")
+            backend.close()
+
+        for backend in backends:
+            was_ready = backend.ready
+            backend.poll(timeout=self.interval)
+            if was_ready != backend.ready:
+                state = "ready" if backend.ready else ("draining" if backend.status else "down")
+                logger.info(f"🩺 {backend.address} -> {state}")
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as exc:
+                logger.error(f"❌ Health poll gagal: {exc}")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        self.refresh()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        with self._lock:
+            for backend in self.backends.values():
+                backend.close()
+
+    def pick(self, sensor_id: str) -> Backend:
+        with self._lock:
+            ready = [b for b in self.backends.values() if b.ready]
+        if not ready:
+            return None
+        key = sensor_id.encode()
+        return max(
+            ready,
+            key=lambda b: hashlib.blake2b(key + b"@" + b.address.encode(), digest_size=8).digest(),
+        )
+
+    def health(self) -> HealthStatus:
+        with self._lock:
+            backends = list(self.backends.values())
+        statuses = [b.status for b in backends if b.status is not None]
+        return HealthStatus(
+            replica_id=f"router[{sum(b.ready for b in backends)}/{len(backends)}]",
+            ready=any(b.ready for b in backends),
+            active_streams=sum(s.active_streams for s in statuses),
+            received=sum(s.received for s in statuses),
+            queue_depth=sum(s.queue_depth for s in statuses),
+        )
+
+
+class StreamRouter:
+    """Proxy gRPC byte-level: pesan diteruskan apa adanya, hanya pesan pertama diintip.
+
+    Satu stream = satu sensor (edge node mengirim per sensor), jadi replika
+    dipilih sekali dari sensor_id pesan pertama.
+    """
+
+    # Method -> jenis RPC
+    STREAM_UNARY = ("SendStream", "SendBatchStream")
+    STREAM_STREAM = ("StreamWithFeedback",)
+
+    def __init__(self, replicas: ReplicaSet):
+        self.replicas = replicas
+        self.routed = 0
+
+    def _open(self, request_iterator, context):
+        # Pesan pertama menentukan replika, lalu dirangkai kembali ke depan stream
+        first = next(request_iterator, None)
+        if first is None:
+            return None, iter(())
+        sensor_id = peek_sensor_id(first)
+        backend = self.replicas.pick(sensor_id)
+        if backend is None:
+            context.abort(grpc.StatusCode.UNAVAILABLE, "tidak ada replika central node yang ready")
+
+        def chained():
+            yield first
+            yield from request_iterator
+
+        self.routed += 1
+        logger.info(f"🔀 Stream {sensor_id or '?'} -> {backend.address}")
+        return backend, chained()
+
+    def _stream_unary(self, method: str):
+        path = f"/{SERVICE}/{method}"
+
+        def handler(request_iterator, context):
+            backend, requests = self._open(request_iterator, context)
+            if backend is None:
+                return b""
+            call = backend.channel.stream_unary(path).future(
+                requests, timeout=_deadline(context), metadata=_forward_metadata(context)
+            )
+            context.add_callback(call.cancel)
+            try:
+                return call.result()
+            except grpc.RpcError as exc:
+                context.abort(exc.code(), exc.details() or "")
+
+        return grpc.stream_unary_rpc_method_handler(
+            handler, request_deserializer=_identity, response_serializer=_identity
+        )
+
+    def _stream_stream(self, method: str):
+        path = f"/{SERVICE}/{method}"
+
+        def handler(request_iterator, context):
+            backend, requests = self._open(request_iterator, context)
+            if backend is None:
+                return
+            call = backend.channel.stream_stream(path)(
+                requests, timeout=_deadline(context), metadata=_forward_metadata(context)
+            )
+            context.add_callback(call.cancel)
+            try:
+                yield from call
+            except grpc.RpcError as exc:
+                if exc.code() != grpc.StatusCode.CANCELLED:
+                    context.abort(exc.code(), exc.details() or "")
+
+        return grpc.stream_stream_rpc_method_handler(
+            handler, request_deserializer=_identity, response_serializer=_identity
+        )
+
+    def _health(self):
+        def handler(request, context):
+            return self.replicas.health()
+
+        return grpc.unary_unary_rpc_method_handler(
+            handler, request_deserializer=HealthRequest.FromString, response_serializer=HealthStatus.SerializeToString
+        )
+
+    def generic_handler(self):
+        handlers = {m: self._stream_unary(m) for m in self.STREAM_UNARY}
+        handlers.update({m: self._stream_stream(m) for m in self.STREAM_STREAM})
+        handlers["Health"] = self._health()
+        return grpc.method_handlers_generic_handler(SERVICE, handlers)
+
+
+def serve():
+    port = os.getenv("ROUTER_PORT", "50051")
+    workers = int(os.getenv("ROUTER_WORKERS", "64"))
+
+    replicas = ReplicaSet.from_env().start()
+    router = StreamRouter(replicas)
+
+    # Satu worker per stream aktif (proxy blocking), sama seperti server mode thread
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=workers))
+    server.add_generic_rpc_handlers((router.generic_handler(),))
+    server.add_insecure_port(f"[::]:{port}")
+
+    def signal_handler(sig, frame):
+        logger.info("🛑 Menerima signal shutdown...")
+        server.stop(5).wait()
+        replicas.stop()
+        logger.info(f"✅ Router berhenti. Total stream diteruskan: {router.routed}")
+        sys.exit(0)
+
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+
+    server.start()
+    logger.info(f"🚀 Router running on port {port} -> {', '.join(replicas.specs)} [workers={workers}]")
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        signal_handler(None, None)
+
+
+if __name__ == "__main__":
+    serve()
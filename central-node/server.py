@@ -1,151 +1,687 @@
-import csv
+import time
+
+# Titik nol cold start (port terbuka / siap / paket pertama diukur dari sini)
+START = time.monotonic()
+
+import asyncio
 import grpc
+import json
 import os
 import signal
+import socket
 import sys
-import time
-import zlib
+import threading
 from concurrent import futures
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
 
-import lz4.frame
+from proto import (
+    DataTransferServicer, add_DataTransferServicer_to_server,
+    ServerResponse, ServerFeedback, ModeStats, Compression, HealthStatus,
+)
+from utils import (
+    setup_logger, ReportSink, DecompressPool, OrderedStream, RollupAggregator, compression_label,
+    LatencyMetrics, MetricsRegistry, MetricsServer, gauges, StreamFeedback, recommend_mode, ZSTD_DICTS,
+    StageTimings, RuntimeProfiler, LiveFeed, PayloadParser, SequenceTracker, log_stats, warmup_codecs,
+)
 
-from proto import DataTransferServicer, add_DataTransferServicer_to_server, ServerResponse
-from database import Database
-from utils import setup_logger
+if TYPE_CHECKING:
+    # pymongo di-import thread bootstrap setelah port gRPC terbuka
+    from database import Database
 
 logger = setup_logger()
 
-CSV_FILE = "/app/data/analisis_latensi.csv"
+CSV_FILE = os.getenv("REPORT_PATH", "/app/data/analisis_latensi.csv")
+
+# Identitas replika (router & laporan per replika); default hostname container
+REPLICA_ID = os.getenv("REPLICA_ID") or socket.gethostname()
+
+
+# Stat writer DB yang hanya naik (diekspor sebagai counter *_total)
+WRITER_COUNTERS = (
+    "batches", "docs_written", "docs_failed", "docs_dropped", "docs_dropped_oldest", "docs_sampled_out",
+    "blocked", "blocked_ms_total", "flush_ms_total", "docs_spooled", "docs_replayed",
+    "spool_spooled", "spool_replayed", "spool_dropped", "spool_rejected",
+)
+
+
+def report_path() -> str:
+    # Beberapa replika berbagi volume /app/data: tiap replika menulis file sendiri
+    if os.getenv("REPORT_PER_REPLICA", "0").lower() in ("1", "true", "yes"):
+        root, ext = os.path.splitext(CSV_FILE)
+        return f"{root}-{REPLICA_ID}{ext}"
+    return CSV_FILE
 
 
 class DataTransferService(DataTransferServicer):
     """gRPC service that logs to CSV and MongoDB"""
 
-    def __init__(self, db: Database):
-        self.db = db
+    def __init__(self, db: "Database" = None, decompressor: DecompressPool = None):
+        # Database dipasang lewat attach() (thread bootstrap) setelah port terbuka;
+        # stream yang datang lebih dulu menunggu di _await_started
+        self.db = None
+        self.started = threading.Event()
+        self.startup_wait = float(os.getenv("STARTUP_WAIT_S", "30"))
+        # Milestone cold start (ms sejak START): port_bound, db_attached, ready, first_packet
+        self.startup = {}
         self.received_count = 0
+        self.recorded_count = 0
+
+        # Status untuk Health RPC (router memindahkan sensor saat replika draining)
+        self.active_streams = 0
+        self.draining = False
+        self._streams_lock = threading.Lock()
+
+        # Tahap dekompresi (inline / thread pool / process pool)
+        self.decompressor = decompressor or DecompressPool(mode="inline")
+
+        # Sink laporan: file tetap terbuka, baris di-buffer & dirotasi
+        self.report = ReportSink.from_env(report_path())
+
+        # Rollup 1s/10s/1m untuk dashboard, di-flush ke Mongo oleh thread sendiri
+        # dan sekaligus di-push ke subscriber live feed (/live, SSE)
+        self.live = LiveFeed(maxlen=int(os.getenv("LIVE_FEED_EVENTS", "600")))
+        self.rollups = RollupAggregator(
+            self._write_rollups, self._write_totals, publish=self.live.publish, available=self._mongo_up
+        )
+        self.rollups.start()
+
+        # Kuantil latensi streaming (tanpa query DB), di-scrape via /metrics
+        self.latency = LatencyMetrics(window=float(os.getenv("METRICS_WINDOW_S", "60")))
+        self.registry = MetricsRegistry()
+        self.registry.register(self.latency.collect)
+        self.registry.register(self._collect_pipeline)
+
+        # Nomor urut per sensor -> gap / duplikat / reorder, goodput vs loss per mode
+        self.sequences = SequenceTracker(
+            window=int(os.getenv("SEQ_WINDOW", "1024")), rate_window=float(os.getenv("METRICS_WINDOW_S", "60"))
+        )
+        self.registry.register(self.sequences.collect)
+
+        # Parse payload NDJSON -> kolom ringkas (field "readings"); PAYLOAD_PARSE=off untuk mematikan
+        self.parser = None
+        if os.getenv("PAYLOAD_PARSE", "ndjson").lower() != "off":
+            categorical = [f for f in os.getenv("PAYLOAD_CATEGORICAL", "status").split(",") if f]
+            self.parser = PayloadParser(categorical=categorical)
+
+        # Span per tahap hot path + profiler on-demand (signal / endpoint admin)
+        self.stages = StageTimings(window=float(os.getenv("METRICS_WINDOW_S", "60")))
+        self.registry.register(self.stages.collect)
+        self.profiler = RuntimeProfiler.from_env()
+
+        # Ack periodik StreamWithFeedback
+        self.feedback_interval = float(os.getenv("FEEDBACK_INTERVAL_MS", "1000")) / 1000
+        self.lag_low_ms = float(os.getenv("FEEDBACK_LAG_LOW_MS", "50"))
+        self.lag_high_ms = float(os.getenv("FEEDBACK_LAG_HIGH_MS", "300"))
+
+        if db is not None:
+            self.attach(db)
+
+    def mark(self, milestone: str) -> float:
+        """Catat milestone cold start sekali (ms sejak START, awal import server.py)"""
+        if milestone not in self.startup:
+            self.startup[milestone] = (time.monotonic() - START) * 1000
+        return self.startup[milestone]
+
+    def attach(self, db: "Database"):
+        self.db = db
+        self.mark("db_attached")
+        self.started.set()
+
+    def ready(self) -> bool:
+        return self.db is not None and self.db.accepting() and not self.draining
+
+    def _writer_stats(self) -> dict:
+        return self.db.writer_stats() if self.db else {}
+
+    def _await_started(self, context):
+        # Stream saat bootstrap ditahan (pesan tertahan di flow control gRPC), bukan ditolak
+        if not self.started.wait(self.startup_wait):
+            context.abort(grpc.StatusCode.UNAVAILABLE, "central node belum siap")
+
+    def _mongo_up(self) -> bool:
+        return self.db is not None and self.db.mongo_up()
+
+    def _write_rollups(self, docs: list):
+        self.db.write_rollups(docs)
+
+    def _write_totals(self, totals: dict, published: int = None):
+        self.db.write_totals(totals, feed=(self.live.epoch, published) if published else None)
+
+    def _collect_pipeline(self):
+        yield from gauges("iot_startup", {f"{k}_ms": v for k, v in self.startup.items()})
+        yield from gauges("iot_db_writer", self._writer_stats(), counters=WRITER_COUNTERS)
+        yield from gauges("iot_decompress", self.decompressor.stats(), counters=("submitted", "stalls"))
+        yield from gauges(
+            "iot_report", {"rows_written": self.report.rows_written, "rotations": self.report.rotations},
+            counters=("rows_written", "rotations"),
+        )
+        yield from gauges(
+            "iot_rollup", self.rollups.stats(),
+            counters=("write_failures", "dropped_windows", "rejected_windows", "rejected_totals"),
+        )
+        yield from gauges(
+            "iot_live_feed", {"seq": self.live.seq, "subscribers": self.live.subscribers}, counters=("seq",)
+        )
+        log = log_stats()
+        yield from gauges("iot_log", log, counters=[k for k in log if k != "queue_depth"])
+        if self.parser:
+            parsed = self.parser.stats()
+            yield from gauges("iot_payload", parsed, counters=tuple(parsed))
+
+    def close(self):
+        self.profiler.stop()
+        self.decompressor.close()
+        logger.info(f"🧵 Decompress pool berhenti: {self.decompressor.stats()}")
+        self.rollups.stop()
+        self.report.close()
+
+    def _on_decompressed(self, ctx, fut) -> bool:
+        """Dipanggil berurutan per stream setelah dekompresi selesai"""
+        sensor_data, start_process, feedback = ctx
+        try:
+            payload_asli, decompress_us = fut.result()
+        except Exception as exc:
+            # Log error tapi jangan matikan server, lanjut ke data berikutnya
+            logger.error(f"❌ Gagal dekompresi {sensor_data.compression_type}: {exc}")
+            return False
+        # Tipe dari klien jadi label metrik & key Mongo (by_type.<tipe>): "" = RAW seperti dekompresi
+        return self._record(
+            sensor_data.sensor_id, compression_label(sensor_data.compression_type), sensor_data.timestamp,
+            len(sensor_data.data), payload_asli, start_process, decompress_us, feedback,
+            blob=sensor_data.data, seq=sensor_data.seq,
+        )
+
+    def _on_batch_decompressed(self, ctx, fut) -> int:
+        """Pecah SensorBatch jadi record individual (urutan per stream dijaga)"""
+        batch, start_process, feedback = ctx
+        compression_type = Compression.Name(batch.compression)
+        try:
+            block, decompress_us = fut.result()
+        except Exception as exc:
+            logger.error(f"❌ Gagal dekompresi batch {compression_type}: {exc}")
+            return 0
+
+        n = len(batch.lengths)
+        if n == 0 or n != len(batch.timestamps) or sum(batch.lengths) != len(block):
+            logger.error(f"❌ Batch {batch.sensor_id} tidak valid: {n} reading, block {len(block)} bytes")
+            return 0
+
+        # Ukuran wire & biaya dekompresi dibagi proporsional ke tiap reading
+        wire_total = len(batch.data)
+        block_total = len(block)
+        recorded = 0
+        offset = 0
+        for i, (timestamp, length) in enumerate(zip(batch.timestamps, batch.lengths)):
+            reading = block[offset:offset + length]
+            offset += length
+            share = length / block_total if block_total else 1 / n
+            if self._record(
+                batch.sensor_id, compression_type, timestamp, round(wire_total * share),
+                reading, start_process, decompress_us * share, feedback, blob=reading, blob_codec="RAW",
+                seq=batch.first_seq + i if batch.first_seq else 0,
+            ):
+                recorded += 1
+        return recorded
+
+    def _record(self, sensor_id: str, compression_type: str, timestamp: float, uk_paket: int,
+                payload_asli: bytes, start_process: float, decompress_us: float = 0.0,
+                feedback: StreamFeedback = None, blob: bytes = None, blob_codec: str = None,
+                seq: int = 0) -> bool:
+        """Hitung metrik lalu kirim ke laporan & DB (keduanya non-blocking)"""
+        t_start = time.perf_counter()
+        self.recorded_count += 1
+
+        # --- 2. HITUNG METRIK ---
+        waktu_terima = time.time()
+        latensi_ms = (waktu_terima - timestamp) * 1000
+
+        uk_asli = len(payload_asli)
+
+        hemat_persen = 0.0
+        if uk_asli > 0:
+            hemat_persen = 100 - (uk_paket / uk_asli * 100)
+
+        self.rollups.record(sensor_id, compression_type, waktu_terima, uk_paket, uk_asli, latensi_ms, decompress_us)
+        if feedback is not None:
+            feedback.record(compression_type, uk_paket, uk_asli, latensi_ms, decompress_us)
+        status = self.sequences.observe(sensor_id, compression_type, seq, uk_asli, waktu_terima) if seq else None
+        if status == SequenceTracker.RESET:
+            logger.warning(f"🔁 Seq {sensor_id} mulai ulang dari {seq} (edge restart?)")
+        t_metrics = time.perf_counter()
+
+        # Nilai sensor di-parse sekali saat ingest, bukan saat query
+        readings = self.parser.parse(payload_asli) if self.parser else None
+        t_parse = time.perf_counter()
+
+        # --- 3. TULIS KE MONGODB (Sistem) ---
+        doc = {
+            "sensor_id": sensor_id,
+            "timestamp_kirim": timestamp, # Nanti dikonversi jadi Date di db_handler
+            "timestamp_terima": waktu_terima,
+            "latensi_ms": latensi_ms,
+            "compression_type": compression_type,
+            "data_size": uk_paket,
+            "original_size": uk_asli,
+            "compression_ratio": uk_paket / uk_asli if uk_asli > 0 else 1.0,
+            "decompress_us": decompress_us,
+        }
+        if seq:
+            doc["seq"] = seq
+        if readings:
+            doc["readings"] = readings
+
+        # Non-blocking: dokumen di-batch oleh writer thread (insert_many),
+        # payload hanya disimpan jika retensi aktif (PAYLOAD_STORE)
+        queued = self.db.enqueue_sensor_data(doc, blob, blob_codec)
+        t_db = time.perf_counter()
+        if self.recorded_count == 1:
+            logger.info(f"⏱️ Paket pertama tercatat {self.mark('first_packet'):.0f} ms setelah start")
+
+        # Log periodic (biar terminal gak penuh spam)
+        if self.recorded_count % 50 == 0:
+            logger.info(
+                f"📊 Paket #{self.recorded_count} | {compression_type:4s} | Latensi: {latensi_ms:.1f}ms | Hemat: {hemat_persen:.1f}%"
+            )
+        t_log = time.perf_counter()
 
-        # Buat folder data jika belum ada
-        os.makedirs(os.path.dirname(CSV_FILE), exist_ok=True)
-        
-        # Reset file CSV setiap kali server nyala (Mode 'w')
-        with open(CSV_FILE, "w", newline="") as file:
-            writer = csv.writer(file)
-            writer.writerow([
-                "timestamp_kirim",
-                "timestamp_terima",
-                "latensi_ms",
-                "tipe_kompresi",
-                "ukuran_paket_bytes",
-                "ukuran_asli_bytes",
-                "hemat_persen",
-                "waktu_proses_server_ms",
-            ])
+        # Waktu proses = seluruh jalur server: antre + dekompresi + metrik + DB + log
+        proc_ms = (time.time() - start_process) * 1000
+
+        # --- 4. TULIS KE LAPORAN (Buffered) ---
+        self.report.write((
+            timestamp,
+            waktu_terima,
+            latensi_ms,
+            compression_type,
+            uk_paket,
+            uk_asli,
+            hemat_persen,
+            proc_ms,
+            decompress_us,
+        ))
+        t_report = time.perf_counter()
+
+        self.latency.record(sensor_id, compression_type, latensi_ms, proc_ms, uk_paket, uk_asli, waktu_terima,
+                            decompress_us)
+
+        # Span per tahap (ms); "queue" = tunggu pool/urutan di luar dekompresi itu sendiri
+        decompress_ms = decompress_us / 1000
+        self.stages.record((
+            max(0.0, (waktu_terima - start_process) * 1000 - decompress_ms),
+            decompress_ms,
+            (t_metrics - t_start) * 1000,
+            (t_parse - t_metrics) * 1000,
+            (t_db - t_parse) * 1000,
+            (t_log - t_db) * 1000,
+            (t_report - t_log) * 1000,
+        ), waktu_terima)
+
+        return queued
+
+    @contextmanager
+    def _stream_scope(self):
+        with self._streams_lock:
+            self.active_streams += 1
+        try:
+            yield
+        finally:
+            with self._streams_lock:
+                self.active_streams -= 1
+
+    def _health(self) -> HealthStatus:
+        return HealthStatus(
+            replica_id=REPLICA_ID,
+            ready=self.ready(),
+            draining=self.draining,
+            active_streams=self.active_streams,
+            received=self.received_count,
+            queue_depth=self._writer_stats().get("queue_depth", 0),
+        )
+
+    def _feedback_message(self, feedback: StreamFeedback) -> ServerFeedback:
+        snap = feedback.snapshot()
+        saturated = self.decompressor.saturated()
+        return ServerFeedback(
+            acked=snap["acked"],
+            server_time=time.time(),
+            ingest_lag_ms=snap["ingest_lag_ms"],
+            queue_depth=self._writer_stats().get("queue_depth", 0),
+            decompress_saturated=saturated,
+            modes=[ModeStats(**m) for m in snap["modes"]],
+            recommended_mode=recommend_mode(snap["ingest_lag_ms"], saturated, self.lag_low_ms, self.lag_high_ms),
+        )
+
+    def _consume(self, request_iterator, stream: OrderedStream, feedback: StreamFeedback = None):
+        for sensor_data in request_iterator:
+            start_process = time.time()
+            self.received_count += 1
+
+            # --- 1. LOGIKA DEKOMPRESI (di pool, hasil diproses sesuai urutan) ---
+            fut = self.decompressor.submit(sensor_data.compression_type, sensor_data.data, sensor_data.dict_id)
+            stream.add(fut, (sensor_data, start_process, feedback))
+
+        stream.wait()
+
+    def _consume_batches(self, request_iterator, stream: OrderedStream):
+        for batch in request_iterator:
+            start_process = time.time()
+            self.received_count += len(batch.lengths)
+            if batch.compression not in Compression.values():
+                logger.error(f"❌ Kompresi batch tidak dikenal: {batch.compression}")
+                continue
+
+            fut = self.decompressor.submit(Compression.Name(batch.compression), batch.data, batch.dict_id)
+            stream.add(fut, (batch, start_process, None))
+
+        stream.wait()
 
     def SendStream(self, request_iterator, context):
         logger.info("🔌 Client terhubung! Stream dimulai...")
+        self._await_started(context)
+        stream = OrderedStream(self._on_decompressed)
+
+        with self._stream_scope():
+            try:
+                self._consume(request_iterator, stream)
+            except Exception as exc:
+                logger.error(f"❌ Error Stream: {exc}")
+                return ServerResponse(success=False, message=str(exc))
+
+        return ServerResponse(success=True, message=f"Selesai. Total: {stream.completed}")
+
+    def SendBatchStream(self, request_iterator, context):
+        logger.info("🔌 Client terhubung (batch)! Stream dimulai...")
+        self._await_started(context)
+        stream = OrderedStream(self._on_batch_decompressed)
+
+        with self._stream_scope():
+            try:
+                self._consume_batches(request_iterator, stream)
+            except Exception as exc:
+                logger.error(f"❌ Error Stream: {exc}")
+                return ServerResponse(success=False, message=str(exc))
+
+        return ServerResponse(success=True, message=f"Selesai. Total: {stream.completed}")
+
+    def StreamWithFeedback(self, request_iterator, context):
+        logger.info("🔌 Client terhubung (feedback)! Stream dimulai...")
+        self._await_started(context)
+        stream = OrderedStream(self._on_decompressed)
+        feedback = StreamFeedback()
+        done = threading.Event()
+        errors = []
+
+        # Request dibaca thread lain supaya ack bisa dikirim berkala
+        def consume():
+            try:
+                self._consume(request_iterator, stream, feedback)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                done.set()
+
+        threading.Thread(target=consume, name="feedback-consumer", daemon=True).start()
+
+        with self._stream_scope():
+            while not done.wait(self.feedback_interval):
+                yield self._feedback_message(feedback)
+
+        if errors:
+            logger.error(f"❌ Error Stream: {errors[0]}")
+        yield self._feedback_message(feedback)
+
+    def Health(self, request, context):
+        return self._health()
+
+
+class AsyncDataTransferService(DataTransferService):
+    """Varian grpc.aio: satu event loop untuk ratusan stream, dekompresi di pool"""
+
+    def __init__(self, db: "Database" = None, decompressor: DecompressPool = None):
+        decompressor = decompressor or DecompressPool(mode="inline")
+        # Backpressure versi asyncio (semaphore threading akan memblok event loop)
+        self.slots = asyncio.Semaphore(decompressor.max_inflight)
+        super().__init__(db, decompressor)
+
+    def attach(self, db: "Database"):
+        if db.writer is not None and db.writer.policy == "block":
+            # put() blocking di event loop akan menghentikan semua stream sekaligus
+            logger.warning("⚠️ DB_OVERFLOW_POLICY=block tidak cocok untuk mode aio, diganti drop_oldest")
+            db.writer.policy = "drop_oldest"
+        if db.writer is not None and db.writer.spool:
+            # Tulis spool (mmap + msync) saat overflow / Mongo down jangan di event loop
+            db.writer.offload_spool()
+        super().attach(db)
+
+    async def _await_started_async(self, context):
+        # Polling singkat hanya selama bootstrap; Event threading tidak bisa di-await
+        deadline = time.monotonic() + self.startup_wait
+        while not self.started.is_set():
+            if time.monotonic() >= deadline:
+                await context.abort(grpc.StatusCode.UNAVAILABLE, "central node belum siap")
+            await asyncio.sleep(0.01)
+
+    async def _consume_async(self, request_iterator, feedback: StreamFeedback = None) -> int:
         success_count = 0
+        async for sensor_data in request_iterator:
+            start_process = time.time()
+            self.received_count += 1
 
-        try:
-            for sensor_data in request_iterator:
-                start_process = time.time()
-                self.received_count += 1
-
-                # --- 1. LOGIKA DEKOMPRESI ---
-                try:
-                    if sensor_data.compression_type == "GZIP":
-                        payload_asli = zlib.decompress(sensor_data.data)
-                    elif sensor_data.compression_type == "LZ4":
-                        # Menggunakan Frame Decompression (Standar)
-                        payload_asli = lz4.frame.decompress(sensor_data.data)
-                    else:
-                        # RAW
-                        payload_asli = sensor_data.data
-                except Exception as exc:
-                    # Log error tapi jangan matikan server, lanjut ke data berikutnya
-                    logger.error(f"❌ Gagal dekompresi {sensor_data.compression_type}: {exc}")
-                    continue
-
-                # --- 2. HITUNG METRIK ---
-                waktu_terima = time.time()
-                latensi_ms = (waktu_terima - sensor_data.timestamp) * 1000
-
-                uk_asli = len(payload_asli)
-                uk_paket = len(sensor_data.data)
-                
-                hemat_persen = 0.0
-                if uk_asli > 0:
-                    hemat_persen = 100 - (uk_paket / uk_asli * 100)
-
-                proc_ms = (time.time() - start_process) * 1000
-
-                # --- 3. TULIS KE CSV (Laporan) ---
-                with open(CSV_FILE, "a", newline="") as file:
-                    writer = csv.writer(file)
-                    writer.writerow([
-                        f"{sensor_data.timestamp:.4f}",
-                        f"{waktu_terima:.4f}",
-                        f"{latensi_ms:.2f}",
-                        sensor_data.compression_type,
-                        uk_paket,
-                        uk_asli,
-                        f"{hemat_persen:.1f}",
-                        f"{proc_ms:.3f}",
-                    ])
-
-                # --- 4. TULIS KE MONGODB (Sistem) ---
-                doc = {
-                    "sensor_id": sensor_data.sensor_id,
-                    "timestamp_kirim": sensor_data.timestamp, # Nanti dikonversi jadi Date di db_handler
-                    "timestamp_terima": waktu_terima,
-                    "latensi_ms": latensi_ms,
-                    "compression_type": sensor_data.compression_type,
-                    "data_size": uk_paket,
-                    # Simpan data mentah (binary)
-                    "raw_data": sensor_data.data, 
-                }
-
-                if self.db.insert_sensor_data(doc):
-                    success_count += 1
-
-                # Log periodic (biar terminal gak penuh spam)
-                if self.received_count % 50 == 0:
-                    logger.info(
-                        f"📊 Paket #{self.received_count} | {sensor_data.compression_type:4s} | Latensi: {latensi_ms:.1f}ms | Hemat: {hemat_persen:.1f}%"
-                    )
+            # --- 1. LOGIKA DEKOMPRESI (CPU-heavy -> pool) ---
+            async with self.slots:
+                fut = self.decompressor.submit(
+                    sensor_data.compression_type, sensor_data.data, sensor_data.dict_id, bounded=False
+                )
+                if not fut.done():
+                    await asyncio.wait([asyncio.wrap_future(fut)])
 
-        except Exception as exc:
-            logger.error(f"❌ Error Stream: {exc}")
-            return ServerResponse(success=False, message=str(exc))
+            if self._on_decompressed((sensor_data, start_process, feedback), fut):
+                success_count += 1
+        return success_count
+
+    async def _consume_batches_async(self, request_iterator) -> int:
+        success_count = 0
+        async for batch in request_iterator:
+            start_process = time.time()
+            self.received_count += len(batch.lengths)
+            if batch.compression not in Compression.values():
+                logger.error(f"❌ Kompresi batch tidak dikenal: {batch.compression}")
+                continue
+
+            async with self.slots:
+                fut = self.decompressor.submit(
+                    Compression.Name(batch.compression), batch.data, batch.dict_id, bounded=False
+                )
+                if not fut.done():
+                    await asyncio.wait([asyncio.wrap_future(fut)])
+
+            success_count += self._on_batch_decompressed((batch, start_process, None), fut)
+        return success_count
+
+    async def SendBatchStream(self, request_iterator, context):
+        logger.info("🔌 Client terhubung (aio, batch)! Stream dimulai...")
+        await self._await_started_async(context)
+
+        with self._stream_scope():
+            try:
+                success_count = await self._consume_batches_async(request_iterator)
+            except Exception as exc:
+                logger.error(f"❌ Error Stream: {exc}")
+                return ServerResponse(success=False, message=str(exc))
 
         return ServerResponse(success=True, message=f"Selesai. Total: {success_count}")
 
+    async def SendStream(self, request_iterator, context):
+        logger.info("🔌 Client terhubung (aio)! Stream dimulai...")
+        await self._await_started_async(context)
+
+        with self._stream_scope():
+            try:
+                success_count = await self._consume_async(request_iterator)
+            except Exception as exc:
+                logger.error(f"❌ Error Stream: {exc}")
+                return ServerResponse(success=False, message=str(exc))
+
+        return ServerResponse(success=True, message=f"Selesai. Total: {success_count}")
+
+    async def StreamWithFeedback(self, request_iterator, context):
+        logger.info("🔌 Client terhubung (aio, feedback)! Stream dimulai...")
+        await self._await_started_async(context)
+        feedback = StreamFeedback()
+        task = asyncio.create_task(self._consume_async(request_iterator, feedback))
+
+        with self._stream_scope():
+            while True:
+                done, _ = await asyncio.wait([task], timeout=self.feedback_interval)
+                if done:
+                    break
+                yield self._feedback_message(feedback)
+
+        if task.exception():
+            logger.error(f"❌ Error Stream: {task.exception()}")
+        yield self._feedback_message(feedback)
+
+    async def Health(self, request, context):
+        return self._health()
+
+
+def start_metrics_server(service: DataTransferService):
+    """HTTP /metrics (Prometheus text), METRICS_PORT=0 untuk mematikan"""
+    metrics_port = int(os.getenv("METRICS_PORT", "9100"))
+    if not metrics_port:
+        return None
+    metrics_server = MetricsServer(service.registry, metrics_port)
+    metrics_server.add_route("/live", service.live.sse)
+    metrics_server.add_route("/debug/profile", service.profiler.http_route)
+    metrics_server.add_route(
+        "/debug/stages", lambda _query: (200, "application/json", json.dumps(service.stages.snapshot()) + "\n")
+    )
+    metrics_server.start()
+    return metrics_server
+
+
+class ReadinessProbe:
+    """Status grpc.health.v1 standar (grpc_health_probe, probe gRPC k8s) dari kesiapan service.
+
+    Butuh grpcio-health-checking; tanpa paket itu hanya RPC Health internal yang tersedia.
+    """
+
+    SERVICES = ("", "iot.DataTransfer")
+
+    def __init__(self, server, loop=None):
+        self.loop = loop
+        self.serving = None
+        self._servicer = None
+        try:
+            from grpc_health.v1 import health, health_pb2, health_pb2_grpc
+        except ImportError:
+            logger.warning("⚠️ grpcio-health-checking tidak terpasang, grpc.health.v1 tidak tersedia")
+            return
+        self._servicer = health.aio.HealthServicer() if loop else health.HealthServicer()
+        self._status = health_pb2.HealthCheckResponse
+        health_pb2_grpc.add_HealthServicer_to_server(self._servicer, server)
+        self.update(False)
+
+    def update(self, serving: bool) -> bool:
+        """Publikasikan status jika berubah (aman dipanggil dari thread mana pun)"""
+        if serving == self.serving:
+            return False
+        self.serving = serving
+        if self._servicer is not None:
+            status = self._status.SERVING if serving else self._status.NOT_SERVING
+            for name in self.SERVICES:
+                if self.loop is None:
+                    self._servicer.set(name, status)
+                else:
+                    asyncio.run_coroutine_threadsafe(self._servicer.set(name, status), self.loop)
+        return True
+
+
+def load_zstd_dicts(db: "Database"):
+    # Dictionary zstd dari Mongo ke direktori lokal (dibaca juga oleh worker process pool)
+    try:
+        for d in db.load_zstd_dicts():
+            ZSTD_DICTS.add(d["_id"], d["data"])
+        logger.info(f"📚 Dictionary zstd: {ZSTD_DICTS.ids()}")
+    except Exception as exc:
+        logger.warning(f"⚠️ Gagal memuat dictionary zstd: {exc}")
+
+
+def bootstrap(service: DataTransferService, probe: ReadinessProbe, stop: threading.Event):
+    """Thread latar setelah port terbuka: codec, Database, dictionary zstd, lalu pantau kesiapan"""
+    warmup_codecs()
+    from database import Database
 
-def serve():
     db = Database()
     try:
-        db.connect()
+        # Tanpa I/O jaringan: ping & migrasi skema Mongo berjalan di thread writer/replayer
+        db.connect(wait=False)
     except Exception as exc:
         logger.error(f"❌ DB Error: {exc}")
-        sys.exit(1)
+        # Konfigurasi salah (bukan Mongo down): keluar lewat jalur shutdown biasa
+        os.kill(os.getpid(), signal.SIGTERM)
+        return
+    service.attach(db)
 
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-    add_DataTransferServicer_to_server(DataTransferService(db), server)
+    dicts_loaded = False
+    while True:
+        if probe.update(service.ready()) and probe.serving:
+            logger.info(f"🟢 Ready (SERVING) {service.mark('ready'):.0f} ms setelah start")
+        if not dicts_loaded and db.mongo_ready.is_set():
+            load_zstd_dicts(db)
+            dicts_loaded = True
+        if stop.wait(0.5):
+            return
 
-    port = os.getenv("GRPC_PORT", "50051")
+
+def start_bootstrap(service: DataTransferService, probe: ReadinessProbe) -> threading.Event:
+    stop = threading.Event()
+    threading.Thread(target=bootstrap, args=(service, probe, stop), name="bootstrap", daemon=True).start()
+    return stop
+
+
+def serve_threaded(port: str):
+    workers = int(os.getenv("GRPC_WORKERS", "10"))
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=workers))
+    service = DataTransferService(decompressor=DecompressPool.from_env())
+    add_DataTransferServicer_to_server(service, server)
+    probe = ReadinessProbe(server)
+
+    # Port dibuka sebelum Mongo / codec disiapkan: edge langsung bisa connect
     server.add_insecure_port(f"[::]:{port}")
     server.start()
-    logger.info(f"🚀 Central Node (MongoDB + CSV) running on port {port}")
+    logger.info(
+        f"🚀 Central Node (MongoDB + CSV) running on port {port} [thread, workers={workers}, replica={REPLICA_ID}]"
+        f" dalam {service.mark('port_bound'):.0f} ms"
+    )
+    metrics_server = start_metrics_server(service)
+    stop_bootstrap = start_bootstrap(service, probe)
 
     def signal_handler(sig, frame):
         logger.info("🛑 Menerima signal shutdown...")
-        server.stop(5)
-        db.close()
+        stop_bootstrap.set()
+        drain_grace = float(os.getenv("DRAIN_GRACE_S", "0"))
+        if drain_grace > 0:
+            # Health -> draining dulu supaya router berhenti mengirim sensor baru ke sini
+            service.draining = True
+            probe.update(False)
+            logger.info(f"🚰 Draining {drain_grace:.0f}s ({service.active_streams} stream aktif)...")
+            time.sleep(drain_grace)
+        server.stop(5).wait()
+        if metrics_server:
+            metrics_server.stop()
+        service.close()
+        if service.db:
+            service.db.close()
         logger.info("✅ Server dihentikan dengan aman")
         sys.exit(0)
 
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
+    # kill -USR1 = sampling profiler, -USR2 = tracemalloc (kirim lagi untuk berhenti lebih awal)
+    signal.signal(signal.SIGUSR1, lambda *_: service.profiler.toggle("sample"))
+    signal.signal(signal.SIGUSR2, lambda *_: service.profiler.toggle("tracemalloc"))
 
     try:
         server.wait_for_termination()
@@ -153,8 +689,60 @@ def serve():
         signal_handler(None, None)
 
 
+async def serve_aio(port: str):
+    decompressor = DecompressPool.from_env()
+
+    server = grpc.aio.server()
+    service = AsyncDataTransferService(decompressor=decompressor)
+    add_DataTransferServicer_to_server(service, server)
+    probe = ReadinessProbe(server, asyncio.get_running_loop())
+
+    server.add_insecure_port(f"[::]:{port}")
+    await server.start()
+    logger.info(
+        f"🚀 Central Node (MongoDB + CSV) running on port {port} [aio, decompress={decompressor.mode}x{decompressor.workers}, replica={REPLICA_ID}]"
+        f" dalam {service.mark('port_bound'):.0f} ms"
+    )
+    metrics_server = start_metrics_server(service)
+    stop_bootstrap = start_bootstrap(service, probe)
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+    loop.add_signal_handler(signal.SIGUSR1, service.profiler.toggle, "sample")
+    loop.add_signal_handler(signal.SIGUSR2, service.profiler.toggle, "tracemalloc")
+
+    await stop_event.wait()
+    logger.info("🛑 Menerima signal shutdown...")
+    stop_bootstrap.set()
+    drain_grace = float(os.getenv("DRAIN_GRACE_S", "0"))
+    if drain_grace > 0:
+        service.draining = True
+        probe.update(False)
+        logger.info(f"🚰 Draining {drain_grace:.0f}s ({service.active_streams} stream aktif)...")
+        await asyncio.sleep(drain_grace)
+    await server.stop(5)
+    if metrics_server:
+        metrics_server.stop()
+    service.close()
+    if service.db:
+        service.db.close()
+    logger.info("✅ Server dihentikan dengan aman")
+
+
+def serve():
+    port = os.getenv("GRPC_PORT", "50051")
+
+    # SERVER_MODE=thread (default, grpc.server + thread pool) | aio (grpc.aio)
+    if os.getenv("SERVER_MODE", "thread").lower() == "aio":
+        asyncio.run(serve_aio(port))
+    else:
+        serve_threaded(port)
+
+
 if __name__ == "__main__":
     logger.info("=" * 40)
     logger.info("🏢 CENTRAL NODE - IoT Analysis Server")
     logger.info("=" * 40)
-    serve()
\ No newline at end of file
+    serve()
@@ -0,0 +1,82 @@
+import pytest
+
+from database.db_handler import BatchWriter
+
+
+class FakeCollection:
+    def __init__(self):
+        self.batches = []
+
+    def insert_many(self, docs, ordered=True):
+        self.batches.append(list(docs))
+
+
+def queued(writer):
+    return [doc["i"] for doc in list(writer._queue.queue)]
+
+
+def test_unknown_policy_rejected():
+    with pytest.raises(ValueError):
+        BatchWriter(FakeCollection(), overflow_policy="lifo")
+    with pytest.raises(ValueError):
+        BatchWriter(FakeCollection(), overflow_policy="spool")
+
+
+def test_drop_newest_rejects_when_full():
+    writer = BatchWriter(FakeCollection(), max_queue=3)
+    results = [writer.submit({"i": i}) for i in range(5)]
+    assert results == [True, True, True, False, False]
+    assert queued(writer) == [0, 1, 2]
+    assert writer.stats()["docs_dropped"] == 2
+    assert writer.stats()["queue_high_watermark"] == 3
+
+
+def test_drop_oldest_keeps_latest():
+    writer = BatchWriter(FakeCollection(), max_queue=3, overflow_policy="drop_oldest")
+    assert all(writer.submit({"i": i}) for i in range(5))
+    assert queued(writer) == [2, 3, 4]
+    stats = writer.stats()
+    assert stats["docs_dropped_oldest"] == 2 and stats["docs_dropped"] == 0
+
+
+def test_block_waits_then_drops():
+    writer = BatchWriter(FakeCollection(), max_queue=1, overflow_policy="block", block_timeout=0.05)
+    assert writer.submit({"i": 0})
+    assert not writer.submit({"i": 1})
+    stats = writer.stats()
+    assert stats["blocked"] == 1 and stats["docs_dropped"] == 1
+    assert stats["blocked_ms_total"] >= 40
+
+
+def test_sample_keeps_one_in_n_above_watermark():
+    writer = BatchWriter(FakeCollection(), max_queue=100, overflow_policy="sample",
+                         sample_every=5, sample_watermark=0.1)
+    accepted = sum(writer.submit({"i": i}) for i in range(60))
+    # 10 pertama di bawah watermark, sisanya 50 -> 1 dari 5
+    assert accepted == 10 + 10
+    assert writer.stats()["docs_sampled_out"] == 40
+
+
+def test_worker_flushes_batches_on_stop():
+    collection = FakeCollection()
+    writer = BatchWriter(collection, batch_size=4, flush_interval=0.01)
+    writer.start()
+    for i in range(10):
+        assert writer.submit({"i": i})
+    writer.stop(timeout=5)
+
+    written = [doc["i"] for batch in collection.batches for doc in batch]
+    assert sorted(written) == list(range(10))
+    assert max(len(batch) for batch in collection.batches) <= 4
+    stats = writer.stats()
+    assert stats["docs_written"] == 10 and stats["queue_depth"] == 0
+
+
+def test_unavailable_without_spool_holds_queue():
+    collection = FakeCollection()
+    writer = BatchWriter(collection, flush_interval=0.01, available=False)
+    writer.start()
+    writer.submit({"i": 0})
+    writer.stop(timeout=0.2)
+    # Mongo belum siap: dokumen tetap di antrian, tidak dibuang
+    assert collection.batches == [] and queued(writer) == [0]
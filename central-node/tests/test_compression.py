@@ -0,0 +1,99 @@
+import threading
+import zlib
+from concurrent import futures
+
+import pytest
+
+from utils.compression import DecompressPool, OrderedStream, compression_label, decompress
+
+
+def test_decompress_roundtrip():
+    raw = b'{"suhu": 21.5}' * 20
+    assert decompress("RAW", raw) == raw
+    assert decompress("GZIP", zlib.compress(raw)) == raw
+
+
+def test_compression_label_safe_for_mongo_paths():
+    assert compression_label("") == "RAW"
+    assert compression_label("ZSTD-19") == "ZSTD-19"
+    assert compression_label("a.b$c") == "a_b_c"
+
+
+def test_pool_default_inflight_scales_with_workers():
+    pool = DecompressPool(mode="inline", workers=3)
+    assert pool.max_inflight == 3 * DecompressPool.INFLIGHT_PER_WORKER
+    assert DecompressPool(mode="inline", workers=3, max_inflight=7).max_inflight == 7
+
+
+def test_pool_rejects_unknown_mode():
+    with pytest.raises(ValueError):
+        DecompressPool(mode="gpu")
+
+
+def test_pool_thread_mode_decompresses():
+    pool = DecompressPool(mode="thread", workers=2)
+    try:
+        raw = b"x" * 1000
+        payload, elapsed_us = pool.submit("GZIP", zlib.compress(raw)).result(timeout=5)
+        assert payload == raw and elapsed_us >= 0
+        assert pool.stats()["submitted"] == 1
+    finally:
+        pool.close()
+
+
+def test_ordered_stream_emits_in_arrival_order():
+    seen = []
+    stream = OrderedStream(lambda ctx, fut: seen.append((ctx, fut.result())) or True)
+    futs = [futures.Future() for _ in range(5)]
+    for i, fut in enumerate(futs):
+        stream.add(fut, i)
+
+    # Selesai terbalik: tidak ada yang boleh diproses sebelum paket 0 selesai
+    for i in (4, 2, 3, 1):
+        futs[i].set_result(i * 10)
+    assert seen == []
+    assert not stream.wait(timeout=0)
+
+    futs[0].set_result(0)
+    assert stream.wait(timeout=1)
+    assert seen == [(i, i * 10) for i in range(5)]
+    assert stream.completed == 5
+
+
+def test_ordered_stream_counts_handler_results_and_survives_errors():
+    def handler(ctx, fut):
+        if ctx == "rusak":
+            raise RuntimeError("handler gagal")
+        return fut.result()
+
+    stream = OrderedStream(handler)
+    for ctx, value in (("batch", 3), ("rusak", 1), ("single", True)):
+        fut = futures.Future()
+        stream.add(fut, ctx)
+        fut.set_result(value)
+    assert stream.wait(timeout=1)
+    assert stream.completed == 4
+
+
+def test_ordered_stream_handler_runs_without_lock():
+    # Handler yang menunggu thread lain menyelesaikan future berikutnya tidak boleh deadlock
+    stream = OrderedStream(lambda ctx, fut: True)
+    first, second = futures.Future(), futures.Future()
+    stream.add(first, 0)
+    stream.add(second, 1)
+    entered = threading.Event()
+
+    def slow_handler(ctx, fut):
+        if ctx == 0:
+            entered.set()
+            worker = threading.Thread(target=second.set_result, args=(None,))
+            worker.start()
+            worker.join(timeout=1)
+            assert not worker.is_alive()
+        return True
+
+    stream.handler = slow_handler
+    first.set_result(None)
+    assert entered.is_set()
+    assert stream.wait(timeout=1)
+    assert stream.completed == 2
@@ -0,0 +1,43 @@
+from database.db_handler import BatchWriter, Database
+
+
+class FakeCollection:
+    def insert_many(self, docs, ordered=True):
+        pass
+
+
+def database(monkeypatch, store):
+    monkeypatch.setenv("PAYLOAD_STORE", store)
+    db = Database()
+    db.writer = BatchWriter(FakeCollection())
+    return db
+
+
+def queued(db):
+    return list(db.writer._queue.queue)
+
+
+def test_payload_codec_tagged_when_stored_payload_differs(monkeypatch):
+    db = database(monkeypatch, "inline")
+    # Reading batch: payload disimpan terdekompresi, compression_type tetap codec wire
+    db.enqueue_sensor_data({"compression_type": "LZ4", "timestamp_kirim": 1.0}, payload=b"raw", payload_codec="RAW")
+    db.enqueue_sensor_data({"compression_type": "LZ4", "timestamp_kirim": 1.0}, payload=b"lz4", payload_codec="LZ4")
+    db.enqueue_sensor_data({"compression_type": "GZIP", "timestamp_kirim": 1.0}, payload=b"gz")
+
+    batch, same, single = queued(db)
+    assert batch["payload_codec"] == "RAW" and batch["raw_data"] == b"raw"
+    assert "payload_codec" not in same and "payload_codec" not in single
+
+
+def test_payload_codec_omitted_without_retained_payload(monkeypatch):
+    db = database(monkeypatch, "none")
+    db.enqueue_sensor_data({"compression_type": "LZ4"}, payload=b"raw", payload_codec="RAW")
+    [doc] = queued(db)
+    assert "payload_codec" not in doc and "raw_data" not in doc
+
+
+def test_blob_store_payload_handed_to_writer(monkeypatch):
+    db = database(monkeypatch, "file")
+    db.enqueue_sensor_data({"compression_type": "ZSTD"}, payload=b"blob", payload_codec="RAW")
+    [doc] = queued(db)
+    assert doc["_payload"] == b"blob" and doc["payload_codec"] == "RAW"
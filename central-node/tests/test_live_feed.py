@@ -0,0 +1,73 @@
+import json
+from datetime import datetime, timezone
+
+from utils.live_feed import LiveFeed
+
+
+def rollup_doc(window=1, count=1):
+    return {
+        "ts": datetime.fromtimestamp(100, tz=timezone.utc), "window": window, "sensor_id": "s1",
+        "compression_type": "LZ4", "count": count, "bytes_sent": 10, "bytes_original": 20,
+        "decompress_us": 1.0, "latency_sum": 2.0, "latency_p95": 2.0, "latency_max": 2.0,
+    }
+
+
+def publish(feed, n):
+    for _ in range(n):
+        feed.publish([rollup_doc(1), rollup_doc(10)], {"LZ4": [1, 10, 20, 1.0]})
+
+
+def parse(chunk):
+    fields = dict(line.split(": ", 1) for line in chunk.strip().split("\n"))
+    return fields.get("event"), json.loads(fields["data"])
+
+
+def test_since_returns_events_after_seq():
+    feed = LiveFeed(maxlen=10)
+    publish(feed, 2)
+    assert feed.publish([], {}) == 3
+    assert [e["seq"] for e in feed.since(1, timeout=0)] == [2, 3]
+    assert feed.since(3, timeout=0) == []
+
+
+def test_since_reports_events_dropped_from_ring():
+    feed = LiveFeed(maxlen=3)
+    publish(feed, 5)
+    assert feed.since(0, timeout=0) is None
+    assert feed.since(1, timeout=0) is None
+    assert [e["seq"] for e in feed.since(2, timeout=0)] == [3, 4, 5]
+
+
+def test_sse_hello_and_window_filter():
+    feed = LiveFeed(maxlen=10, heartbeat=0.01)
+    publish(feed, 2)
+    status, content_type, stream = feed.sse({"since": ["1"], "window": ["10"], "epoch": [feed.epoch]})
+    assert (status, content_type) == (200, "text/event-stream")
+    assert parse(next(stream)) == ("hello", {"epoch": feed.epoch, "seq": 1, "reset": False})
+    _, event = parse(next(stream))
+    assert event["seq"] == 2 and [r["window"] for r in event["rollups"]] == [10]
+    assert event["totals"]["count"] == 1
+    stream.close()
+    assert feed.subscribers == 0
+
+
+def test_sse_new_or_stale_client_resets():
+    feed = LiveFeed(maxlen=10)
+    publish(feed, 2)
+    _, _, stream = feed.sse({})
+    assert parse(next(stream)) == ("hello", {"epoch": feed.epoch, "seq": 2, "reset": True})
+    _, _, stream = feed.sse({"since": ["1"], "epoch": ["epoch-lama"]})
+    assert parse(next(stream))[1]["reset"] is True
+
+
+def test_sse_emits_reset_when_subscriber_falls_behind():
+    feed = LiveFeed(maxlen=2, heartbeat=0.01)
+    publish(feed, 1)
+    _, _, stream = feed.sse({"since": ["0"], "epoch": [feed.epoch]})
+    assert parse(next(stream))[1]["reset"] is False
+    # Subscriber lambat: ring sudah lewat seq berikutnya sebelum sempat dibaca
+    publish(feed, 4)
+    assert parse(next(stream)) == ("reset", {"epoch": feed.epoch, "seq": 5, "reset": True})
+    publish(feed, 1)
+    assert parse(next(stream))[1]["seq"] == 6
+    stream.close()
@@ -0,0 +1,117 @@
+import random
+
+import pytest
+
+from utils.metrics import (
+    LatencyHistogram,
+    LatencyMetrics,
+    MetricsRegistry,
+    WindowedHistogram,
+    bucket_index,
+    bucket_upper,
+    gauges,
+)
+
+
+@pytest.mark.parametrize("value_us", [0, 1, 31, 32, 33, 1000, 12345, 987654, (1 << 31) + 5])
+def test_bucket_contains_value(value_us):
+    idx = bucket_index(value_us)
+    assert value_us < bucket_upper(idx)
+    if idx:
+        assert value_us >= bucket_upper(idx - 1)
+
+
+def test_percentiles_within_bucket_error():
+    rng = random.Random(7)
+    values = [rng.lognormvariate(1.0, 1.2) for _ in range(20000)]
+    hist = LatencyHistogram()
+    for v in values:
+        hist.record(v)
+
+    values.sort()
+    for q, got in zip((50, 95, 99), hist.percentiles((50, 95, 99))):
+        exact = values[int(round(q / 100 * len(values))) - 1]
+        # Batas atas bucket: tidak pernah di bawah nilai asli, error relatif <= 1/16 (+1us)
+        assert exact <= got <= exact * (1 + 1 / 16) + 0.001
+    assert hist.mean() == pytest.approx(sum(values) / len(values))
+
+
+def test_percentiles_capped_by_max_and_empty():
+    hist = LatencyHistogram()
+    assert hist.percentiles((50, 99)) == [0.0, 0.0]
+    hist.record(10.0)
+    assert hist.percentiles((50, 99)) == [10.0, 10.0]
+
+
+def test_merge_and_reset():
+    a, b = LatencyHistogram(), LatencyHistogram()
+    for v in (1.0, 2.0):
+        a.record(v)
+    b.record(50.0)
+    a.merge(b)
+    assert a.count == 3 and a.max_ms == 50.0
+    assert a.percentiles((100,)) == [50.0]
+    a.reset()
+    assert a.count == 0 and a.percentiles((50,)) == [0.0]
+
+
+def test_windowed_histogram_rotates_and_expires():
+    hist = WindowedHistogram(interval=10.0, now=0.0)
+    hist.record(100.0, now=1.0)
+    hist.record(1.0, now=12.0)
+    # Jendela sebelumnya masih ikut dalam snapshot
+    assert hist.snapshot(now=13.0).count == 2
+    # Idle lebih dari satu interval: kedua jendela dibuang, kumulatif tetap
+    assert hist.snapshot(now=40.0).count == 0
+    assert hist.count == 2 and hist.total_ms == 101.0
+
+
+def test_latency_metrics_prometheus_text():
+    metrics = LatencyMetrics(window=60.0)
+    for i in range(10):
+        metrics.record("sensor-1", "LZ4", latency_ms=5.0, proc_ms=0.5, data_size=40, original_size=100,
+                       now=100.0 + i, decompress_us=20.0)
+
+    lines = list(metrics.collect())
+    assert "# TYPE iot_latency_ms summary" in lines
+    assert "# TYPE iot_packets_total counter" in lines
+    assert 'iot_packets_total{sensor_id="sensor-1",compression_type="LZ4"} 10' in lines
+    assert 'iot_latency_ms_count{sensor_id="sensor-1",compression_type="LZ4"} 10' in lines
+    assert any(line.startswith('iot_latency_ms{sensor_id="sensor-1",compression_type="LZ4",quantile="0.99"}')
+               for line in lines)
+    # 600 byte dihemat / 0.2 ms CPU
+    assert 'iot_bytes_saved_per_cpu_ms{compression_type="LZ4"} 3000.000' in lines
+
+    summary = metrics.summary(now=105.0)
+    assert summary["packets"] == 10
+    assert summary["by_type"]["LZ4"]["ratio"] == pytest.approx(0.4)
+
+
+def test_label_values_are_escaped():
+    metrics = LatencyMetrics()
+    metrics.record('a"b\\c', "RAW", 1.0, 0.1, 10, 10, now=0.0)
+    assert 'iot_packets_total{sensor_id="a\\"b\\\\c",compression_type="RAW"} 1' in list(metrics.collect())
+
+
+def test_gauges_exports_counters_with_total_suffix():
+    lines = list(gauges("iot_writer", {"queue_depth": 3, "inserted": 10, "retries_total": 2, "mode": "block",
+                                       "ready": True}, counters=("inserted", "retries_total"), node="a"))
+    assert lines == [
+        "# TYPE iot_writer_queue_depth gauge",
+        'iot_writer_queue_depth{node="a"} 3',
+        "# TYPE iot_writer_inserted_total counter",
+        'iot_writer_inserted_total{node="a"} 10',
+        "# TYPE iot_writer_retries_total counter",
+        'iot_writer_retries_total{node="a"} 2',
+    ]
+
+
+def test_registry_skips_failing_collector():
+    registry = MetricsRegistry()
+
+    def broken():
+        raise RuntimeError("collector rusak")
+
+    registry.register(broken)
+    registry.register(lambda: ["iot_up 1"])
+    assert registry.render() == "iot_up 1\n"
@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from utils.payload import PayloadParser
+
+
+def ndjson(*rows):
+    return b"\n".join(json.dumps(row).encode() for row in rows) + b"\n"
+
+
+def test_uniform_rows_weighted_by_duplicates():
+    parser = PayloadParser()
+    payload = ndjson({"suhu": 20.0, "status": "ok"}, {"suhu": 20.0, "status": "ok"},
+                     {"suhu": 26.0, "status": "panas"})
+    summary = parser.parse(payload)
+    assert summary["n"] == 3 and summary["unique"] == 2
+    assert summary["suhu"] == {"min": 20.0, "max": 26.0, "mean": pytest.approx(22.0)}
+    assert summary["status"] == {"ok": 2, "panas": 1}
+    assert parser.stats() == {"parsed": 1, "failed": 0, "lines": 3, "unique_lines": 2}
+
+
+def test_mixed_schema_and_broken_lines_use_general_path():
+    parser = PayloadParser()
+    payload = ndjson({"suhu": 10, "lembab": 50.0}, {"suhu": 30, "status": "ok"}) + b"{rusak\n[1, 2]\n"
+    summary = parser.parse(payload)
+    # Baris rusak / bukan objek tidak dihitung
+    assert summary["n"] == 2 and summary["unique"] == 4
+    assert summary["suhu"] == {"min": 10, "max": 30, "mean": 20.0}
+    assert summary["lembab"] == {"min": 50.0, "max": 50.0, "mean": 50.0}
+    assert summary["status"] == {"ok": 1}
+
+
+def test_fast_and_general_paths_agree():
+    parser = PayloadParser()
+    rows = [{"suhu": float(i % 7), "tekanan": 1000 + i, "status": "ok" if i % 3 else "cek"} for i in range(50)]
+    unique = list(dict.fromkeys(json.dumps(r).encode() for r in rows))
+    weights = [1] * len(unique)
+    decoded = parser._decode(unique)
+    assert parser._columns_fast(decoded, weights) == pytest.approx(parser._columns(decoded, weights))
+
+
+def test_bool_and_non_categorical_strings_skipped():
+    summary = PayloadParser().parse(ndjson({"aktif": True, "lokasi": "gudang", "suhu": 1}))
+    assert set(summary) == {"n", "unique", "suhu"}
+
+
+def test_category_cap():
+    parser = PayloadParser(max_categories=2)
+    summary = parser.parse(ndjson(*({"status": s} for s in ("a", "b", "c", "a"))))
+    assert summary["status"] == {"a": 2, "b": 1}
+
+
+@pytest.mark.parametrize("payload", [b"", b"\n\n", b"bukan json\n", b"42\n"])
+def test_unparseable_payload_returns_none(payload):
+    parser = PayloadParser()
+    assert parser.parse(payload) is None
+    assert parser.stats()["parsed"] == 0
@@ -0,0 +1,146 @@
+import time
+
+from utils.rollup import RollupAggregator
+
+
+class FlakyStore:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.docs = []
+        self.totals = []
+        self.published = []
+
+    def write_docs(self, docs):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("mongo down")
+        self.docs.extend(docs)
+
+    def write_totals(self, totals, published=None):
+        self.totals.append({k: list(v) for k, v in totals.items()})
+        self.published.append(published)
+
+
+def aggregator(store, **kwargs):
+    return RollupAggregator(store.write_docs, store.write_totals, windows=(10,), **kwargs)
+
+
+def test_closed_windows_written_with_totals():
+    store = FlakyStore()
+    rollup = aggregator(store)
+    rollup.record("s1", "LZ4", ts=100.0, data_size=40, original_size=100, latency_ms=2.0, decompress_us=10.0)
+    rollup.record("s1", "LZ4", ts=105.0, data_size=60, original_size=100, latency_ms=4.0)
+    rollup.flush(force=True)
+
+    [doc] = store.docs
+    assert (doc["window"], doc["ts"].timestamp(), doc["count"]) == (10, 100.0, 2)
+    assert doc["ratio"] == 0.5 and doc["latency_sum"] == 6.0
+    assert store.totals == [{"LZ4": [2, 100, 200, 10.0]}]
+
+
+def test_open_window_not_flushed_until_grace():
+    store = FlakyStore()
+    rollup = aggregator(store, grace=1.0)
+    now = time.time()
+    rollup.record("s1", "RAW", ts=now, data_size=1, original_size=1, latency_ms=1.0)
+    rollup.flush()
+    assert store.docs == [] and rollup.stats()["pending_windows"] == 0
+
+
+def test_failed_write_is_held_merged_and_retried():
+    store = FlakyStore(failures=1)
+    published = []
+    rollup = aggregator(store, publish=lambda docs, totals: published.append(len(docs)) or len(published))
+    rollup.record("s1", "GZIP", ts=100.0, data_size=10, original_size=100, latency_ms=1.0)
+    rollup.flush(force=True)
+    assert store.docs == [] and store.totals == []
+    assert rollup.stats()["pending_windows"] == 1 and rollup.stats()["write_failures"] == 1
+
+    # Paket telat untuk jendela yang sama digabung dengan yang tertunda
+    rollup.record("s1", "GZIP", ts=101.0, data_size=10, original_size=100, latency_ms=3.0)
+    rollup.flush(force=True)
+    [doc] = store.docs
+    assert doc["count"] == 2 and doc["latency_max"] == 3.0
+    assert store.totals == [{"GZIP": [2, 20, 200, 0.0]}]
+    assert rollup.stats()["pending_windows"] == 0
+    # Live feed menerima tiap data baru sekali, retry tidak dikirim ulang
+    assert published == [1, 1]
+    # Seq event yang tercakup dicatat bersama total, setelah rollup tertulis
+    assert store.published == [2]
+
+
+def test_covered_seq_written_even_without_new_totals():
+    store = FlakyStore()
+    seqs = iter(range(1, 10))
+    rollup = aggregator(store, publish=lambda docs, totals: next(seqs))
+    rollup.record("s1", "LZ4", ts=time.time(), data_size=1, original_size=1, latency_ms=1.0)
+    # Jendela masih terbuka: event 1 hanya berisi total
+    rollup.flush()
+    assert store.docs == [] and store.published == [1]
+    # Jendela ditutup tanpa paket baru: event 2 hanya berisi rollup, seq tetap dicatat
+    rollup.flush(force=True)
+    assert len(store.docs) == 1
+    assert store.totals[-1] == {} and store.published == [1, 2]
+    # Tidak ada data baru: tidak ada tulis ulang
+    rollup.flush(force=True)
+    assert store.published == [1, 2]
+
+
+def test_retry_waits_for_backoff():
+    store = FlakyStore(failures=1)
+    rollup = aggregator(store, flush_interval=60.0)
+    rollup.record("s1", "LZ4", ts=100.0, data_size=1, original_size=1, latency_ms=1.0)
+    rollup.flush(force=True)
+    rollup.flush()
+    assert store.docs == [] and rollup.stats()["write_failures"] == 1
+    rollup._retry_at = 0.0
+    rollup.flush()
+    assert len(store.docs) == 1
+
+
+def test_unavailable_store_skips_writes():
+    store = FlakyStore()
+    up = [False]
+    rollup = aggregator(store, available=lambda: up[0])
+    rollup.record("s1", "LZ4", ts=100.0, data_size=1, original_size=1, latency_ms=1.0)
+    rollup.flush()
+    assert store.docs == [] and rollup.stats()["write_failures"] == 0
+    up[0] = True
+    rollup.flush()
+    assert len(store.docs) == 1
+
+
+def test_pending_capped_drops_oldest_windows():
+    store = FlakyStore(failures=100)
+    rollup = aggregator(store, max_pending=2)
+    for ts in (100.0, 110.0, 120.0, 130.0):
+        rollup.record("s1", "LZ4", ts=ts, data_size=1, original_size=1, latency_ms=1.0)
+    rollup.flush(force=True)
+    assert rollup.stats()["dropped_windows"] == 2
+
+    store.failures = 0
+    rollup.flush(force=True)
+    assert sorted(d["ts"].timestamp() for d in store.docs) == [120.0, 130.0]
+    # Total tidak ikut dibuang
+    assert store.totals == [{"LZ4": [4, 4, 4, 0.0]}]
+
+
+def test_rejected_write_is_dropped_not_retried():
+    store = FlakyStore()
+    calls = []
+
+    def reject_totals(totals, published=None):
+        calls.append(totals)
+        raise ValueError("path by_type tidak valid")
+
+    rollup = RollupAggregator(store.write_docs, reject_totals, windows=(10,))
+    rollup.record("s1", "LZ4", ts=100.0, data_size=1, original_size=1, latency_ms=1.0)
+    rollup.flush(force=True)
+    # Jendela tetap tertulis; total yang ditolak dibuang, tidak menahan flush berikutnya
+    assert len(store.docs) == 1
+    stats = rollup.stats()
+    assert stats["rejected_totals"] == 1 and stats["write_failures"] == 0
+
+    rollup.record("s1", "LZ4", ts=110.0, data_size=1, original_size=1, latency_ms=1.0)
+    rollup.flush(force=True)
+    assert [t["LZ4"][0] for t in calls] == [1, 1]
@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+
+from proto import HealthStatus, SensorBatch, SensorData
+from router import ReplicaSet, peek_sensor_id
+
+
+def test_peek_sensor_id_from_messages():
+    data = SensorData(sensor_id="suhu-01", timestamp=1.5, compression_type="LZ4", data=b"\x00" * 300, seq=9)
+    assert peek_sensor_id(data.SerializeToString()) == "suhu-01"
+    batch = SensorBatch(sensor_id="batch-7", timestamps=[1.0, 2.0], lengths=[3, 4], data=b"abcdefg")
+    assert peek_sensor_id(batch.SerializeToString()) == "batch-7"
+
+
+def test_peek_sensor_id_skips_other_wire_types():
+    # Field 1 setelah varint (seq), fixed64 (timestamp), length-delimited (data) dan fixed32
+    head = SensorData(seq=300, timestamp=2.0, data=b"x" * 200).SerializeToString()
+    key = 99 << 3 | 5
+    fixed32 = bytes([key & 0x7F | 0x80, key >> 7]) + b"\x01\x02\x03\x04"
+    tail = SensorData(sensor_id="lambat").SerializeToString()
+    assert peek_sensor_id(head + fixed32 + tail) == "lambat"
+
+
+def test_peek_sensor_id_missing():
+    assert peek_sensor_id(b"") == ""
+    assert peek_sensor_id(SensorData(timestamp=1.0).SerializeToString()) == ""
+
+
+def replicas(*addresses, down=()):
+    rs = ReplicaSet([])
+    for address in addresses:
+        rs.backends[address] = SimpleNamespace(address=address, ready=address not in down, status=None)
+    return rs
+
+
+def test_rendezvous_is_stable_and_spreads():
+    sensors = [f"sensor-{i}" for i in range(300)]
+    rs = replicas("a:1", "b:1", "c:1")
+    owners = {s: rs.pick(s).address for s in sensors}
+    assert owners == {s: rs.pick(s).address for s in sensors}
+    counts = {a: list(owners.values()).count(a) for a in ("a:1", "b:1", "c:1")}
+    assert min(counts.values()) > 50
+
+
+def test_rendezvous_moves_only_lost_replica_sensors():
+    sensors = [f"sensor-{i}" for i in range(300)]
+    before = {s: replicas("a:1", "b:1", "c:1").pick(s).address for s in sensors}
+    after_rs = replicas("a:1", "b:1", "c:1", down=("b:1",))
+    for s in sensors:
+        after = after_rs.pick(s).address
+        if before[s] != "b:1":
+            assert after == before[s]
+        else:
+            assert after != "b:1"
+
+
+def test_pick_without_ready_replica():
+    assert replicas().pick("x") is None
+    assert replicas("a:1", down=("a:1",)).pick("x") is None
+
+
+def test_health_aggregates_replicas():
+    rs = replicas("a:1", "b:1", "c:1", down=("c:1",))
+    rs.backends["a:1"].status = HealthStatus(ready=True, active_streams=2, received=10, queue_depth=1)
+    rs.backends["b:1"].status = HealthStatus(ready=True, active_streams=3, received=5, queue_depth=4)
+    health = rs.health()
+    assert health.ready and health.replica_id == "router[2/3]"
+    assert (health.active_streams, health.received, health.queue_depth) == (5, 15, 5)
@@ -0,0 +1,95 @@
+import pytest
+
+from utils.sequence import SequenceTracker
+
+
+def observe_all(tracker, seqs, mode="LZ4", sensor="s1", size=100, now=0.0):
+    return [tracker.observe(sensor, mode, seq, size, now=now) for seq in seqs]
+
+
+def test_in_order_no_loss():
+    tracker = SequenceTracker()
+    assert set(observe_all(tracker, range(1, 11))) == {SequenceTracker.NEW}
+    stats = tracker.summary(now=1.0)["LZ4"]
+    assert (stats["delivered"], stats["lost"], stats["loss_rate"]) == (10, 0, 0.0)
+
+
+def test_gap_counts_loss():
+    tracker = SequenceTracker()
+    observe_all(tracker, [1, 2, 5, 6])
+    stats = tracker.summary(now=1.0)["LZ4"]
+    assert stats["delivered"] == 4 and stats["lost"] == 2
+    assert stats["loss_rate"] == pytest.approx(2 / 6)
+
+
+def test_late_reading_fills_gap_and_duplicates_ignored():
+    tracker = SequenceTracker()
+    statuses = observe_all(tracker, [1, 4, 2, 2, 4])
+    assert statuses == ["new", "new", "reordered", "duplicate", "duplicate"]
+    stats = tracker.summary(now=1.0)["LZ4"]
+    assert (stats["delivered"], stats["lost"], stats["reordered"], stats["duplicates"]) == (3, 1, 1, 2)
+
+
+def test_late_reading_refunds_mode_that_saw_gap():
+    tracker = SequenceTracker()
+    observe_all(tracker, [1], mode="RAW")
+    observe_all(tracker, [3], mode="GZIP")
+    # Seq 2 datang belakangan lewat mode lain: loss dikembalikan ke GZIP yang mencatat gap
+    observe_all(tracker, [2], mode="RAW")
+    summary = tracker.summary(now=1.0)
+    assert summary["GZIP"]["lost"] == 0
+    assert summary["RAW"]["reordered"] == 1 and summary["RAW"]["delivered"] == 2
+
+
+def test_sensors_tracked_independently():
+    tracker = SequenceTracker()
+    observe_all(tracker, [1, 2, 3], sensor="a")
+    observe_all(tracker, [10, 11], sensor="b")
+    assert tracker.summary(now=1.0)["LZ4"]["lost"] == 0
+
+
+def test_restart_detected():
+    tracker = SequenceTracker(window=8)
+    observe_all(tracker, [1, 2, 3, 4])
+    # Edge restart: counter mulai lagi dari 1
+    assert tracker.observe("s1", "LZ4", 1, 100, now=0.0) == SequenceTracker.RESET
+    assert tracker.observe("s1", "LZ4", 2, 100, now=0.0) == SequenceTracker.NEW
+    observe_all(tracker, range(3, 30))
+    # Jauh di belakang jendela juga dianggap restart
+    assert tracker.observe("s1", "LZ4", 5, 100, now=0.0) == SequenceTracker.RESET
+    assert tracker.resets == 2
+
+
+def test_gap_beyond_window_not_refunded():
+    tracker = SequenceTracker(window=4)
+    observe_all(tracker, [1, 3, 10])
+    assert tracker.summary(now=1.0)["LZ4"]["lost"] == 1 + 6
+    # Seq 2 sudah di luar jendela: restart, bukan reorder
+    assert tracker.observe("s1", "LZ4", 2, 100, now=0.0) == SequenceTracker.RESET
+
+
+def test_goodput_over_rate_window():
+    tracker = SequenceTracker(rate_window=10.0)
+    for i in range(1, 21):
+        tracker.observe("s1", "ZSTD", i, 500, now=i * 0.5)
+    observe_all(tracker, [25], mode="ZSTD", size=500, now=10.0)
+    stats = tracker.summary(now=10.0)["ZSTD"]
+    assert stats["goodput_msgs_per_s"] == pytest.approx(21 / 9.5)
+    assert stats["goodput_bytes_per_s"] == pytest.approx(21 * 500 / 9.5)
+    assert stats["window_loss_rate"] == pytest.approx(4 / 25)
+
+    # Idle lebih dari dua jendela: laju kembali nol, total tetap
+    tracker.observe("s1", "ZSTD", 26, 500, now=100.0)
+    stats = tracker.summary(now=100.0)["ZSTD"]
+    assert stats["goodput_msgs_per_s"] == 1.0 and stats["window_loss_rate"] == 0.0
+    assert stats["delivered"] == 22 and stats["lost"] == 4
+
+
+def test_collect_prometheus_text():
+    tracker = SequenceTracker()
+    observe_all(tracker, [1, 3], mode="GZIP")
+    lines = list(tracker.collect())
+    assert "# TYPE iot_seq_delivered_total counter" in lines
+    assert 'iot_seq_delivered_total{compression_type="GZIP"} 2' in lines
+    assert 'iot_seq_lost{compression_type="GZIP"} 1' in lines
+    assert "iot_seq_sensors 1" in lines and "iot_seq_resets_total 0" in lines
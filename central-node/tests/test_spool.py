@@ -0,0 +1,158 @@
+import time
+
+import bson
+
+from database.db_handler import BatchWriter
+from database.spool import HEADER, DiskSpool, SpoolReplayer
+
+
+def docs(start, n):
+    return [{"sensor_id": "s", "i": i} for i in range(start, start + n)]
+
+
+def drain(spool, limit=1000):
+    out = []
+    while True:
+        batch, token = spool.peek(limit)
+        if not batch:
+            return out
+        out.extend(doc["i"] for doc in batch)
+        spool.commit(token)
+
+
+def test_append_peek_commit(tmp_path):
+    spool = DiskSpool(str(tmp_path), segment_bytes=4096)
+    assert spool.append_many(docs(0, 5)) == 5
+
+    batch, token = spool.peek(3)
+    assert [d["i"] for d in batch] == [0, 1, 2]
+    # Tanpa commit, peek mengulang batch yang sama (replay at-least-once)
+    assert [d["i"] for d in spool.peek(3)[0]] == [0, 1, 2]
+    spool.commit(token)
+    assert drain(spool) == [3, 4]
+    assert spool.stats()["pending"] == 0 and spool.stats()["replayed"] == 5
+    spool.close()
+
+
+def test_reopen_resumes_from_cursor(tmp_path):
+    spool = DiskSpool(str(tmp_path), segment_bytes=4096)
+    spool.append_many(docs(0, 6))
+    _, token = spool.peek(4)
+    spool.commit(token)
+    spool.close()
+
+    spool = DiskSpool(str(tmp_path), segment_bytes=4096)
+    assert spool.pending == 2
+    assert drain(spool) == [4, 5]
+    spool.close()
+
+
+def test_torn_record_is_discarded_on_recovery(tmp_path):
+    spool = DiskSpool(str(tmp_path), segment_bytes=4096)
+    spool.append_many(docs(0, 3))
+    segment = spool._segments[-1]
+    # Crash di tengah tulis record terakhir: payload tidak cocok dengan CRC di header
+    last = segment.tail - 1
+    segment.map[last] ^= 0xFF
+    spool.close()
+
+    spool = DiskSpool(str(tmp_path), segment_bytes=4096)
+    assert spool.pending == 2
+    # Record baru menimpa sisa record rusak, tidak tercampur dengan data lama
+    spool.append_many(docs(10, 1))
+    spool.close()
+    spool = DiskSpool(str(tmp_path), segment_bytes=4096)
+    assert drain(spool) == [0, 1, 10]
+    spool.close()
+
+
+def test_rotation_and_size_cap_drop_oldest_segment(tmp_path):
+    # append_many menambahkan _id (ObjectId) sebelum encode
+    record = HEADER.size + len(bson.encode({"_id": bson.ObjectId(), **docs(0, 1)[0]}))
+    per_segment = (1024 - HEADER.size) // record
+    spool = DiskSpool(str(tmp_path), max_bytes=2048, segment_bytes=1024)
+
+    spool.append_many(docs(0, per_segment * 3))
+    stats = spool.stats()
+    assert stats["segments"] == 2
+    assert stats["dropped"] == per_segment
+    assert stats["pending"] == per_segment * 2
+    assert drain(spool) == list(range(per_segment, per_segment * 3))
+    spool.close()
+
+
+def test_oversized_doc_rejected(tmp_path):
+    spool = DiskSpool(str(tmp_path), segment_bytes=1024)
+    assert not spool.append({"blob": b"x" * 2048})
+    assert spool.stats()["rejected"] == 1 and spool.pending == 0
+    spool.close()
+
+
+class FakeCollection:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.docs = []
+
+    def insert_many(self, batch, ordered=True):
+        if self.fail:
+            raise ConnectionError("mongo down")
+        self.docs.extend(batch)
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_writer_spools_overflow_and_outage(tmp_path):
+    spool = DiskSpool(str(tmp_path), segment_bytes=1 << 16)
+    writer = BatchWriter(FakeCollection(), max_queue=2, overflow_policy="spool", spool=spool)
+    assert all(writer.submit(doc) for doc in docs(0, 4))
+    assert writer.queue_depth() == 2 and spool.pending == 2
+
+    writer.set_available(False)
+    assert writer.submit(docs(4, 1)[0])
+    assert writer.stats()["docs_spooled"] == 3
+    assert drain(spool) == [2, 3, 4]
+    spool.close()
+
+
+def test_failed_flush_goes_to_spool_and_replays(tmp_path):
+    spool = DiskSpool(str(tmp_path), segment_bytes=1 << 16)
+    collection = FakeCollection(fail=True)
+    writer = BatchWriter(collection, batch_size=10, flush_interval=0.01, overflow_policy="spool", spool=spool)
+    writer.offload_spool()
+    writer.start()
+    for doc in docs(0, 5):
+        writer.submit(doc)
+    assert wait_for(lambda: not writer.available and spool.pending == 5)
+
+    # Mongo pulih: replayer menguras spool ke collection
+    collection.fail = False
+    replayer = SpoolReplayer(spool, writer, probe=lambda: None, batch_size=2, interval=0.01)
+    replayer.start()
+    assert wait_for(lambda: spool.pending == 0)
+    replayer.stop()
+    writer.stop(timeout=5)
+
+    assert writer.available
+    assert sorted(doc["i"] for doc in collection.docs) == list(range(5))
+    assert writer.stats()["docs_replayed"] == 5
+    spool.close()
+
+
+def test_spooled_docs_keep_id_across_replay(tmp_path):
+    spool = DiskSpool(str(tmp_path), segment_bytes=4096)
+    doc = {"sensor_id": "s", "i": 0}
+    spool.append(doc)
+    first, _ = spool.peek(10)
+    # Crash sebelum commit: replay berikutnya membawa _id yang sama
+    spool.close()
+    spool = DiskSpool(str(tmp_path), segment_bytes=4096)
+    again, _ = spool.peek(10)
+    assert first[0]["_id"] == again[0]["_id"] == doc["_id"]
+    spool.close()
@@ -0,0 +1,407 @@
+"""Benchmark kapasitas ingest central node, in-process tanpa Docker/Pumba.
+
+Jalankan dari /app (atau direktori central-node):
+    python -m tools.bench_ingest --streams 8 --rate 0 --duration 20 --mix RAW:1,LZ4:1,GZIP:1
+
+DataTransferService dijalankan di proses ini (gRPC loopback) dengan sink
+Mongo in-memory (--db memory, default) atau MongoDB sungguhan (--db mongo,
+pakai DB_HOST/DB_PORT/DB_NAME). Klien sintetis membuka satu channel per
+stream, payload ala edge node (NDJSON) di-encode di awal supaya biaya
+kompresi tidak ikut membebani klien. Hasil disimpan sebagai JSON untuk
+dibandingkan antar perubahan.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from concurrent import futures
+from datetime import datetime
+
+import grpc
+import lz4.frame
+
+import server as srv
+from database import Database
+from database.db_handler import BatchWriter
+from proto import SensorData, add_DataTransferServicer_to_server
+from proto import iot_pb2_grpc
+from utils import DecompressPool, LatencyMetrics, StageTimings, setup_logger
+
+logger = setup_logger()
+
+QUANTILES = (50, 90, 95, 99, 99.9)
+
+
+class _NullCollection:
+    """Pengganti koleksi Mongo: hanya menghitung operasi tulis"""
+
+    def __init__(self):
+        self.inserted = 0
+        self.updates = 0
+        self._lock = threading.Lock()
+
+    def insert_many(self, docs, ordered=True):
+        with self._lock:
+            self.inserted += len(docs)
+
+    def bulk_write(self, ops, ordered=True):
+        with self._lock:
+            self.updates += len(ops)
+
+    def update_one(self, *args, **kwargs):
+        with self._lock:
+            self.updates += 1
+
+
+class MemoryDatabase(Database):
+    """Database tanpa MongoDB: BatchWriter asli, koleksi diganti _NullCollection"""
+
+    def connect(self):
+        self.payload_store = "none"
+        self.collection = _NullCollection()
+        self.rollups = _NullCollection()
+        self.totals = _NullCollection()
+        self.writer = BatchWriter(
+            self.collection,
+            batch_size=self.batch_size,
+            flush_interval=self.batch_interval,
+            max_queue=self.batch_queue,
+            workers=self.writer_workers,
+            overflow_policy=self.overflow_policy,
+            block_timeout=self.block_timeout,
+            sample_every=self.sample_every,
+            sample_watermark=self.sample_watermark,
+        )
+        self.writer.start()
+        # "Mongo" in-memory selalu siap (Health ready)
+        self.mongo_ready.set()
+
+    def close(self):
+        if self.writer:
+            self.writer.stop()
+            self.writer = None
+
+
+class InProcessServer:
+    """DataTransferService (thread / aio) di port loopback acak"""
+
+    def __init__(self, db: Database, mode: str, decompressor: DecompressPool, workers: int):
+        self.db = db
+        self.mode = mode
+        self.decompressor = decompressor
+        self.workers = workers
+        self.service = None
+        self.port = None
+        self._server = None
+        self._loop = None
+        self._stop_event = None
+        self._thread = None
+
+    def start(self) -> int:
+        if self.mode == "aio":
+            ready = threading.Event()
+            self._loop = asyncio.new_event_loop()
+
+            async def main():
+                self._server = grpc.aio.server()
+                self.service = srv.AsyncDataTransferService(self.db, self.decompressor)
+                add_DataTransferServicer_to_server(self.service, self._server)
+                self.port = self._server.add_insecure_port("localhost:0")
+                await self._server.start()
+                self._stop_event = asyncio.Event()
+                ready.set()
+                await self._stop_event.wait()
+                await self._server.stop(1)
+
+            self._thread = threading.Thread(
+                target=self._loop.run_until_complete, args=(main(),), name="bench-aio", daemon=True
+            )
+            self._thread.start()
+            ready.wait()
+        else:
+            self._server = grpc.server(futures.ThreadPoolExecutor(max_workers=self.workers))
+            self.service = srv.DataTransferService(self.db, self.decompressor)
+            add_DataTransferServicer_to_server(self.service, self._server)
+            self.port = self._server.add_insecure_port("localhost:0")
+            self._server.start()
+        return self.port
+
+    def stop(self):
+        if self.mode == "aio":
+            self._loop.call_soon_threadsafe(self._stop_event.set)
+            self._thread.join(5)
+        else:
+            self._server.stop(1).wait()
+        self.service.close()
+
+
+def parse_mix(text: str) -> list:
+    """"RAW:2,LZ4:1" -> [("RAW", 2.0), ("LZ4", 1.0)]"""
+    mix = []
+    for part in text.split(","):
+        name, _, weight = part.strip().partition(":")
+        mix.append((name.strip().upper(), float(weight or 1)))
+    return mix
+
+
+def make_payload(rng: random.Random, size: int, sensor_id: str) -> bytes:
+    """Payload NDJSON seperti services/sensor.go (ukuran mendekati `size`)"""
+    lines = []
+    total = 0
+    while total < size:
+        line = f'{{"id":"{sensor_id}","temp":{rng.random() * 100:.2f},"vibration":{rng.random() * 10:.4f},"status":"OK"}}\n'
+        lines.append(line)
+        total += len(line)
+    return "".join(lines).encode()
+
+
+def encode(compression_type: str, payload: bytes) -> bytes:
+    if compression_type == "RAW":
+        return payload
+    if compression_type == "LZ4":
+        return lz4.frame.compress(payload)
+    if compression_type == "GZIP":
+        return zlib.compress(payload)
+    if compression_type.startswith("ZSTD"):
+        import zstandard
+
+        _, _, level = compression_type.partition("-")
+        return zstandard.ZstdCompressor(level=int(level or 3)).compress(payload)
+    raise ValueError(f"Kompresi tidak didukung benchmark: {compression_type}")
+
+
+def build_corpus(args, mix: list) -> dict:
+    """Varian payload ter-encode per tipe kompresi (dipakai bergiliran oleh klien)"""
+    rng = random.Random(args.seed)
+    corpus = {}
+    for ct, _ in mix:
+        corpus[ct] = [encode(ct, make_payload(rng, args.payload_size, "Bench-Node")) for _ in range(args.variants)]
+    return corpus
+
+
+class Client:
+    """Satu stream sintetis: laju tetap (--rate) atau secepatnya (--rate 0)"""
+
+    def __init__(self, idx: int, port: int, args, mix: list, corpus: dict, deadline: float):
+        self.sensor_id = f"Bench-{idx:03d}"
+        self.port = port
+        self.rate = args.rate
+        self.deadline = deadline
+        self.corpus = corpus
+        self.rng = random.Random(args.seed * 1000 + idx)
+        self.types = [ct for ct, _ in mix]
+        self.weights = [w for _, w in mix]
+        self.drop_rate = args.drop_rate
+        self.seq = 0
+        self.dropped = 0
+        self.sent = 0
+        self.bytes_sent = 0
+        self.response = None
+        self.error = None
+
+    def _messages(self):
+        start = time.monotonic()
+        while True:
+            now = time.monotonic()
+            if time.time() >= self.deadline:
+                return
+            if self.rate > 0:
+                # Jadwal absolut supaya laju tidak melorot karena overhead
+                due = start + self.sent / self.rate
+                if due > now:
+                    time.sleep(due - now)
+            ct = self.rng.choices(self.types, self.weights)[0]
+            data = self.rng.choice(self.corpus[ct])
+            self.seq += 1
+            if self.drop_rate and self.rng.random() < self.drop_rate:
+                # Seperti edge saat channel penuh: seq tetap dipakai, reading tidak dikirim
+                self.dropped += 1
+                continue
+            self.sent += 1
+            self.bytes_sent += len(data)
+            yield SensorData(
+                sensor_id=self.sensor_id, timestamp=time.time(), compression_type=ct, data=data, seq=self.seq
+            )
+
+    def run(self):
+        try:
+            with grpc.insecure_channel(f"localhost:{self.port}") as channel:
+                self.response = iot_pb2_grpc.DataTransferStub(channel).SendStream(self._messages())
+        except Exception as exc:
+            self.error = str(exc)
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except Exception:
+        return ""
+
+
+def run_benchmark(args) -> dict:
+    mix = parse_mix(args.mix)
+    corpus = build_corpus(args, mix)
+
+    # Laporan CSV/Parquet ditulis ke direktori sementara (tetap ikut hot path)
+    tmpdir = tempfile.TemporaryDirectory(prefix="bench-ingest-")
+    srv.CSV_FILE = os.path.join(tmpdir.name, "analisis_latensi.csv")
+
+    db = MemoryDatabase() if args.db == "memory" else Database()
+    db.connect()
+
+    decompressor = DecompressPool(mode=args.decompress, workers=args.decompress_workers, max_inflight=args.max_inflight)
+    server = InProcessServer(db, args.server, decompressor, args.grpc_workers)
+    port = server.start()
+    service = server.service
+    logger.info(
+        f"🏁 Benchmark: {args.streams} stream x {args.rate or 'maks'} msg/s, payload ~{args.payload_size}B, "
+        f"mix {args.mix}, server {args.server}, dekompresi {decompressor.mode}x{decompressor.workers}"
+    )
+
+    started = time.time()
+    deadline = started + args.warmup + args.duration
+    clients = [Client(i, port, args, mix, corpus, deadline) for i in range(args.streams)]
+    threads = [threading.Thread(target=c.run, name=f"bench-client-{c.sensor_id}", daemon=True) for c in clients]
+    for t in threads:
+        t.start()
+
+    # Warmup dibuang: metrik diganti baru, window cukup panjang untuk seluruh run
+    time.sleep(args.warmup)
+    service.latency = LatencyMetrics(window=args.duration * 10 + 60)
+    service.stages = StageTimings(window=args.duration * 10 + 60)
+    rss_start = _rss_bytes()
+    cpu_start = time.process_time()
+    measure_start = time.time()
+
+    rss_peak_sampled = rss_start
+    while any(t.is_alive() for t in threads):
+        rss_peak_sampled = max(rss_peak_sampled, _rss_bytes())
+        time.sleep(0.2)
+    elapsed = time.time() - measure_start
+    cpu_s = time.process_time() - cpu_start
+
+    summary = service.latency.summary()
+    sequence = service.sequences.summary()
+    stages = service.stages.snapshot()
+    server.stop()
+    db_stats = db.writer_stats()
+    db.close()
+    tmpdir.cleanup()
+
+    packets = summary["packets"]
+    proc_q = summary["proc"].percentiles(QUANTILES)
+    lat_q = summary["latency"].percentiles(QUANTILES)
+    errors = [c.error for c in clients if c.error]
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "config": vars(args),
+        "results": {
+            "elapsed_s": elapsed,
+            "messages": packets,
+            "messages_per_s": packets / elapsed if elapsed else 0.0,
+            "mb_per_s_wire": summary["bytes_sent"] / elapsed / 1e6 if elapsed else 0.0,
+            "mb_per_s_original": summary["bytes_original"] / elapsed / 1e6 if elapsed else 0.0,
+            # Rasio, dekompresi rata-rata (us) & byte dihemat per ms CPU tiap mode
+            "modes": summary["by_type"],
+            "client_sent_total": sum(c.sent for c in clients),
+            "client_dropped_total": sum(c.dropped for c in clients),
+            # Goodput (reading unik yang sampai) vs loss per mode, dari seq per sensor
+            "sequence": sequence,
+            "server_recorded_total": service.recorded_count,
+            "proc_ms": {f"p{q:g}": v for q, v in zip(QUANTILES, proc_q)} | {"mean": summary["proc"].mean(), "max": summary["proc"].max_ms},
+            "latency_ms": {f"p{q:g}": v for q, v in zip(QUANTILES, lat_q)} | {"mean": summary["latency"].mean(), "max": summary["latency"].max_ms},
+            "stages_ms": stages,
+            "cpu_s": cpu_s,
+            "cpu_util": cpu_s / elapsed if elapsed else 0.0,
+            "memory": {
+                "rss_start_mb": rss_start / 1e6,
+                "rss_peak_mb": rss_peak_sampled / 1e6,
+                # ru_maxrss dalam KB di Linux; children = worker process pool
+                "maxrss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3,
+                "maxrss_children_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1e3,
+            },
+            "db_writer": db_stats,
+            "decompress": decompressor.stats(),
+            "client_errors": errors,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--streams", type=int, default=4, help="jumlah stream/klien paralel")
+    parser.add_argument("--rate", type=float, default=0, help="pesan/detik per stream (0 = secepatnya)")
+    parser.add_argument("--payload-size", type=int, default=2048, help="ukuran payload asli (bytes)")
+    parser.add_argument("--mix", default="RAW:1,LZ4:1,GZIP:1", help="bobot tipe kompresi, mis. RAW:2,LZ4:1")
+    parser.add_argument("--duration", type=float, default=10, help="durasi pengukuran (detik)")
+    parser.add_argument("--warmup", type=float, default=2, help="pemanasan yang tidak diukur (detik)")
+    parser.add_argument("--server", choices=("thread", "aio"), default="thread")
+    parser.add_argument("--grpc-workers", type=int, default=int(os.getenv("GRPC_WORKERS", "10")))
+    parser.add_argument("--decompress", choices=("inline", "thread", "process"), default="thread")
+    parser.add_argument("--decompress-workers", type=int, default=0, help="0 = jumlah CPU")
+    parser.add_argument("--max-inflight", type=int, default=0, help="0 = 4 x worker dekompresi")
+    parser.add_argument("--db", choices=("memory", "mongo"), default="memory")
+    parser.add_argument("--drop-rate", type=float, default=0, help="fraksi reading yang dibuang klien (uji deteksi loss)")
+    parser.add_argument("--variants", type=int, default=64, help="jumlah variasi payload per tipe")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="", help="file JSON hasil (default bench_results/ingest-<waktu>.json)")
+    parser.add_argument("--verbose", action="store_true", help="tampilkan log per-paket dari server")
+    args = parser.parse_args()
+
+    if args.streams > args.grpc_workers and args.server == "thread":
+        # Satu stream memegang satu worker gRPC selama RPC berlangsung
+        parser.error(f"--streams ({args.streams}) melebihi --grpc-workers ({args.grpc_workers})")
+    if not args.verbose:
+        logging.getLogger("central-node").setLevel(logging.WARNING)
+
+    result = run_benchmark(args)
+    logger.setLevel(logging.INFO)
+
+    out = args.out or os.path.join("bench_results", f"ingest-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(result, f, indent=2, default=str)
+
+    r = result["results"]
+    logger.info(
+        f"📊 {r['messages_per_s']:.0f} msg/s | {r['mb_per_s_wire']:.2f} MB/s wire "
+        f"({r['mb_per_s_original']:.2f} MB/s asli) | proc p50 {r['proc_ms']['p50']:.3f}ms "
+        f"p99 {r['proc_ms']['p99']:.3f}ms | RSS puncak {r['memory']['rss_peak_mb']:.0f}MB"
+    )
+    if r["client_errors"]:
+        logger.error(f"❌ {len(r['client_errors'])} klien gagal: {r['client_errors'][0]}")
+    logger.info(f"💾 Hasil disimpan: {out}")
+    if r["client_errors"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
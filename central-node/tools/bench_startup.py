@@ -0,0 +1,168 @@
+"""Benchmark cold start central node: proses baru -> port terbuka -> paket pertama diterima.
+
+Jalankan dari /app (atau direktori central-node):
+    python -m tools.bench_startup --runs 5 --server thread
+
+Tiap run menjalankan `python server.py` sebagai proses baru (laporan, spool &
+dictionary di direktori sementara) lalu mengukur dari sisi klien:
+  port_ms   - channel gRPC pertama kali connect
+  accept_ms - SendStream berisi satu paket RAW selesai dengan success=True
+  ready_ms  - RPC Health melaporkan ready
+Milestone versi server (iot_startup_*_ms) diambil dari /metrics. Tanpa MongoDB
+yang terjangkau (DB_HOST/DB_PORT) server berjalan di atas spool disk.
+"""
+import argparse
+import json
+import logging
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime
+
+import grpc
+
+from proto import SensorData, HealthRequest, DataTransferStub
+from utils import setup_logger
+
+logger = setup_logger()
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _server_milestones(metrics_port: int) -> dict:
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{metrics_port}/metrics", timeout=2) as resp:
+            text = resp.read().decode()
+    except OSError:
+        return {}
+    out = {}
+    for line in text.splitlines():
+        if line.startswith("iot_startup_"):
+            name, value = line.split()
+            out[name[len("iot_startup_"):]] = float(value)
+    return out
+
+
+def run_once(args, workdir: str) -> dict:
+    grpc_port, metrics_port = _free_port(), _free_port()
+    env = dict(
+        os.environ,
+        GRPC_PORT=str(grpc_port),
+        METRICS_PORT=str(metrics_port),
+        SERVER_MODE=args.server,
+        REPORT_PATH=os.path.join(workdir, "analisis_latensi.csv"),
+        SPOOL_DIR=os.path.join(workdir, "spool"),
+        ZSTD_DICT_DIR=os.path.join(workdir, "zstd_dicts"),
+        DB_HOST=args.db_host,
+        DB_PORT=str(args.db_port),
+        DB_SERVER_SELECTION_TIMEOUT_MS=os.getenv("DB_SERVER_SELECTION_TIMEOUT_MS", "1000"),
+        DB_OVERFLOW_POLICY=os.getenv("DB_OVERFLOW_POLICY", "spool"),
+    )
+
+    log = open(os.path.join(workdir, "server.log"), "ab")
+    start = time.monotonic()
+    proc = subprocess.Popen([sys.executable, "server.py"], cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    result = {}
+    # Backoff reconnect default (1 detik) akan mendominasi pengukuran port
+    channel = grpc.insecure_channel(f"127.0.0.1:{grpc_port}", options=[
+        ("grpc.initial_reconnect_backoff_ms", 10),
+        ("grpc.min_reconnect_backoff_ms", 10),
+        ("grpc.max_reconnect_backoff_ms", 20),
+    ])
+    try:
+        grpc.channel_ready_future(channel).result(timeout=args.timeout)
+        result["port_ms"] = (time.monotonic() - start) * 1000
+
+        stub = DataTransferStub(channel)
+        packet = SensorData(sensor_id="bench-startup", timestamp=time.time(), data=b'{"temp": 1}',
+                            compression_type="RAW")
+        response = stub.SendStream(iter([packet]), timeout=args.timeout)
+        if not response.success:
+            raise RuntimeError(response.message)
+        result["accept_ms"] = (time.monotonic() - start) * 1000
+
+        deadline = start + args.timeout
+        while not stub.Health(HealthRequest(), timeout=args.timeout).ready:
+            if time.monotonic() > deadline:
+                raise TimeoutError("server tidak pernah ready")
+            time.sleep(0.01)
+        result["ready_ms"] = (time.monotonic() - start) * 1000
+
+        result["server"] = _server_milestones(metrics_port)
+    finally:
+        channel.close()
+        proc.send_signal(signal.SIGTERM)
+        try:
+            proc.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+        log.close()
+    return result
+
+
+def _summary(runs: list, key: str) -> dict:
+    values = sorted(r[key] for r in runs if key in r)
+    if not values:
+        return {}
+    return {"p50": values[len(values) // 2], "min": values[0], "max": values[-1]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--server", choices=("thread", "aio"), default="thread")
+    parser.add_argument("--db-host", default=os.getenv("DB_HOST", "127.0.0.1"))
+    parser.add_argument("--db-port", type=int, default=int(os.getenv("DB_PORT", "27017")))
+    parser.add_argument("--timeout", type=float, default=30, help="batas tiap tahap (detik)")
+    parser.add_argument("--out", default="", help="file JSON hasil (default bench_results/startup-<waktu>.json)")
+    args = parser.parse_args()
+
+    runs = []
+    for i in range(args.runs):
+        with tempfile.TemporaryDirectory(prefix="bench-startup-") as workdir:
+            try:
+                run = run_once(args, workdir)
+            except Exception as exc:
+                with open(os.path.join(workdir, "server.log"), "rb") as f:
+                    tail = f.read()[-2000:].decode(errors="replace")
+                logger.error(f"❌ Run {i + 1} gagal: {exc}\n{tail}")
+                sys.exit(1)
+        runs.append(run)
+        logger.info(
+            f"⏱️ Run {i + 1}: port {run['port_ms']:.0f} ms | paket pertama {run['accept_ms']:.0f} ms | "
+            f"ready {run['ready_ms']:.0f} ms"
+        )
+
+    result = {
+        "meta": {"timestamp": datetime.now().isoformat(timespec="seconds"), "python": sys.version.split()[0]},
+        "config": vars(args),
+        "results": {key: _summary(runs, key) for key in ("port_ms", "accept_ms", "ready_ms")},
+        "runs": runs,
+    }
+    out = args.out or os.path.join("bench_results", f"startup-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(result, f, indent=2)
+
+    r = result["results"]
+    logger.info(
+        f"📊 p50: port {r['port_ms']['p50']:.0f} ms | paket pertama {r['accept_ms']['p50']:.0f} ms | "
+        f"ready {r['ready_ms']['p50']:.0f} ms"
+    )
+    logger.info(f"💾 Hasil disimpan: {out}")
+
+
+if __name__ == "__main__":
+    logging.getLogger("central-node").setLevel(logging.INFO)
+    main()
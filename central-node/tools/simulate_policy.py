@@ -0,0 +1,430 @@
+"""Simulator offline kebijakan kompresi adaptif edge node (tanpa Docker/Pumba).
+
+Jalankan dari /app (atau direktori central-node):
+    python -m tools.simulate_policy --trace /app/data/analisis_latensi.csv \\
+        --profile cases --grid medium=0:100:5,high=100:1000:25
+
+Model diskrit: antrian edge (kapasitas QueueCap, data baru dibuang saat
+penuh), satu loop pengirim yang memilih mode dari panjang antrian setelah
+dequeue (seperti main.go), biaya kompresi per mode, link dengan delay /
+jitter / loss / bandwidth terjadwal (ala netem), dan waktu proses server
+per mode. Semua kombinasi parameter kebijakan disimulasikan sekaligus
+(vektor NumPy per kebijakan), kedatangan & angka acak sama untuk semua
+kebijakan supaya perbandingan adil.
+
+Kedatangan & ukuran payload diambil dari trace (CSV/Parquet laporan atau
+koleksi Mongo sensor_stream), atau sintetis dari profil jika tanpa trace.
+Hasil: latensi p50/p95/p99, throughput, drop, hemat bandwidth per
+kombinasi + Pareto front, disimpan sebagai JSON.
+"""
+import argparse
+import csv
+import importlib
+import json
+import os
+import random
+import time
+import zlib
+from datetime import datetime
+
+import lz4.frame
+import numpy as np
+
+from tools.bench_ingest import make_payload
+from utils import setup_logger
+
+logger = setup_logger()
+
+MODES = ("RAW", "LZ4", "GZIP")
+
+# Konstanta edge node (edge-node/config/config.go)
+QUEUE_CAP = 1000
+THRESHOLD_MEDIUM = 10
+THRESHOLD_HIGH = 800
+
+# Profil jaringan bawaan: segmen (mulai detik ke-, parameter). Kolom:
+# sensor_ms / net_ms = SetValues() edge, delay/jitter (ms), loss (0-1), rate_kbps (0 = tak terbatas)
+PROFILES = {
+    # Mode demo 1-4 (api/*.go) masing-masing 30 detik
+    "cases": [
+        (0, {"sensor_ms": 100, "net_ms": 10}),
+        (30, {"sensor_ms": 40, "net_ms": 50}),
+        (60, {"sensor_ms": 100, "net_ms": 120}),
+        (90, {"sensor_ms": 5, "net_ms": 100}),
+        (120, {}),
+    ],
+    # Pumba compose.yaml: tiap 30 detik, 20 detik delay 500ms
+    "pumba": [
+        (0, {"sensor_ms": 40, "net_ms": 50}),
+        (10, {"delay_ms": 500}),
+        (30, {"delay_ms": 0}),
+        (40, {"delay_ms": 500}),
+        (60, {"delay_ms": 0}),
+        (70, {"delay_ms": 500}),
+        (90, {"delay_ms": 0}),
+        (120, {}),
+    ],
+    # Link lemah: bandwidth sempit + loss
+    "lossy": [
+        (0, {"sensor_ms": 20, "net_ms": 5, "rate_kbps": 256, "loss": 0.02, "jitter_ms": 20}),
+        (60, {}),
+    ],
+}
+
+PROFILE_DEFAULTS = {
+    "sensor_ms": 100.0, "net_ms": 10.0, "delay_ms": 0.0, "jitter_ms": 0.0, "loss": 0.0, "rate_kbps": 0.0,
+}
+
+# Histogram latensi log-spaced (0.1ms .. ~1000s), kuantil dari histogram per kebijakan
+HIST_EDGES = np.geomspace(0.1, 1e6, 281)
+
+
+# --- 1. KEBIJAKAN ---
+# Signature: policy(queue_len: int[P], params: {nama: float[P]}, state: dict) -> indeks MODES int[P]
+
+def threshold(queue_len, params, state):
+    """Logika main.go: > medium -> LZ4, > high -> GZIP"""
+    mode = np.zeros(len(queue_len), dtype=np.int8)
+    mode[queue_len > params["medium"]] = 1
+    mode[queue_len > params["high"]] = 2
+    return mode
+
+
+def hysteresis(queue_len, params, state):
+    """Threshold dengan pita turun: mode baru naik di threshold, turun di threshold - band"""
+    target = threshold(queue_len, params, state)
+    prev = state.get("mode")
+    if prev is None:
+        prev = target
+    band = params.get("band", 0)
+    down = threshold(queue_len + band, params, state)
+    mode = np.where(target > prev, target, np.minimum(prev, down))
+    state["mode"] = mode
+    return mode
+
+
+POLICIES = {"threshold": threshold, "hysteresis": hysteresis}
+
+
+def load_policy(name: str):
+    """Nama bawaan atau plugin "modul:fungsi" dengan signature yang sama"""
+    if name in POLICIES:
+        return POLICIES[name]
+    module, _, func = name.partition(":")
+    return getattr(importlib.import_module(module), func)
+
+
+def parse_grid(spec: str) -> dict:
+    """"medium=0:100:5,high=800" -> {nama: nilai[P]} (produk kartesius semua sumbu)"""
+    axes = {}
+    for part in filter(None, spec.split(",")):
+        name, _, values = part.partition("=")
+        if ":" in values:
+            start, stop, step = (float(v) for v in values.split(":"))
+            axes[name] = np.arange(start, stop + step / 2, step)
+        else:
+            axes[name] = np.array([float(v) for v in values.split("|")])
+    grids = np.meshgrid(*axes.values(), indexing="ij")
+    return {name: g.ravel() for name, g in zip(axes, grids)}
+
+
+# --- 2. INPUT: TRACE / PROFIL ---
+
+def load_profile(spec: str):
+    """Nama profil bawaan atau file JSON [[mulai_s, {param}], ...] -> (waktu mulai, kolom param)"""
+    if spec in PROFILES:
+        segments = PROFILES[spec]
+    else:
+        with open(spec) as f:
+            segments = json.load(f)
+    starts, values, current = [], {k: [] for k in PROFILE_DEFAULTS}, dict(PROFILE_DEFAULTS)
+    for start, params in segments:
+        current.update(params)
+        starts.append(float(start) * 1000)
+        for key in values:
+            values[key].append(float(current[key]))
+    return np.array(starts), {k: np.array(v) for k, v in values.items()}
+
+
+def synthetic_arrivals(starts, columns, payload_size: int):
+    """Kedatangan dari sensor_ms tiap segmen (segmen terakhir = akhir simulasi)"""
+    arrivals = []
+    for i in range(len(starts) - 1):
+        arrivals.append(np.arange(starts[i], starts[i + 1], columns["sensor_ms"][i]))
+    arrivals = np.concatenate(arrivals)
+    return arrivals, np.full(len(arrivals), payload_size, dtype=np.int64), {}
+
+
+def load_trace_file(path: str):
+    """Laporan ReportSink (CSV / Parquet / Arrow) -> kolom NumPy"""
+    if path.endswith((".parquet", ".arrow")):
+        import pyarrow.feather
+        import pyarrow.parquet
+
+        table = pyarrow.parquet.read_table(path) if path.endswith(".parquet") else pyarrow.feather.read_table(path)
+        cols = table.to_pydict()
+    else:
+        with open(path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        cols = {key: [r[key] for r in rows] for key in rows[0]} if rows else {}
+    return {
+        "ts": np.asarray(cols["timestamp_kirim"], dtype=np.float64),
+        "mode": np.asarray(cols["tipe_kompresi"]),
+        "wire": np.asarray(cols["ukuran_paket_bytes"], dtype=np.float64),
+        "orig": np.asarray(cols["ukuran_asli_bytes"], dtype=np.float64),
+        "proc": np.asarray(cols["waktu_proses_server_ms"], dtype=np.float64),
+    }
+
+
+def load_trace_mongo(limit: int):
+    """Koleksi sensor_stream (DB_HOST/DB_PORT/DB_NAME) -> kolom NumPy"""
+    from database import Database
+
+    db = Database()
+    db.spool_dir = ""
+    db.connect()
+    try:
+        docs = list(db.collection.find(
+            {}, {"_id": 0, "timestamp_kirim": 1, "compression_type": 1, "data_size": 1, "original_size": 1},
+        ).sort("timestamp_kirim", -1).limit(limit))
+    finally:
+        db.close()
+    docs.reverse()
+    return {
+        "ts": np.array([d["timestamp_kirim"].timestamp() for d in docs]),
+        "mode": np.array([d["compression_type"] for d in docs]),
+        "wire": np.array([d["data_size"] for d in docs], dtype=np.float64),
+        "orig": np.array([d["original_size"] for d in docs], dtype=np.float64),
+        "proc": np.zeros(len(docs)),
+    }
+
+
+def trace_model(trace: dict):
+    """Kedatangan (ms dari awal), ukuran asli, dan statistik per mode dari trace"""
+    order = np.argsort(trace["ts"], kind="stable")
+    ts = trace["ts"][order]
+    arrivals = (ts - ts[0]) * 1000
+    stats = {}
+    for name in MODES:
+        mask = trace["mode"][order] == name
+        if mask.any():
+            stats[name] = {
+                "ratio": float(np.median(trace["wire"][order][mask] / np.maximum(trace["orig"][order][mask], 1))),
+                "server_ms": float(np.median(trace["proc"][order][mask])),
+                "count": int(mask.sum()),
+            }
+    return arrivals, trace["orig"][order].astype(np.int64), stats
+
+
+def calibrate(payload_size: int, rounds: int = 200) -> dict:
+    """Rasio & biaya kompresi per mode diukur langsung pada payload ala sensor.go"""
+    payload = make_payload(random.Random(0), payload_size, "sim")
+    codecs = {"RAW": lambda b: b, "LZ4": lz4.frame.compress, "GZIP": zlib.compress}
+    out = {}
+    for name in MODES:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            data = codecs[name](payload)
+        out[name] = {
+            "ratio": len(data) / len(payload),
+            "compress_ms": (time.perf_counter() - start) / rounds * 1000,
+            "server_ms": 0.0,
+        }
+    return out
+
+
+# --- 3. SIMULASI ---
+
+def simulate(arrivals, orig_size, starts, columns, modes: dict, policy, params: dict,
+             queue_cap: int = QUEUE_CAP, seed: int = 42, rto_ms: float = 200.0) -> dict:
+    """Semua P kebijakan berjalan paralel; loop per paket yang dilayani (bukan per waktu)"""
+    P = len(next(iter(params.values())))
+    M = len(arrivals)
+    rng = np.random.default_rng(seed)
+    # Angka acak per urutan layanan, sama untuk semua kebijakan (common random numbers)
+    loss_u = rng.random(M)
+    jitter_z = rng.standard_normal(M)
+
+    ratio = np.array([modes[m]["ratio"] for m in MODES])
+    compress_ms = np.array([modes[m]["compress_ms"] for m in MODES])
+    server_ms = np.array([modes[m]["server_ms"] for m in MODES])
+
+    rows = np.arange(P)
+    ring = np.zeros((P, queue_cap), dtype=np.int32)
+    q_head = np.zeros(P, dtype=np.int64)
+    q_len = np.zeros(P, dtype=np.int64)
+    tail = np.zeros(P, dtype=np.int64)          # kedatangan berikutnya yang belum dilihat
+    free_at = np.zeros(P)                       # loop pengirim bebas lagi (setelah sleep net_ms)
+    last_done = np.zeros(P)
+    dropped = np.zeros(P, dtype=np.int64)
+    delivered = np.zeros(P, dtype=np.int64)
+    bytes_wire = np.zeros(P)
+    bytes_orig = np.zeros(P)
+    mode_count = np.zeros((P, len(MODES)), dtype=np.int64)
+    hist = np.zeros((P, len(HIST_EDGES) + 1), dtype=np.int64)
+    latency_sum = np.zeros(P)
+    state = {}
+
+    for step in range(M):
+        active = (q_len > 0) | (tail < M)
+        if not active.any():
+            break
+
+        # Antrian kosong: pengirim menunggu kedatangan berikutnya
+        next_arrival = arrivals[np.minimum(tail, M - 1)]
+        start = np.where(q_len > 0, free_at, np.maximum(free_at, next_arrival))
+
+        # Kedatangan sampai `start` masuk antrian; yang datang saat penuh dibuang (select default)
+        seen = np.searchsorted(arrivals, start, side="right")
+        new = np.where(active, seen - tail, 0)
+        accepted = np.minimum(new, queue_cap - q_len)
+        for k in range(int(accepted.max(initial=0))):
+            mask = accepted > k
+            ring[rows[mask], (q_head[mask] + q_len[mask] + k) % queue_cap] = tail[mask] + k
+        dropped += new - accepted
+        q_len += accepted
+        tail = np.where(active, seen, tail)
+
+        # Dequeue; mode dipilih dari sisa antrian (len(dataQueue) setelah diambil)
+        serving = active & (q_len > 0)
+        item = ring[rows, q_head % queue_cap]
+        q_head = np.where(serving, q_head + 1, q_head)
+        q_len = np.where(serving, q_len - 1, q_len)
+        mode = policy(q_len, params, state).astype(np.int64)
+
+        # Kondisi jaringan pada saat kirim
+        seg = np.clip(np.searchsorted(starts, start, side="right") - 1, 0, len(starts) - 1)
+        wire = orig_size[item] * ratio[mode]
+        rate = columns["rate_kbps"][seg]
+        tx_ms = np.where(rate > 0, wire * 8 / np.maximum(rate, 1e-9), 0.0)
+        # Loss: retransmisi menahan stream (head-of-line) selama RTO
+        retrans = np.where(loss_u[step] < columns["loss"][seg], rto_ms, 0.0)
+        send_done = start + compress_ms[mode] + tx_ms + retrans
+        delay = np.maximum(0.0, columns["delay_ms"][seg] + columns["jitter_ms"][seg] * jitter_z[step])
+        latency = send_done + delay + server_ms[mode] - arrivals[item]
+
+        free_at = np.where(serving, send_done + columns["net_ms"][seg], free_at)
+        last_done = np.where(serving, send_done + delay, last_done)
+        delivered += serving
+        bytes_wire += np.where(serving, wire, 0.0)
+        bytes_orig += np.where(serving, orig_size[item], 0.0)
+        mode_count[rows[serving], mode[serving]] += 1
+        latency_sum += np.where(serving, latency, 0.0)
+        hist[rows[serving], np.searchsorted(HIST_EDGES, latency[serving])] += 1
+
+    # Kuantil dari histogram kumulatif (batas atas bucket)
+    cum = np.cumsum(hist, axis=1)
+    total = np.maximum(cum[:, -1:], 1)
+    upper = np.append(HIST_EDGES, HIST_EDGES[-1])
+    quantiles = {}
+    for q in (50, 95, 99):
+        idx = (cum < total * q / 100).sum(axis=1)
+        quantiles[f"p{q}"] = upper[np.minimum(idx, len(upper) - 1)]
+
+    duration_s = np.maximum(last_done - arrivals[0], 1e-9) / 1000
+    return {
+        "delivered": delivered,
+        "dropped": dropped,
+        "drop_rate": dropped / max(M, 1),
+        "throughput_msg_s": delivered / duration_s,
+        "latency_mean_ms": latency_sum / np.maximum(delivered, 1),
+        **{f"latency_{k}_ms": v for k, v in quantiles.items()},
+        "saving_percent": 100 - bytes_wire / np.maximum(bytes_orig, 1) * 100,
+        "mode_share": mode_count / np.maximum(delivered[:, None], 1),
+    }
+
+
+def pareto(latency: np.ndarray, cost: np.ndarray) -> np.ndarray:
+    """Indeks titik tidak terdominasi (minimalkan latensi & biaya), urut latensi"""
+    order = np.lexsort((cost, latency))
+    best = np.minimum.accumulate(cost[order])
+    keep = np.concatenate(([True], cost[order][1:] < best[:-1]))
+    return order[keep]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trace", default="", help="laporan CSV/Parquet, atau 'mongo' (kosong = kedatangan sintetis)")
+    parser.add_argument("--trace-limit", type=int, default=200000, help="maks dokumen trace dari Mongo")
+    parser.add_argument("--profile", default="cases", help=f"profil jaringan: {', '.join(PROFILES)} atau file JSON")
+    parser.add_argument("--policy", default="threshold", help=f"{', '.join(POLICIES)} atau modul:fungsi")
+    parser.add_argument("--grid", default="medium=0:100:5,high=100:1000:50",
+                        help="sumbu parameter: nama=mulai:stop:langkah atau nama=a|b|c")
+    parser.add_argument("--queue-cap", type=int, default=QUEUE_CAP)
+    parser.add_argument("--payload-size", type=int, default=2048, help="ukuran payload sintetis (bytes)")
+    parser.add_argument("--rto-ms", type=float, default=200.0, help="penalti retransmisi per paket hilang")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--top", type=int, default=10, help="jumlah titik Pareto yang ditampilkan")
+    parser.add_argument("--out", default="", help="file JSON hasil (default bench_results/policy-<waktu>.json)")
+    args = parser.parse_args()
+
+    starts, columns = load_profile(args.profile)
+    modes = calibrate(args.payload_size)
+    if args.trace:
+        trace = load_trace_mongo(args.trace_limit) if args.trace == "mongo" else load_trace_file(args.trace)
+        arrivals, orig_size, observed = trace_model(trace)
+        # Rasio & waktu server hasil observasi menggantikan kalibrasi untuk mode yang ada di trace
+        for name, obs in observed.items():
+            modes[name].update(ratio=obs["ratio"], server_ms=obs["server_ms"])
+    else:
+        arrivals, orig_size, observed = synthetic_arrivals(starts, columns, args.payload_size)
+
+    policy = load_policy(args.policy)
+    params = parse_grid(args.grid)
+    # Baseline: threshold bawaan config.go ikut disimulasikan sebagai pembanding
+    if args.policy == "threshold":
+        params = {k: np.append(v, {"medium": THRESHOLD_MEDIUM, "high": THRESHOLD_HIGH}.get(k, v[-1]))
+                  for k, v in params.items()}
+    n_policies = len(next(iter(params.values())))
+
+    logger.info(f"🧪 Simulasi {n_policies} kebijakan x {len(arrivals)} paket ({args.policy}, profil {args.profile})")
+    start = time.perf_counter()
+    result = simulate(arrivals, orig_size, starts, columns, modes, policy, params,
+                      queue_cap=args.queue_cap, seed=args.seed, rto_ms=args.rto_ms)
+    elapsed = time.perf_counter() - start
+
+    rows = []
+    for i in range(n_policies):
+        row = {k: float(v[i]) for k, v in params.items()}
+        for key, values in result.items():
+            if key == "mode_share":
+                row[key] = {m: float(s) for m, s in zip(MODES, values[i])}
+            else:
+                row[key] = float(values[i])
+        rows.append(row)
+
+    # Trade-off: latensi p95 vs byte terkirim (100 - hemat) dan vs throughput
+    front = pareto(result["latency_p95_ms"], 100 - result["saving_percent"])
+
+    out = args.out or os.path.join("bench_results", f"policy-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as f:
+        json.dump({
+            "meta": {"timestamp": datetime.now().isoformat(timespec="seconds"), "elapsed_s": elapsed},
+            "config": vars(args),
+            "modes": modes,
+            "observed": observed,
+            "baseline": rows[-1] if args.policy == "threshold" else None,
+            "pareto": [rows[i] for i in front],
+            "results": rows,
+        }, f, indent=2)
+
+    logger.info(f"⏱️ {n_policies} kebijakan selesai dalam {elapsed:.2f}s")
+    for i in front[:args.top]:
+        r = rows[i]
+        knobs = " ".join(f"{k}={r[k]:g}" for k in params)
+        logger.info(
+            f"📈 {knobs} | p95 {r['latency_p95_ms']:.1f}ms p99 {r['latency_p99_ms']:.1f}ms | "
+            f"{r['throughput_msg_s']:.1f} msg/s | drop {r['drop_rate'] * 100:.1f}% | hemat {r['saving_percent']:.1f}%"
+        )
+    if args.policy == "threshold":
+        b = rows[-1]
+        logger.info(
+            f"📌 Baseline medium={THRESHOLD_MEDIUM} high={THRESHOLD_HIGH} | p95 {b['latency_p95_ms']:.1f}ms | "
+            f"{b['throughput_msg_s']:.1f} msg/s | drop {b['drop_rate'] * 100:.1f}% | hemat {b['saving_percent']:.1f}%"
+        )
+    logger.info(f"💾 Hasil disimpan: {out}")
+
+
+if __name__ == "__main__":
+    main()
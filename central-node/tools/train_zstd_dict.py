@@ -0,0 +1,96 @@
+"""Latih dictionary zstd dari payload sensor yang tersimpan di MongoDB.
+
+Jalankan dari /app (container central-node):
+    python -m tools.train_zstd_dict --samples 2000 --size 16384
+
+Sampel diambil dari field raw_data (PAYLOAD_STORE=inline) atau blob store
+(PAYLOAD_STORE=file/gridfs). Dictionary baru mendapat dict_id = versi
+terakhir + 1, disimpan di koleksi zstd_dicts dan ZSTD_DICT_DIR.
+"""
+import argparse
+import sys
+
+import zstandard
+
+from database import Database, LocalBlobStore, GridFSBlobStore
+from utils import setup_logger, decompress, ZSTD_DICTS
+
+logger = setup_logger()
+
+
+def load_samples(db: Database, limit: int) -> list:
+    blob_store = None
+    if db.payload_store == "file":
+        blob_store = LocalBlobStore(db.payload_dir)
+    elif db.payload_store == "gridfs":
+        blob_store = GridFSBlobStore(db.db)
+
+    query = {"$or": [{"raw_data": {"$exists": True}}, {"payload_ref": {"$exists": True}}]}
+    projection = {"raw_data": 1, "payload_ref": 1, "compression_type": 1, "payload_codec": 1}
+    cursor = db.collection.find(query, projection).sort("timestamp_kirim", -1).limit(limit)
+
+    samples = []
+    for doc in cursor:
+        try:
+            if "raw_data" in doc:
+                data = doc["raw_data"]
+            elif blob_store is not None:
+                data = blob_store.get(doc["payload_ref"])
+            else:
+                continue
+            # Dictionary dilatih dari payload asli (sebelum kompresi); reading batch
+            # disimpan terdekompresi dengan payload_codec RAW
+            codec = doc.get("payload_codec") or doc.get("compression_type", "RAW")
+            samples.append(decompress(codec, data))
+        except Exception as exc:
+            logger.warning(f"Lewati sampel: {exc}")
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=2000, help="jumlah payload terbaru yang dipakai")
+    parser.add_argument("--size", type=int, default=16384, help="ukuran dictionary (bytes)")
+    parser.add_argument("--level", type=int, default=3, help="level zstd untuk evaluasi rasio")
+    args = parser.parse_args()
+
+    db = Database()
+    # Spool milik server yang sedang jalan, jangan dibuka / di-replay dari tool ini
+    db.spool_dir = ""
+    db.connect()
+    try:
+        samples = load_samples(db, args.samples)
+        if len(samples) < 8:
+            logger.error(f"❌ Sampel terlalu sedikit ({len(samples)}); aktifkan PAYLOAD_STORE dulu")
+            sys.exit(1)
+
+        existing = [d["_id"] for d in db.load_zstd_dicts()]
+        dict_id = max(existing, default=0) + 1
+
+        zdict = zstandard.train_dictionary(args.size, samples, dict_id=dict_id, level=args.level)
+        data = zdict.as_bytes()
+
+        # Evaluasi singkat: rasio dengan vs tanpa dictionary
+        plain = zstandard.ZstdCompressor(level=args.level)
+        trained = zstandard.ZstdCompressor(level=args.level, dict_data=zdict)
+        total = sum(len(s) for s in samples)
+        ratio_plain = sum(len(plain.compress(s)) for s in samples) / total
+        ratio_dict = sum(len(trained.compress(s)) for s in samples) / total
+
+        db.save_zstd_dict(dict_id, data, {
+            "samples": len(samples),
+            "level": args.level,
+            "ratio_plain": ratio_plain,
+            "ratio_dict": ratio_dict,
+        })
+        ZSTD_DICTS.add(dict_id, data)
+        logger.info(
+            f"✅ Dictionary #{dict_id} ({len(data)} bytes, {len(samples)} sampel) | "
+            f"rasio tanpa dict {ratio_plain:.3f} -> dengan dict {ratio_dict:.3f}"
+        )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,39 @@
-from .logger import setup_logger
+from .logger import setup_logger, log_stats
+from .report import ReportSink
+from .compression import decompress, decompress_timed, is_compressed, compression_label, warmup_codecs, DecompressPool, OrderedStream
+from .zstd_dict import DictionaryRegistry, REGISTRY as ZSTD_DICTS
+from .metrics import LatencyHistogram, LatencyMetrics, MetricsRegistry, MetricsServer, gauges
+from .rollup import RollupAggregator
+from .feedback import StreamFeedback, recommend_mode
+from .profiling import StageTimings, RuntimeProfiler
+from .live_feed import LiveFeed
+from .payload import PayloadParser
+from .sequence import SequenceTracker
 
-__all__ = ['setup_logger']
+__all__ = [
+    'setup_logger',
+    'log_stats',
+    'ReportSink',
+    'decompress',
+    'decompress_timed',
+    'is_compressed',
+    'compression_label',
+    'warmup_codecs',
+    'DictionaryRegistry',
+    'ZSTD_DICTS',
+    'DecompressPool',
+    'OrderedStream',
+    'LatencyHistogram',
+    'LatencyMetrics',
+    'MetricsRegistry',
+    'MetricsServer',
+    'gauges',
+    'RollupAggregator',
+    'StreamFeedback',
+    'recommend_mode',
+    'StageTimings',
+    'RuntimeProfiler',
+    'LiveFeed',
+    'PayloadParser',
+    'SequenceTracker',
+]
@@ -0,0 +1,75 @@
+import threading
+
+from .metrics import LatencyHistogram, savings_efficiency
+
+
+def recommend_mode(lag_ms: float, saturated: bool, lag_low_ms: float, lag_high_ms: float) -> str:
+    """Saran mode dari sisi server: lag rendah -> RAW, sedang -> LZ4, tinggi -> GZIP.
+
+    GZIP tidak disarankan kalau pool dekompresi server sudah jenuh.
+    """
+    if lag_ms < lag_low_ms:
+        return "RAW"
+    if lag_ms < lag_high_ms or saturated:
+        return "LZ4"
+    return "GZIP"
+
+
+class _ModeAcc:
+    __slots__ = ("packets", "bytes_sent", "bytes_original", "decompress_us", "latency")
+
+    def __init__(self):
+        self.packets = 0
+        self.bytes_sent = 0
+        self.bytes_original = 0
+        self.decompress_us = 0.0
+        self.latency = LatencyHistogram()
+
+
+class StreamFeedback:
+    """Akumulasi statistik satu stream untuk ack periodik ke edge"""
+
+    def __init__(self):
+        self.acked = 0
+        self._modes = {}
+        self._lock = threading.Lock()
+
+    def record(self, compression_type: str, data_size: int, original_size: int,
+               latency_ms: float, decompress_us: float):
+        with self._lock:
+            acc = self._modes.get(compression_type)
+            if acc is None:
+                acc = self._modes[compression_type] = _ModeAcc()
+            acc.packets += 1
+            acc.bytes_sent += data_size
+            acc.bytes_original += original_size
+            acc.decompress_us += decompress_us
+            acc.latency.record(latency_ms)
+            self.acked += 1
+
+    def snapshot(self) -> dict:
+        """Ambil statistik interval ini lalu reset (acked tetap kumulatif)"""
+        with self._lock:
+            modes, self._modes = self._modes, {}
+            acked = self.acked
+
+        total = LatencyHistogram()
+        out = []
+        for ctype, acc in modes.items():
+            total.merge(acc.latency)
+            p50, p95 = acc.latency.percentiles((50, 95))
+            out.append({
+                "compression_type": ctype,
+                "packets": acc.packets,
+                "latency_p50_ms": p50,
+                "latency_p95_ms": p95,
+                "decompress_us": acc.decompress_us / acc.packets,
+                "ratio": acc.bytes_sent / acc.bytes_original if acc.bytes_original else 1.0,
+                "bytes_saved_per_cpu_ms": savings_efficiency(acc.bytes_sent, acc.bytes_original, acc.decompress_us),
+            })
+
+        return {
+            "acked": acked,
+            "ingest_lag_ms": total.percentiles((95,))[0],
+            "modes": out,
+        }
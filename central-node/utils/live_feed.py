@@ -0,0 +1,123 @@
+import json
+import threading
+import time
+import uuid
+
+# Field rollup yang dikirim ke subscriber (sisanya cukup di Mongo)
+FIELDS = ("window", "sensor_id", "compression_type", "count", "bytes_sent", "bytes_original",
+          "decompress_us", "latency_sum", "latency_p95", "latency_max")
+
+
+class LiveFeed:
+    """Pub/sub rollup untuk dashboard: ring buffer event + Server-Sent Events.
+
+    Tiap flush rollup menjadi satu event bernomor (seq). Subscriber yang
+    tertinggal cukup reconnect dengan ?since=<seq>; kalau seq sudah keluar dari
+    ring (atau epoch berbeda karena server restart) subscriber harus bootstrap
+    ulang dari Mongo.
+    """
+
+    def __init__(self, maxlen: int = 600, heartbeat: float = 15.0):
+        self.maxlen = maxlen
+        self.heartbeat = heartbeat
+        self.epoch = uuid.uuid4().hex[:12]
+        self.seq = 0
+        self.subscribers = 0
+        self._events = []
+        self._cond = threading.Condition()
+
+    def publish(self, docs: list, totals: dict) -> int:
+        """Dipanggil thread rollup; totals = {compression_type: [count, bytes_sent, bytes_original, decompress_us]}.
+
+        Return seq event (dicatat di ingest_totals setelah isinya tertulis ke Mongo).
+        """
+        event = {
+            "rollups": [
+                {"ts": d["ts"].timestamp(), **{k: d[k] for k in FIELDS}} for d in docs
+            ],
+            "totals": {
+                "count": sum(t[0] for t in totals.values()),
+                "bytes_sent": sum(t[1] for t in totals.values()),
+                "bytes_original": sum(t[2] for t in totals.values()),
+                "decompress_us": sum(t[3] for t in totals.values()),
+            },
+        }
+        with self._cond:
+            self.seq += 1
+            event["seq"] = self.seq
+            self._events.append(event)
+            if len(self._events) > self.maxlen:
+                del self._events[: len(self._events) - self.maxlen]
+            self._cond.notify_all()
+            return self.seq
+
+    def since(self, seq: int, timeout: float):
+        """Event dengan seq > `seq`, menunggu maks `timeout` detik jika belum ada.
+
+        None jika event setelah `seq` sudah keluar dari ring (subscriber terlalu
+        lambat): subscriber harus reset & bootstrap ulang dari Mongo.
+        """
+        with self._cond:
+            if self.seq <= seq:
+                self._cond.wait(timeout)
+            if not self._events or self._events[-1]["seq"] <= seq:
+                return []
+            first = self._events[0]["seq"]
+            if seq + 1 < first:
+                return None
+            return self._events[seq + 1 - first:]
+
+    def _filter(self, event: dict, window: int) -> dict:
+        if window:
+            event = {**event, "rollups": [r for r in event["rollups"] if r["window"] == window]}
+        return event
+
+    def sse(self, query: dict):
+        """Route /live?since=<seq>&window=<detik>&epoch=<epoch> -> stream text/event-stream
+
+        Event pertama "hello" berisi epoch, seq awal dan flag reset. Tanpa `since`
+        stream dimulai dari event berikutnya (reset=true, klien bootstrap dari Mongo).
+        Event "reset" dikirim di tengah stream jika klien tertinggal melewati ring.
+        """
+        since = query.get("since", [None])[0]
+        window = int(query.get("window", ["0"])[0])
+        epoch = query.get("epoch", [self.epoch])[0]
+
+        def stream():
+            with self._cond:
+                current = self.seq
+                last = current if since is None else int(since)
+                oldest = self._events[0]["seq"] if self._events else current + 1
+            # Klien baru / celah (ring sudah lewat, server restart) -> reset: bootstrap dari Mongo
+            gap = since is None or epoch != self.epoch or last + 1 < oldest or last > current
+            if gap:
+                last = current
+            yield f"event: hello\ndata: {json.dumps({'epoch': self.epoch, 'seq': last, 'reset': gap})}\n\n"
+
+            with self._cond:
+                self.subscribers += 1
+            try:
+                idle_since = time.monotonic()
+                while True:
+                    events = self.since(last, self.heartbeat)
+                    if events is None:
+                        # Event yang belum terkirim sudah terbuang dari ring: klien bootstrap ulang
+                        with self._cond:
+                            last = self.seq
+                        yield f"event: reset\ndata: {json.dumps({'epoch': self.epoch, 'seq': last, 'reset': True})}\n\n"
+                        idle_since = time.monotonic()
+                        continue
+                    for event in events:
+                        last = event["seq"]
+                        yield f"id: {last}\ndata: {json.dumps(self._filter(event, window))}\n\n"
+                    if events:
+                        idle_since = time.monotonic()
+                    elif time.monotonic() - idle_since >= self.heartbeat:
+                        # Komentar SSE sebagai heartbeat (deteksi koneksi putus)
+                        yield ": ping\n\n"
+                        idle_since = time.monotonic()
+            finally:
+                with self._cond:
+                    self.subscribers -= 1
+
+        return 200, "text/event-stream", stream()
@@ -1,6 +1,12 @@
+import atexit
+import json
 import logging
+import os
+import queue
 import sys
+import threading
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 
 
 class ColoredFormatter(logging.Formatter):
@@ -16,32 +22,158 @@ class ColoredFormatter(logging.Formatter):
     }
 
     def format(self, record):
+        # Salinan record: levelname asli tetap utuh untuk handler/formatter lain
+        record = logging.makeLogRecord(record.__dict__)
         color = self.COLORS.get(record.levelname, self.COLORS['RESET'])
         record.levelname = f"{color}{record.levelname}{self.COLORS['RESET']}"
-        return super().format(record)
+        text = super().format(record)
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            text += f" (+{suppressed} pesan serupa ditekan)"
+        return text
+
+
+class JsonFormatter(logging.Formatter):
+    """Satu objek JSON per baris (LOG_FORMAT=json) untuk log collector"""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "thread": record.threadName,
+        }
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            entry["suppressed"] = suppressed
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class RateLimitFilter(logging.Filter):
+    """Batasi log per call site (file:baris): maks `burst` pesan per `window` detik.
+
+    Pesan di atas batas dibuang di thread pemanggil (sebelum masuk antrian);
+    jumlahnya dilampirkan ke pesan berikutnya dari call site yang sama.
+    """
+
+    def __init__(self, burst: int = 20, window: float = 5.0):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self.suppressed = 0
+        self.suppressed_by_level = {}
+        self._sites = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if self.burst <= 0:
+            return True
+        key = (record.pathname, record.lineno)
+        now = record.created
+        with self._lock:
+            site = self._sites.get(key)
+            if site is None or now - site[0] >= self.window:
+                # Jendela baru: [awal, terkirim, ditekan]
+                held = site[2] if site else 0
+                self._sites[key] = [now, 1, 0]
+                if held:
+                    record.suppressed = held
+                return True
+            if site[1] < self.burst:
+                site[1] += 1
+                return True
+            site[2] += 1
+            self.suppressed += 1
+            self.suppressed_by_level[record.levelname] = self.suppressed_by_level.get(record.levelname, 0) + 1
+            return False
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler yang tidak pernah menunggu: antrian penuh -> record dibuang & dihitung"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.enqueued = 0
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+
+
+_PIPELINE = {}
+
+
+def log_stats() -> dict:
+    """Counter pipeline log (untuk /metrics): terkirim, ditekan rate limit, dibuang karena antrian penuh"""
+    handler = _PIPELINE.get("handler")
+    limiter = _PIPELINE.get("limiter")
+    if handler is None:
+        return {}
+    stats = {
+        "enqueued": handler.enqueued,
+        "dropped": handler.dropped,
+        "queue_depth": handler.queue.qsize(),
+        "suppressed": limiter.suppressed,
+    }
+    for level, count in limiter.suppressed_by_level.items():
+        stats[f"suppressed_{level.lower()}"] = count
+    return stats
 
 
 def setup_logger(name: str = "central-node") -> logging.Logger:
-    """Setup and return a configured logger"""
+    """Setup and return a configured logger
+
+    Log dari thread gRPC / worker hanya masuk antrian (QueueHandler); penulisan
+    ke stdout dikerjakan satu thread QueueListener. Konfigurasi lewat env:
+    LOG_LEVEL, LOG_FORMAT (text | json), LOG_QUEUE_SIZE, LOG_RATE_BURST, LOG_RATE_WINDOW_S.
+    """
 
     logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
+    level = getattr(logging, os.getenv("LOG_LEVEL", "INFO").upper(), logging.INFO)
+    logger.setLevel(level)
 
     # Avoid duplicate handlers
     if logger.handlers:
         return logger
 
-    # Console handler
+    # Console handler (dipakai thread listener, bukan thread pemanggil)
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.INFO)
+    console_handler.setLevel(level)
 
     # Format
-    formatter = ColoredFormatter(
-        '%(asctime)s | %(levelname)s | %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
+    if os.getenv("LOG_FORMAT", "text").lower() == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = ColoredFormatter(
+            '%(asctime)s | %(levelname)s | %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
     console_handler.setFormatter(formatter)
 
-    logger.addHandler(console_handler)
+    # Antrian terbatas + rate limit per call site (burst error per paket tidak membanjiri stdout)
+    log_queue = queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", "10000")))
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    limiter = RateLimitFilter(
+        burst=int(os.getenv("LOG_RATE_BURST", "20")),
+        window=float(os.getenv("LOG_RATE_WINDOW_S", "5")),
+    )
+    queue_handler.addFilter(limiter)
+    logger.addHandler(queue_handler)
+    logger.propagate = False
+
+    listener = QueueListener(log_queue, console_handler, respect_handler_level=True)
+    listener.start()
+    # Kuras antrian saat proses keluar (sys.exit di signal handler)
+    atexit.register(listener.stop)
 
+    _PIPELINE.update(handler=queue_handler, limiter=limiter, listener=listener)
     return logger
@@ -0,0 +1,360 @@
+import logging
+import threading
+import time
+from array import array
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+logger = logging.getLogger("central-node")
+
+# Histogram log-linear ala HDR: 16 sub-bucket per oktaf (error relatif <= 6.25%),
+# nilai dalam mikrodetik, dibatasi 2^32 us (~71 menit)
+SUB_BITS = 4
+SUB_COUNT = 1 << SUB_BITS
+MAX_BITS = 32
+N_BUCKETS = (MAX_BITS - SUB_BITS) * SUB_COUNT + SUB_COUNT * 2
+
+
+def bucket_index(value_us: int) -> int:
+    if value_us < SUB_COUNT * 2:
+        return value_us if value_us > 0 else 0
+    shift = value_us.bit_length() - SUB_BITS - 1
+    idx = (shift + 1) * SUB_COUNT + (value_us >> shift) - SUB_COUNT
+    return idx if idx < N_BUCKETS else N_BUCKETS - 1
+
+
+def bucket_upper(idx: int) -> int:
+    """Batas atas (eksklusif) bucket dalam mikrodetik"""
+    if idx < SUB_COUNT * 2:
+        return idx + 1
+    shift = idx // SUB_COUNT - 1
+    return (idx % SUB_COUNT + SUB_COUNT + 1) << shift
+
+
+class LatencyHistogram:
+    """Histogram latensi memori tetap: record O(1), persentil dari bucket"""
+
+    __slots__ = ("counts", "count", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.counts = array("q", bytes(8 * N_BUCKETS))
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, value_ms: float):
+        self.counts[bucket_index(int(value_ms * 1000))] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def merge(self, other: "LatencyHistogram"):
+        counts = self.counts
+        for i, c in enumerate(other.counts):
+            if c:
+                counts[i] += c
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def mean(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+    def percentiles(self, qs=(50, 95, 99)) -> list:
+        """Persentil (ms) memakai batas atas bucket, satu kali scan"""
+        if not self.count:
+            return [0.0 for _ in qs]
+        targets = [max(1, int(round(q / 100 * self.count))) for q in qs]
+        result = [0.0] * len(qs)
+        seen = 0
+        t = 0
+        order = sorted(range(len(qs)), key=lambda i: targets[i])
+        for idx, c in enumerate(self.counts):
+            if not c:
+                continue
+            seen += c
+            while t < len(order) and seen >= targets[order[t]]:
+                result[order[t]] = min(bucket_upper(idx) / 1000, self.max_ms)
+                t += 1
+            if t == len(order):
+                break
+        return result
+
+    def reset(self):
+        self.counts = array("q", bytes(8 * N_BUCKETS))
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+
+class WindowedHistogram:
+    """Dua histogram bergantian: kuantil mencakup 1-2 interval terakhir"""
+
+    __slots__ = ("interval", "current", "previous", "rotate_at", "count", "total_ms")
+
+    def __init__(self, interval: float, now: float):
+        self.interval = interval
+        self.current = LatencyHistogram()
+        self.previous = LatencyHistogram()
+        self.rotate_at = now + interval
+        # Kumulatif sejak start (untuk _sum/_count Prometheus)
+        self.count = 0
+        self.total_ms = 0.0
+
+    def _maybe_rotate(self, now: float):
+        if now >= self.rotate_at:
+            if now >= self.rotate_at + self.interval:
+                # Idle lebih dari satu interval: kedua jendela sudah basi
+                self.previous.reset()
+            else:
+                self.previous, self.current = self.current, self.previous
+            self.current.reset()
+            self.rotate_at = now + self.interval
+
+    def record(self, value_ms: float, now: float):
+        self._maybe_rotate(now)
+        self.current.record(value_ms)
+        self.count += 1
+        self.total_ms += value_ms
+
+    def snapshot(self, now: float) -> LatencyHistogram:
+        self._maybe_rotate(now)
+        snap = LatencyHistogram()
+        snap.merge(self.previous)
+        snap.merge(self.current)
+        return snap
+
+
+def savings_efficiency(bytes_sent: int, bytes_original: int, decompress_us: float) -> float:
+    """Byte bandwidth yang dihemat per milidetik CPU dekompresi server (0 jika tanpa biaya CPU)"""
+    cpu_ms = decompress_us / 1000
+    return (bytes_original - bytes_sent) / cpu_ms if cpu_ms > 0 else 0.0
+
+
+def _labels(**labels) -> str:
+    parts = []
+    for k, v in labels.items():
+        v = str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{k}="{v}"')
+    return "{" + ",".join(parts) + "}"
+
+
+class LatencyMetrics:
+    """Kuantil latensi streaming per sensor & tipe kompresi (memori tetap per seri)"""
+
+    QUANTILES = (0.5, 0.9, 0.95, 0.99, 0.999)
+
+    def __init__(self, window: float = 60.0):
+        self.window = window
+        # sensor_id -> compression_type -> [latency, proc, packets, bytes_sent, bytes_original, decompress_us]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def record(self, sensor_id: str, compression_type: str, latency_ms: float, proc_ms: float,
+               data_size: int, original_size: int, now: float, decompress_us: float = 0.0):
+        with self._lock:
+            by_type = self._series.get(sensor_id)
+            if by_type is None:
+                by_type = self._series[sensor_id] = {}
+            s = by_type.get(compression_type)
+            if s is None:
+                s = by_type[compression_type] = [
+                    WindowedHistogram(self.window, now), WindowedHistogram(self.window, now), 0, 0, 0, 0.0
+                ]
+            s[0].record(latency_ms, now)
+            s[1].record(proc_ms, now)
+            s[2] += 1
+            s[3] += data_size
+            s[4] += original_size
+            s[5] += decompress_us
+
+    def summary(self, now: float = None) -> dict:
+        """Gabungan semua seri (untuk benchmark/laporan, bukan /metrics)"""
+        now = time.time() if now is None else now
+        latency, proc = LatencyHistogram(), LatencyHistogram()
+        out = {"latency": latency, "proc": proc, "packets": 0, "bytes_sent": 0, "bytes_original": 0,
+               "decompress_us": 0.0, "by_type": {}}
+        with self._lock:
+            for by_type in self._series.values():
+                for ctype, (lat, prc, packets, sent, orig, dec_us) in by_type.items():
+                    latency.merge(lat.snapshot(now))
+                    proc.merge(prc.snapshot(now))
+                    out["packets"] += packets
+                    out["bytes_sent"] += sent
+                    out["bytes_original"] += orig
+                    out["decompress_us"] += dec_us
+                    mode = out["by_type"].setdefault(ctype, [0, 0, 0, 0.0])
+                    for i, v in enumerate((packets, sent, orig, dec_us)):
+                        mode[i] += v
+        out["by_type"] = {
+            ctype: {
+                "packets": packets,
+                "ratio": sent / orig if orig else 1.0,
+                "decompress_us": dec_us / packets if packets else 0.0,
+                "bytes_saved_per_cpu_ms": savings_efficiency(sent, orig, dec_us),
+            }
+            for ctype, (packets, sent, orig, dec_us) in out["by_type"].items()
+        }
+        return out
+
+    def collect(self):
+        """Baris teks Prometheus"""
+        now = time.time()
+        with self._lock:
+            snaps = []
+            for sensor_id, by_type in self._series.items():
+                for ctype, (lat, proc, packets, sent, orig, dec_us) in by_type.items():
+                    snaps.append((
+                        _labels(sensor_id=sensor_id, compression_type=ctype),
+                        sensor_id, ctype,
+                        (lat.snapshot(now), lat.count, lat.total_ms),
+                        (proc.snapshot(now), proc.count, proc.total_ms),
+                        packets, sent, orig, dec_us,
+                    ))
+
+        pct = [q * 100 for q in self.QUANTILES]
+        for name, help_text, pos in (
+            ("iot_latency_ms", "Latensi end-to-end (timestamp edge -> terima server)", 3),
+            ("iot_server_processing_ms", "Waktu proses server per paket", 4),
+        ):
+            yield f"# HELP {name} {help_text}"
+            yield f"# TYPE {name} summary"
+            for snap in snaps:
+                labels, sensor_id, ctype = snap[0], snap[1], snap[2]
+                hist, count, total = snap[pos]
+                for q, v in zip(self.QUANTILES, hist.percentiles(pct)):
+                    yield f"{name}{_labels(sensor_id=sensor_id, compression_type=ctype, quantile=q)} {v:.3f}"
+                yield f"{name}_sum{labels} {total:.3f}"
+                yield f"{name}_count{labels} {count}"
+
+        for name, help_text, pos in (
+            ("iot_packets_total", "Jumlah paket diterima", 5),
+            ("iot_bytes_sent_total", "Byte di jaringan (setelah kompresi)", 6),
+            ("iot_bytes_original_total", "Byte asli (setelah dekompresi)", 7),
+            ("iot_decompress_us_total", "Waktu CPU dekompresi server (mikrodetik)", 8),
+        ):
+            yield f"# HELP {name} {help_text}"
+            yield f"# TYPE {name} counter"
+            for snap in snaps:
+                yield f"{name}{snap[0]} {snap[pos]}"
+
+        # Efisiensi per mode (gabungan semua sensor): apakah biaya CPU kompresi sepadan dengan byte yang dihemat
+        modes = {}
+        for snap in snaps:
+            acc = modes.setdefault(snap[2], [0, 0, 0.0])
+            acc[0] += snap[6]
+            acc[1] += snap[7]
+            acc[2] += snap[8]
+        yield "# HELP iot_bytes_saved_per_cpu_ms Byte dihemat per ms CPU dekompresi server"
+        yield "# TYPE iot_bytes_saved_per_cpu_ms gauge"
+        for ctype, (sent, orig, dec_us) in sorted(modes.items()):
+            yield f"iot_bytes_saved_per_cpu_ms{_labels(compression_type=ctype)} {savings_efficiency(sent, orig, dec_us):.3f}"
+
+
+class MetricsRegistry:
+    """Kumpulan collector; tiap collector mengembalikan baris teks Prometheus"""
+
+    def __init__(self):
+        self._collectors = []
+
+    def register(self, collector):
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for collector in self._collectors:
+            try:
+                lines.extend(collector())
+            except Exception as exc:
+                logger.error(f"❌ Collector metrics gagal: {exc}")
+        return "\n".join(lines) + "\n"
+
+
+def gauges(prefix: str, values: dict, counters=(), **labels):
+    """Helper: dict angka -> baris gauge Prometheus.
+
+    Key di `counters` (nilai yang hanya naik) diekspor sebagai counter dengan
+    akhiran _total supaya rate() bisa dipakai.
+    """
+    label_str = _labels(**labels) if labels else ""
+    for key, value in values.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        if key in counters:
+            name = f"{prefix}_{key}" if key.endswith("_total") else f"{prefix}_{key}_total"
+            yield f"# TYPE {name} counter"
+        else:
+            name = f"{prefix}_{key}"
+            yield f"# TYPE {name} gauge"
+        yield f"{name}{label_str} {value}"
+
+
+class MetricsServer:
+    """HTTP server kecil bawaan untuk /metrics (dan endpoint admin tambahan)"""
+
+    def __init__(self, registry: MetricsRegistry, port: int, host: str = "0.0.0.0"):
+        self.registry = registry
+        self.routes = {"/metrics": self._metrics}
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                route = server.routes.get(url.path)
+                if route is None:
+                    self.send_error(404)
+                    return
+                try:
+                    status, content_type, body = route(parse_qs(url.query))
+                except Exception as exc:
+                    status, content_type, body = 500, "text/plain", f"error: {exc}\n"
+                if not isinstance(body, str):
+                    self._stream(status, content_type, body)
+                    return
+                data = body.encode()
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, status, content_type, chunks):
+                # Body berupa iterator (mis. SSE): kirim per potong sampai klien putus
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+                try:
+                    for chunk in chunks:
+                        self.wfile.write(chunk.encode())
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    close = getattr(chunks, "close", None)
+                    if close:
+                        close()
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="metrics-http", daemon=True)
+
+    def _metrics(self, _query):
+        return 200, "text/plain; version=0.0.4; charset=utf-8", self.registry.render()
+
+    def add_route(self, path: str, handler):
+        """handler(query: dict) -> (status, content_type, body); body str atau iterator str (streaming)"""
+        self.routes[path] = handler
+
+    def start(self):
+        self._thread.start()
+        logger.info(f"📈 Metrics tersedia di http://{self.httpd.server_address[0]}:{self.httpd.server_address[1]}/metrics")
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,142 @@
+import collections
+import json
+import logging
+import threading
+
+logger = logging.getLogger("central-node")
+
+try:
+    # Opsional: orjson ~3-5x lebih cepat dari json stdlib
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+
+class PayloadParser:
+    """Parse payload NDJSON sensor jadi kolom bertipe ringkas untuk disimpan di dokumen Mongo.
+
+    Baris identik dalam satu payload di-parse sekali (bobot = jumlah
+    kemunculan); semua baris unik di-decode dalam satu panggilan sebagai
+    array JSON. Field numerik -> {min, max, mean}, field kategori -> hitungan.
+    """
+
+    def __init__(self, categorical=("status",), max_categories: int = 16):
+        self.categorical = set(categorical)
+        self.max_categories = max_categories
+        self._lock = threading.Lock()
+
+        # Counter
+        self.parsed = 0
+        self.failed = 0
+        self.lines = 0
+        self.unique_lines = 0
+
+    def _decode(self, unique: list) -> list:
+        try:
+            return _loads(b"[" + b",".join(unique) + b"]")
+        except ValueError:
+            # Ada baris rusak: decode satu per satu, baris rusak dilewati
+            rows = []
+            for line in unique:
+                try:
+                    rows.append(_loads(line))
+                except ValueError:
+                    rows.append(None)
+            return rows
+
+    def _columns_fast(self, rows: list, weights: list):
+        """Jalur cepat: semua baris objek dengan field & tipe yang sama -> operasi per kolom"""
+        keys = rows[0].keys()
+        if not all(row.keys() == keys for row in rows):
+            raise KeyError("skema baris berbeda")
+        n = sum(weights)
+        summary = {}
+        for key, first in rows[0].items():
+            values = [row[key] for row in rows]
+            if isinstance(first, bool):
+                continue
+            if isinstance(first, (int, float)):
+                if n == len(rows):
+                    mean = sum(values) / n
+                else:
+                    mean = sum(v * w for v, w in zip(values, weights)) / n
+                # min/max melempar TypeError jika ada nilai non-numerik -> jalur umum
+                summary[key] = {"min": min(values), "max": max(values), "mean": mean}
+            elif key in self.categorical and isinstance(first, str):
+                col = {}
+                for value, weight in zip(values, weights):
+                    col[value] = col.get(value, 0) + weight
+                if len(col) > self.max_categories:
+                    raise KeyError("kategori terlalu banyak")
+                summary[key] = col
+        return n, summary
+
+    def _columns(self, rows: list, weights: list):
+        """Jalur umum: baris campuran / rusak, dicek per nilai"""
+        n = 0
+        numeric = {}
+        categories = {}
+        for row, weight in zip(rows, weights):
+            if not isinstance(row, dict):
+                continue
+            n += weight
+            for key, value in row.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    col = numeric.get(key)
+                    if col is None:
+                        numeric[key] = [value, value, value * weight, weight]
+                    else:
+                        if value < col[0]:
+                            col[0] = value
+                        if value > col[1]:
+                            col[1] = value
+                        col[2] += value * weight
+                        col[3] += weight
+                elif key in self.categorical and isinstance(value, str):
+                    col = categories.setdefault(key, {})
+                    if value in col or len(col) < self.max_categories:
+                        col[value] = col.get(value, 0) + weight
+
+        summary = {key: {"min": lo, "max": hi, "mean": total / weight} for key, (lo, hi, total, weight) in numeric.items()}
+        summary.update(categories)
+        return n, summary
+
+    def parse(self, payload: bytes) -> dict:
+        """Ringkasan kolom: {"n", "unique", <numerik>: {min, max, mean}, <kategori>: {nilai: jumlah}}"""
+        # Dedup baris (Counter di C); spasi di sekitar baris ditangani decoder JSON
+        counts = collections.Counter(payload.split(b"\n"))
+        counts.pop(b"", None)
+        if not counts:
+            return None
+
+        unique = list(counts)
+        rows = self._decode(unique)
+
+        weights = list(counts.values())
+        try:
+            n, summary = self._columns_fast(rows, weights)
+        except (TypeError, KeyError, AttributeError):
+            n, summary = self._columns(rows, weights)
+
+        with self._lock:
+            self.lines += sum(counts.values())
+            self.unique_lines += len(unique)
+            if n == 0:
+                self.failed += 1
+            else:
+                self.parsed += 1
+        if n == 0:
+            return None
+
+        return {"n": n, "unique": len(unique), **summary}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "parsed": self.parsed,
+                "failed": self.failed,
+                "lines": self.lines,
+                "unique_lines": self.unique_lines,
+            }
@@ -0,0 +1,189 @@
+import collections
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+from .metrics import WindowedHistogram, _labels
+
+logger = logging.getLogger("central-node")
+
+# Tahap hot path per paket (ms)
+STAGES = ("queue", "decompress", "metrics", "parse", "db", "log", "report")
+
+
+class StageTimings:
+    """Span waktu per tahap: satu lock per paket, kuantil per interval"""
+
+    QUANTILES = (0.5, 0.95, 0.99)
+
+    def __init__(self, stages=STAGES, window: float = 60.0):
+        self.stages = stages
+        now = time.time()
+        self._hists = [WindowedHistogram(window, now) for _ in stages]
+        self._lock = threading.Lock()
+
+    def record(self, values, now: float):
+        """values: durasi (ms) sesuai urutan self.stages"""
+        with self._lock:
+            for hist, value in zip(self._hists, values):
+                hist.record(value, now)
+
+    def snapshot(self) -> dict:
+        now = time.time()
+        with self._lock:
+            snaps = [(h.snapshot(now), h.count, h.total_ms) for h in self._hists]
+        out = {}
+        for stage, (hist, count, total) in zip(self.stages, snaps):
+            p50, p95, p99 = hist.percentiles([q * 100 for q in self.QUANTILES])
+            out[stage] = {"p50": p50, "p95": p95, "p99": p99, "max": hist.max_ms, "count": count, "total_ms": total}
+        return out
+
+    def collect(self):
+        """Baris teks Prometheus: summary iot_stage_ms{stage=...}"""
+        name = "iot_stage_ms"
+        yield f"# HELP {name} Waktu per tahap hot path server (ms)"
+        yield f"# TYPE {name} summary"
+        for stage, s in self.snapshot().items():
+            for q in self.QUANTILES:
+                yield f"{name}{_labels(stage=stage, quantile=q)} {s[f'p{int(q * 100)}']:.4f}"
+            yield f"{name}_sum{_labels(stage=stage)} {s['total_ms']:.3f}"
+            yield f"{name}_count{_labels(stage=stage)} {s['count']}"
+
+
+class RuntimeProfiler:
+    """Profiler on-demand tanpa restart: sampling stack semua thread atau tracemalloc.
+
+    Satu sesi per waktu; hasil ditulis ke `out_dir` saat durasi habis atau stop().
+    """
+
+    KINDS = ("sample", "tracemalloc")
+
+    def __init__(self, out_dir: str, hz: float = 100.0, default_seconds: float = 30.0):
+        self.out_dir = out_dir
+        self.hz = hz
+        self.default_seconds = default_seconds
+        self.last_output = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._kind = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "RuntimeProfiler":
+        return cls(
+            os.getenv("PROFILE_DIR", "/app/data/profiles"),
+            hz=float(os.getenv("PROFILE_HZ", "100")),
+            default_seconds=float(os.getenv("PROFILE_DURATION_S", "30")),
+        )
+
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, kind: str = "sample", seconds: float = None) -> bool:
+        if kind not in self.KINDS:
+            raise ValueError(f"jenis profiler tidak dikenal: {kind}")
+        with self._lock:
+            if self.running():
+                return False
+            self._kind = kind
+            self._stop.clear()
+            target = self._sample if kind == "sample" else self._tracemalloc
+            self._thread = threading.Thread(
+                target=target, args=(seconds or self.default_seconds,), name=f"profiler-{kind}", daemon=True
+            )
+            self._thread.start()
+        logger.info(f"🔬 Profiler {kind} aktif ({seconds or self.default_seconds:.0f}s)")
+        return True
+
+    def stop(self, timeout: float = 10.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def toggle(self, kind: str = "sample"):
+        """Untuk signal: mulai kalau idle, hentikan (dan dump) kalau sedang jalan"""
+        if self.running():
+            # Tidak join: dump dikerjakan thread profiler sendiri
+            self._stop.set()
+        else:
+            self.start(kind)
+
+    def status(self) -> dict:
+        return {"running": self.running(), "kind": self._kind, "last_output": self.last_output}
+
+    def _path(self, kind: str, ext: str) -> str:
+        os.makedirs(self.out_dir, exist_ok=True)
+        return os.path.join(self.out_dir, f"profile-{kind}-{datetime.now():%Y%m%d-%H%M%S}{ext}")
+
+    def _sample(self, seconds: float):
+        # Sampling sys._current_frames(): mencakup semua thread (worker gRPC, pool, writer)
+        me = threading.get_ident()
+        interval = 1.0 / self.hz
+        deadline = time.monotonic() + seconds
+        stacks = collections.Counter()
+        names = {}
+        samples = 0
+
+        while not self._stop.wait(interval) and time.monotonic() < deadline:
+            if samples % max(1, int(self.hz)) == 0:
+                names = {t.ident: t.name for t in threading.enumerate()}
+            for tid, frame in sys._current_frames().items():
+                if tid == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stack.append(names.get(tid, str(tid)))
+                stacks[";".join(reversed(stack))] += 1
+            samples += 1
+
+        # Format "folded" (flamegraph.pl / speedscope)
+        path = self._path("sample", ".folded")
+        with open(path, "w") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        self.last_output = path
+        logger.info(f"🔬 Profil sampling ({samples} sampel) disimpan: {path}")
+
+    def _tracemalloc(self, seconds: float):
+        import tracemalloc
+
+        started_here = not tracemalloc.is_tracing()
+        if started_here:
+            tracemalloc.start(16)
+        before = tracemalloc.take_snapshot()
+        self._stop.wait(seconds)
+        after = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if started_here:
+            tracemalloc.stop()
+
+        path = self._path("tracemalloc", ".txt")
+        with open(path, "w") as f:
+            f.write(f"# traced current={current} peak={peak} window={seconds}s\n")
+            f.write("# --- Pertumbuhan alokasi selama window ---\n")
+            for stat in after.compare_to(before, "lineno")[:50]:
+                f.write(f"{stat}\n")
+            f.write("# --- Alokasi terbesar (akhir window) ---\n")
+            for stat in after.statistics("lineno")[:50]:
+                f.write(f"{stat}\n")
+        self.last_output = path
+        logger.info(f"🔬 Snapshot tracemalloc disimpan: {path}")
+
+    def http_route(self, query: dict):
+        """Endpoint admin: /debug/profile?action=start&kind=sample&seconds=30 | action=stop | (status)"""
+        action = query.get("action", ["status"])[0]
+        if action == "stop":
+            self.stop()
+        elif action == "start":
+            kind = query.get("kind", ["sample"])[0]
+            seconds = float(query.get("seconds", [self.default_seconds])[0])
+            if not self.start(kind, seconds):
+                return 409, "application/json", json.dumps({"error": "profiler sedang berjalan", **self.status()}) + "\n"
+        return 200, "application/json", json.dumps(self.status()) + "\n"
@@ -0,0 +1,182 @@
+import csv
+import io
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger("central-node")
+
+# Kolom laporan: (nama, tipe arrow, format CSV)
+COLUMNS = [
+    ("timestamp_kirim", "float64", "{:.4f}"),
+    ("timestamp_terima", "float64", "{:.4f}"),
+    ("latensi_ms", "float64", "{:.2f}"),
+    ("tipe_kompresi", "string", "{}"),
+    ("ukuran_paket_bytes", "int64", "{}"),
+    ("ukuran_asli_bytes", "int64", "{}"),
+    ("hemat_persen", "float64", "{:.1f}"),
+    ("waktu_proses_server_ms", "float64", "{:.3f}"),
+    ("waktu_dekompresi_us", "float64", "{:.1f}"),
+]
+
+EXTENSIONS = {"csv": ".csv", "parquet": ".parquet", "arrow": ".arrow"}
+
+
+class ReportSink:
+    """Sink laporan latensi: satu file handle terbuka, baris di-buffer di memori"""
+
+    def __init__(self, path: str, fmt: str = "csv", flush_rows: int = 500, flush_interval: float = 1.0,
+                 rotate_bytes: int = 0, rotate_hourly: bool = False):
+        self.fmt = fmt
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.rotate_bytes = rotate_bytes
+        self.rotate_hourly = rotate_hourly
+
+        self._pa = None
+        if fmt in ("parquet", "arrow"):
+            try:
+                import pyarrow
+                self._pa = pyarrow
+            except ImportError:
+                logger.warning(f"⚠️ pyarrow tidak terpasang, format {fmt} diganti ke csv")
+                self.fmt = "csv"
+
+        self.path = os.path.splitext(path)[0] + EXTENSIONS.get(self.fmt, ".csv")
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        self._rows = []
+        self._lock = threading.Lock()     # jaga buffer baris
+        self._io_lock = threading.Lock()  # jaga file handle
+        self._fh = None
+        self._writer = None
+        self._opened_at = 0.0
+        self.rows_written = 0
+        self.rotations = 0
+
+        with self._io_lock:
+            self._open()
+
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="report-flusher", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_env(cls, path: str) -> "ReportSink":
+        return cls(
+            path,
+            fmt=os.getenv("REPORT_FORMAT", "csv").lower(),
+            flush_rows=int(os.getenv("REPORT_FLUSH_ROWS", "500")),
+            flush_interval=float(os.getenv("REPORT_FLUSH_INTERVAL_MS", "1000")) / 1000,
+            rotate_bytes=int(float(os.getenv("REPORT_ROTATE_MB", "0")) * 1024 * 1024),
+            rotate_hourly=os.getenv("REPORT_ROTATE_HOURLY", "false").lower() == "true",
+        )
+
+    # --- FILE HANDLING ---
+    def _archive_name(self) -> str:
+        stem, ext = os.path.splitext(self.path)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self._opened_at or os.path.getmtime(self.path)))
+        name = f"{stem}-{stamp}{ext}"
+        n = 1
+        while os.path.exists(name):
+            name = f"{stem}-{stamp}.{n}{ext}"
+            n += 1
+        return name
+
+    def _open(self):
+        # File lama tidak dihapus, tapi diarsipkan dengan nama bertimestamp
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            os.replace(self.path, self._archive_name())
+
+        self._opened_at = time.time()
+        if self.fmt == "csv":
+            self._fh = open(self.path, "w", newline="", buffering=io.DEFAULT_BUFFER_SIZE * 16)
+            self._writer = csv.writer(self._fh)
+            self._writer.writerow([name for name, _, _ in COLUMNS])
+            self._fh.flush()
+        else:
+            pa = self._pa
+            schema = pa.schema([(name, getattr(pa, typ)()) for name, typ, _ in COLUMNS])
+            self._fh = open(self.path, "wb")
+            if self.fmt == "parquet":
+                import pyarrow.parquet as pq
+                self._writer = pq.ParquetWriter(self._fh, schema)
+            else:
+                self._writer = pa.ipc.new_file(self._fh, schema)
+
+    def _close_file(self):
+        if self.fmt != "csv" and self._writer is not None:
+            self._writer.close()
+        if self._fh is not None:
+            self._fh.close()
+        self._fh = None
+        self._writer = None
+
+    def _rotate(self):
+        self._close_file()
+        self._open()
+        self.rotations += 1
+        logger.info(f"🗂️ Laporan dirotasi: {self.path}")
+
+    def _needs_rotation(self) -> bool:
+        if self.rotate_hourly and int(time.time() // 3600) != int(self._opened_at // 3600):
+            return True
+        if self.rotate_bytes and self._fh.tell() >= self.rotate_bytes:
+            return True
+        return False
+
+    # --- BUFFER ---
+    def write(self, row: tuple):
+        """Tambah satu baris (nilai mentah sesuai COLUMNS). Tidak pernah menyentuh disk."""
+        with self._lock:
+            self._rows.append(row)
+            if len(self._rows) >= self.flush_rows:
+                # I/O dikerjakan thread flusher, bukan thread pemanggil
+                self._wake.set()
+
+    def _write_rows(self, rows: list):
+        if not rows or self._fh is None:
+            return
+
+        if self._needs_rotation():
+            self._rotate()
+
+        if self.fmt == "csv":
+            fmts = [fmt for _, _, fmt in COLUMNS]
+            self._writer.writerows([[f.format(v) for f, v in zip(fmts, row)] for row in rows])
+            self._fh.flush()
+        else:
+            pa = self._pa
+            cols = list(zip(*rows))
+            batch = pa.record_batch(
+                [pa.array(col, getattr(pa, typ)()) for col, (_, typ, _) in zip(cols, COLUMNS)],
+                names=[name for name, _, _ in COLUMNS],
+            )
+            self._writer.write(batch)
+        self.rows_written += len(rows)
+
+    def flush(self):
+        # Tukar buffer singkat di bawah lock, tulis ke disk di luar lock buffer
+        with self._lock:
+            rows, self._rows = self._rows, []
+        with self._io_lock:
+            self._write_rows(rows)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as exc:
+                logger.error(f"❌ Gagal flush laporan: {exc}")
+
+    def close(self):
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(self.flush_interval + 1)
+        self.flush()
+        with self._io_lock:
+            self._close_file()
@@ -0,0 +1,220 @@
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+
+from .metrics import LatencyHistogram, savings_efficiency
+
+logger = logging.getLogger("central-node")
+
+WINDOWS = (1, 10, 60)
+
+
+class _Cell:
+    __slots__ = ("count", "bytes_sent", "bytes_original", "decompress_us", "latency")
+
+    def __init__(self):
+        self.count = 0
+        self.bytes_sent = 0
+        self.bytes_original = 0
+        self.decompress_us = 0.0
+        self.latency = LatencyHistogram()
+
+    def merge(self, other: "_Cell"):
+        self.count += other.count
+        self.bytes_sent += other.bytes_sent
+        self.bytes_original += other.bytes_original
+        self.decompress_us += other.decompress_us
+        self.latency.merge(other.latency)
+
+
+class RollupAggregator:
+    """Rollup inkremental per sensor & tipe kompresi untuk jendela 1s / 10s / 1m.
+
+    Jendela & total yang gagal ditulis tidak dibuang: disimpan (digabung dengan
+    flush berikutnya) dan dicoba ulang dengan backoff, maks `max_pending` jendela.
+    ValueError dari write_* berarti data ditolak permanen: dibuang, tidak dicoba ulang.
+    """
+
+    def __init__(self, write_docs, write_totals, windows=WINDOWS, grace: float = 1.0, flush_interval: float = 1.0,
+                 publish=None, available=None, max_pending: int = 20000, retry_max: float = 30.0):
+        # Dipanggil dari thread flusher: write_docs(rollup_docs), write_totals(totals, published)
+        # boleh melempar exception; publish(docs, totals) -> seq event, sekali per data baru
+        # (live feed); available() False = lewati tulis tanpa menunggu timeout koneksi.
+        # `published` = seq event live feed terakhir yang isinya sudah tertulis semua (None tanpa feed)
+        self.write_docs = write_docs
+        self.write_totals = write_totals
+        self.publish = publish
+        self.available = available
+        self.windows = windows
+        self.grace = grace
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.retry_max = retry_max
+
+        self._cells = {}
+        self._totals = {}
+        self._lock = threading.Lock()
+
+        # Belum tertulis ke Mongo (hanya disentuh thread flusher / stop)
+        self._pending = {}
+        self._pending_totals = {}
+        # Seq live feed terakhir yang di-publish / sudah tercakup di Mongo
+        self._published = None
+        self._covered = None
+        self._retry_at = 0.0
+        self._backoff = flush_interval
+        self.write_failures = 0
+        self.dropped_windows = 0
+        self.rejected_windows = 0
+        self.rejected_totals = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rollup-flusher", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def record(self, sensor_id: str, compression_type: str, ts: float,
+               data_size: int, original_size: int, latency_ms: float, decompress_us: float = 0.0):
+        with self._lock:
+            for w in self.windows:
+                key = (w, int(ts // w) * w, sensor_id, compression_type)
+                cell = self._cells.get(key)
+                if cell is None:
+                    cell = self._cells[key] = _Cell()
+                cell.count += 1
+                cell.bytes_sent += data_size
+                cell.bytes_original += original_size
+                cell.decompress_us += decompress_us
+                cell.latency.record(latency_ms)
+
+            tot = self._totals.get(compression_type)
+            if tot is None:
+                tot = self._totals[compression_type] = [0, 0, 0, 0.0]
+            tot[0] += 1
+            tot[1] += data_size
+            tot[2] += original_size
+            tot[3] += decompress_us
+
+    def _collect(self, now: float, force: bool = False):
+        # Ambil jendela yang sudah lewat (+grace untuk paket telat)
+        with self._lock:
+            done = [k for k in self._cells if force or k[1] + k[0] + self.grace <= now]
+            cells = [(k, self._cells.pop(k)) for k in done]
+            totals, self._totals = self._totals, {}
+        return cells, totals
+
+    @staticmethod
+    def _docs(cells) -> list:
+        docs = []
+        for (w, start, sensor_id, compression_type), cell in cells:
+            p50, p95, p99 = cell.latency.percentiles((50, 95, 99))
+            docs.append({
+                "window": w,
+                "ts": datetime.fromtimestamp(start, tz=timezone.utc),
+                "sensor_id": sensor_id,
+                "compression_type": compression_type,
+                "count": cell.count,
+                "bytes_sent": cell.bytes_sent,
+                "bytes_original": cell.bytes_original,
+                "decompress_us": cell.decompress_us,
+                "ratio": cell.bytes_sent / cell.bytes_original if cell.bytes_original else 1.0,
+                "bytes_saved_per_cpu_ms": savings_efficiency(cell.bytes_sent, cell.bytes_original, cell.decompress_us),
+                "latency_sum": cell.latency.total_ms,
+                "latency_p50": p50,
+                "latency_p95": p95,
+                "latency_p99": p99,
+                "latency_max": cell.latency.max_ms,
+            })
+        return docs
+
+    def _hold(self, cells, totals: dict):
+        for key, cell in cells:
+            held = self._pending.get(key)
+            if held is None:
+                self._pending[key] = cell
+            else:
+                held.merge(cell)
+        for ctype, tot in totals.items():
+            held = self._pending_totals.setdefault(ctype, [0, 0, 0, 0.0])
+            for i, v in enumerate(tot):
+                held[i] += v
+
+        if len(self._pending) > self.max_pending:
+            # Mongo terlalu lama down: buang jendela tertua, total tetap disimpan
+            drop = sorted(self._pending, key=lambda k: k[1])[: len(self._pending) - self.max_pending]
+            for key in drop:
+                del self._pending[key]
+            self.dropped_windows += len(drop)
+            logger.warning(f"⚠️ Rollup tertunda melebihi {self.max_pending} jendela, {len(drop)} jendela tertua dibuang")
+
+    def _write(self) -> bool:
+        try:
+            if self._pending:
+                try:
+                    self.write_docs(self._docs(self._pending.items()))
+                except ValueError as exc:
+                    self.rejected_windows += len(self._pending)
+                    logger.error(f"❌ Rollup ditolak, {len(self._pending)} jendela dibuang: {exc}")
+                self._pending = {}
+            if self._pending_totals or self._published != self._covered:
+                try:
+                    # Ditulis setelah rollup: dashboard yang bootstrap dari Mongo melewati event <= seq ini
+                    self.write_totals(self._pending_totals, self._published)
+                except ValueError as exc:
+                    self.rejected_totals += 1
+                    logger.error(f"❌ Total ingest ditolak, dibuang: {exc}")
+                self._pending_totals = {}
+                self._covered = self._published
+        except Exception as exc:
+            self.write_failures += 1
+            self._retry_at = time.monotonic() + self._backoff
+            logger.error(
+                f"❌ Gagal tulis rollup ({len(self._pending)} jendela tertunda, coba lagi {self._backoff:.0f}s): {exc}"
+            )
+            self._backoff = min(self._backoff * 2, self.retry_max)
+            return False
+        self._backoff = self.flush_interval
+        return True
+
+    def flush(self, force: bool = False):
+        cells, totals = self._collect(time.time(), force)
+        docs = self._docs(cells) if self.publish else None
+        self._hold(cells, totals)
+        if self.publish and (cells or totals):
+            # Live feed hanya menerima data baru (retry tidak dikirim ulang)
+            self._published = self.publish(docs, totals)
+
+        if not (self._pending or self._pending_totals or self._published != self._covered):
+            return
+        if self.available is not None and not self.available():
+            return
+        if force or time.monotonic() >= self._retry_at:
+            self._write()
+
+    def stats(self) -> dict:
+        return {
+            "pending_windows": len(self._pending),
+            "write_failures": self.write_failures,
+            "dropped_windows": self.dropped_windows,
+            "rejected_windows": self.rejected_windows,
+            "rejected_totals": self.rejected_totals,
+        }
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as exc:
+                logger.error(f"❌ Gagal flush rollup: {exc}")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(self.flush_interval + 1)
+        try:
+            self.flush(force=True)
+        except Exception as exc:
+            logger.error(f"❌ Gagal flush rollup: {exc}")
+        if self._pending or self._pending_totals:
+            logger.error(f"❌ {len(self._pending)} jendela rollup tidak tertulis saat shutdown")
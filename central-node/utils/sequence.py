@@ -0,0 +1,188 @@
+import threading
+import time
+
+from .metrics import _labels
+
+
+class _Sensor:
+    """Jendela geser per sensor: bit i = seq (highest - i).
+
+    `seen` menandai seq yang sudah diterima; `gaps[mode]` menandai seq yang
+    dihitung hilang saat gap terlihat oleh paket mode tsb, sehingga reading
+    yang datang terlambat mengembalikan hitungan ke mode yang benar.
+    """
+
+    __slots__ = ("highest", "seen", "gaps")
+
+    def __init__(self, seq: int):
+        self.highest = seq
+        self.seen = 1
+        self.gaps = {}
+
+
+class _Mode:
+    __slots__ = ("delivered", "bytes", "lost", "duplicates", "reordered", "window")
+
+    def __init__(self, now: float):
+        self.delivered = 0
+        self.bytes = 0
+        self.lost = 0
+        self.duplicates = 0
+        self.reordered = 0
+        # [awal jendela, delivered, bytes, lost] untuk jendela sekarang & sebelumnya
+        self.window = [[now, 0, 0, 0], None]
+
+
+class SequenceTracker:
+    """Deteksi gap / duplikat / reorder dari seq per sensor, goodput vs loss per mode kompresi.
+
+    Seq yang lompat ke depan dihitung hilang; jika datang terlambat (masih di
+    dalam jendela) dihitung reordered dan hitungan hilangnya dikembalikan.
+    Seq 1 di belakang highest, atau seq yang tertinggal lebih jauh dari
+    jendela, dianggap edge restart (counter edge mulai lagi dari 1).
+    """
+
+    # Status satu reading terhadap nomor urut sensornya
+    NEW = "new"
+    DUPLICATE = "duplicate"
+    REORDERED = "reordered"
+    RESET = "reset"
+
+    def __init__(self, window: int = 1024, rate_window: float = 60.0):
+        self.window = window
+        self.mask = (1 << window) - 1
+        self.rate_window = rate_window
+        self.resets = 0
+        self._sensors = {}
+        self._modes = {}
+        self._lock = threading.Lock()
+
+    def _mode(self, compression_type: str, now: float) -> _Mode:
+        mode = self._modes.get(compression_type)
+        if mode is None:
+            mode = self._modes[compression_type] = _Mode(now)
+        cur, prev = mode.window
+        if now - cur[0] >= self.rate_window:
+            # Idle lebih dari satu jendela: jendela sebelumnya sudah basi
+            mode.window = [[now, 0, 0, 0], cur if now - cur[0] < 2 * self.rate_window else None]
+        return mode
+
+    def _lose(self, mode: _Mode, n: int):
+        mode.lost += n
+        mode.window[0][3] += n
+
+    def observe(self, sensor_id: str, compression_type: str, seq: int, original_size: int,
+                now: float = None) -> str:
+        """Catat satu reading; return NEW / DUPLICATE / REORDERED / RESET"""
+        now = time.time() if now is None else now
+        with self._lock:
+            mode = self._mode(compression_type, now)
+            state = self._sensors.get(sensor_id)
+            status = self.NEW
+            if state is None:
+                # Reading pertama yang terlihat: loss sebelum ini tidak diketahui
+                self._sensors[sensor_id] = _Sensor(seq)
+            elif seq > state.highest:
+                d = seq - state.highest
+                state.highest = seq
+                for ctype, bits in list(state.gaps.items()):
+                    bits = (bits << d) & self.mask
+                    if bits:
+                        state.gaps[ctype] = bits
+                    else:
+                        del state.gaps[ctype]
+                state.seen = ((state.seen << d) | 1) & self.mask
+                if d > 1:
+                    # Seq highest+1 .. seq-1 belum datang
+                    self._lose(mode, d - 1)
+                    bits = (((1 << (d - 1)) - 1) << 1) & self.mask
+                    if bits:
+                        state.gaps[compression_type] = state.gaps.get(compression_type, 0) | bits
+            elif seq != 1 and state.highest - seq < self.window:
+                bit = 1 << (state.highest - seq)
+                if state.seen & bit:
+                    mode.duplicates += 1
+                    return self.DUPLICATE
+                state.seen |= bit
+                mode.reordered += 1
+                status = self.REORDERED
+                for ctype, bits in state.gaps.items():
+                    if bits & bit:
+                        state.gaps[ctype] = bits & ~bit
+                        owner = self._mode(ctype, now)
+                        owner.lost -= 1
+                        # Gap dari jendela rate sebelumnya tidak dikoreksi (sudah dilaporkan)
+                        if owner.window[0][3] > 0:
+                            owner.window[0][3] -= 1
+                        break
+            else:
+                # Edge restart: counter mulai dari awal
+                self._sensors[sensor_id] = _Sensor(seq)
+                self.resets += 1
+                status = self.RESET
+
+            mode.delivered += 1
+            mode.bytes += original_size
+            cur = mode.window[0]
+            cur[1] += 1
+            cur[2] += original_size
+            return status
+
+    def _rates(self, mode: _Mode, now: float) -> tuple:
+        cur, prev = mode.window
+        # Minimal 1 detik: paket pertama jendela tidak menghasilkan laju raksasa
+        elapsed = max(now - cur[0], 1.0)
+        delivered, nbytes, lost = cur[1], cur[2], cur[3]
+        if prev is not None and elapsed < self.rate_window:
+            elapsed += self.rate_window
+            delivered += prev[1]
+            nbytes += prev[2]
+            lost += prev[3]
+        expected = delivered + lost
+        return (
+            delivered / elapsed if elapsed > 0 else 0.0,
+            nbytes / elapsed if elapsed > 0 else 0.0,
+            lost / expected if expected else 0.0,
+        )
+
+    def summary(self, now: float = None) -> dict:
+        """Per mode: total delivered/lost/duplicate/reordered + goodput & loss rate jendela terakhir"""
+        now = time.time() if now is None else now
+        with self._lock:
+            out = {}
+            for ctype, mode in self._modes.items():
+                msgs_s, bytes_s, loss_rate = self._rates(mode, now)
+                expected = mode.delivered + mode.lost
+                out[ctype] = {
+                    "delivered": mode.delivered,
+                    "lost": mode.lost,
+                    "duplicates": mode.duplicates,
+                    "reordered": mode.reordered,
+                    "loss_rate": mode.lost / expected if expected else 0.0,
+                    "goodput_msgs_per_s": msgs_s,
+                    "goodput_bytes_per_s": bytes_s,
+                    "window_loss_rate": loss_rate,
+                }
+            return out
+
+    def collect(self):
+        """Baris teks Prometheus"""
+        modes = sorted(self.summary().items())
+        for name, help_text, key, kind in (
+            ("iot_seq_delivered_total", "Reading unik yang sampai (per seq)", "delivered", "counter"),
+            ("iot_seq_lost", "Reading hilang (gap seq yang belum terisi, turun jika reading telat datang)", "lost", "gauge"),
+            ("iot_seq_duplicates_total", "Reading duplikat (seq sudah pernah diterima)", "duplicates", "counter"),
+            ("iot_seq_reordered_total", "Reading terlambat yang mengisi gap", "reordered", "counter"),
+            ("iot_goodput_msgs_per_s", "Reading unik per detik yang sampai", "goodput_msgs_per_s", "gauge"),
+            ("iot_goodput_bytes_per_s", "Byte asli per detik dari reading unik", "goodput_bytes_per_s", "gauge"),
+            ("iot_loss_rate", "Rasio reading hilang di jendela terakhir", "window_loss_rate", "gauge"),
+        ):
+            yield f"# HELP {name} {help_text}"
+            yield f"# TYPE {name} {kind}"
+            for ctype, stats in modes:
+                value = stats[key] if isinstance(stats[key], int) else f"{stats[key]:.3f}"
+                yield f"{name}{_labels(compression_type=ctype)} {value}"
+        yield "# TYPE iot_seq_sensors gauge"
+        yield f"iot_seq_sensors {len(self._sensors)}"
+        yield "# TYPE iot_seq_resets_total counter"
+        yield f"iot_seq_resets_total {self.resets}"
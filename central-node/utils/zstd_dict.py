@@ -0,0 +1,90 @@
+import logging
+import os
+import threading
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import zstandard
+
+logger = logging.getLogger("central-node")
+
+# zstandard di-import saat dictionary / decompressor pertama dibuat
+_zstandard = None
+
+
+def _zstd():
+    global _zstandard
+    if _zstandard is None:
+        import zstandard
+        _zstandard = zstandard
+    return _zstandard
+
+
+# Batas output untuk frame zstd yang tidak mencantumkan content size
+MAX_OUTPUT = int(os.getenv("ZSTD_MAX_OUTPUT", str(16 * 1024 * 1024)))
+
+
+class DictionaryRegistry:
+    """Registry dictionary zstd per dict_id (versi), di-cache dari direktori lokal.
+
+    Direktori dipakai juga oleh worker process pool, jadi dictionary cukup
+    disinkronkan sekali ke disk (dari Mongo) lalu dimuat lazy di tiap proses.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._dicts = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _path(self, dict_id: int) -> str:
+        return os.path.join(self.directory, f"{dict_id}.zdict")
+
+    def add(self, dict_id: int, data: bytes, persist: bool = True):
+        if persist:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = f"{self._path(dict_id)}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self._path(dict_id))
+        with self._lock:
+            self._dicts[dict_id] = _zstd().ZstdCompressionDict(data)
+
+    def get(self, dict_id: int) -> "zstandard.ZstdCompressionDict":
+        d = self._dicts.get(dict_id)
+        if d is None:
+            try:
+                with open(self._path(dict_id), "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                raise KeyError(f"dictionary zstd {dict_id} tidak terdaftar") from None
+            self.add(dict_id, data, persist=False)
+            d = self._dicts[dict_id]
+        return d
+
+    def ids(self) -> list:
+        ids = set(self._dicts)
+        if os.path.isdir(self.directory):
+            ids.update(int(name.split(".")[0]) for name in os.listdir(self.directory) if name.endswith(".zdict"))
+        return sorted(ids)
+
+    def decompressor(self, dict_id: int) -> "zstandard.ZstdDecompressor":
+        """ZstdDecompressor per thread per dictionary (objek zstd tidak thread-safe)"""
+        cache = getattr(self._local, "dctx", None)
+        if cache is None:
+            cache = self._local.dctx = {}
+        dctx = cache.get(dict_id)
+        if dctx is None:
+            zstd = _zstd()
+            dctx = zstd.ZstdDecompressor(dict_data=self.get(dict_id)) if dict_id else zstd.ZstdDecompressor()
+            cache[dict_id] = dctx
+        return dctx
+
+    def decompress(self, data: bytes, dict_id: int = 0) -> bytes:
+        # dict_id dari pesan; kalau kosong pakai dict_id di header frame zstd
+        if not dict_id:
+            dict_id = _zstd().get_frame_parameters(data).dict_id
+        return self.decompressor(dict_id).decompress(data, max_output_size=MAX_OUTPUT)
+
+
+REGISTRY = DictionaryRegistry(os.getenv("ZSTD_DICT_DIR", "/app/data/zstd_dicts"))
@@ -1,11 +1,18 @@
+import json
 import os
+import threading
 import time
-import pandas as pd
+from collections import deque
+from datetime import datetime, timezone
+
+import numpy as np
 import streamlit as st
-import plotly.express as px
+import plotly.graph_objects as go
 import requests
 from pymongo import MongoClient
 
+from ring_buffer import TelemetryRing, per_window, safe_div, savings_percent, savings_per_mode, smooth_by_mode
+
 # --- 1. KONFIGURASI HALAMAN ---
 st.set_page_config(
     page_title="IoT Command Center",
@@ -22,6 +29,211 @@ def init_connection():
 client = init_connection()
 db = client[os.getenv("DB_NAME", "iot_data")]
 collection = db[os.getenv("COLLECTION_NAME", "sensor_stream")]
+# Rollup pra-agregasi dari central node (query konstan, tidak tergantung volume raw)
+rollups = db[os.getenv("ROLLUP_COLLECTION", "sensor_rollup")]
+totals = db[os.getenv("TOTALS_COLLECTION", "ingest_totals")]
+ROLLUP_WINDOW = int(os.getenv("ROLLUP_WINDOW", "1"))
+# Kapasitas ring: baris (jendela x mode) yang disimpan & diplot
+RING_CAPACITY = int(os.getenv("RING_CAPACITY", os.getenv("HISTORY_POINTS", "16384")))
+SMOOTH_POINTS = int(os.getenv("SMOOTH_POINTS", "5"))
+# Live feed SSE dari central node; kosong = polling Mongo (tetap satu poller per proses).
+# Mode multi-replika: daftar URL dipisah koma, satu follower per replika (event = increment, dijumlah)
+LIVE_FEED_URL = os.getenv("LIVE_FEED_URL", "http://central-node:9100/live")
+LIVE_FEED_URLS = [u.strip() for u in LIVE_FEED_URL.split(",") if u.strip()]
+REFRESH_S = float(os.getenv("REFRESH_S", "1"))
+# Event feed yang disimpan per replika untuk diterapkan ulang setelah bootstrap ulang dari Mongo
+REPLAY_EVENTS = int(os.getenv("LIVE_REPLAY_EVENTS", "600"))
+
+
+class LiveStore:
+    """Rollup terbaru di ring buffer kolomar, dibagi semua viewer dalam satu proses dashboard.
+
+    Diisi thread latar belakang (satu follower SSE per replika, atau polling), render hanya membaca.
+    Snapshot Mongo diambil sekali per store; ingest_totals.live_seq mencatat seq event per feed
+    yang sudah tercakup di Mongo, event sampai seq itu dilewati supaya tidak terhitung dua kali.
+    """
+
+    def __init__(self, window: int, capacity: int):
+        self.window = window
+        self.ring = TelemetryRing(capacity)
+        self.total = {"count": 0, "bytes_sent": 0, "bytes_original": 0}
+        self.status = "⏳ menghubungkan..."
+        self.updated_at = 0.0
+        # epoch feed -> seq event terakhir yang tercakup snapshot Mongo
+        self.covered = {}
+        # epoch feed -> event yang sudah diterapkan (diterapkan ulang setelah snapshot baru)
+        self._recent = {}
+        self._lock = threading.Lock()
+        self._boot_lock = threading.Lock()
+
+    def _load(self, docs, accumulate: bool):
+        # Dipanggil dengan lock dipegang
+        for d in docs:
+            ts = d["ts"]
+            if not isinstance(ts, (int, float)):
+                ts = ts.replace(tzinfo=timezone.utc).timestamp()
+            self.ring.add(ts, d["compression_type"], d["count"], d["bytes_sent"], d["bytes_original"],
+                          d["latency_sum"], d.get("decompress_us", 0.0), accumulate=accumulate)
+
+    def _set_total(self, total_doc: dict):
+        self.total = {k: total_doc.get(k, 0) for k in ("count", "bytes_sent", "bytes_original")}
+
+    def _apply(self, event: dict):
+        # Dipanggil dengan lock dipegang; event feed berisi increment (rollup di-upsert $inc di Mongo)
+        self._load((r for r in event.get("rollups", []) if r["window"] == self.window), accumulate=True)
+        for k, v in event.get("totals", {}).items():
+            self.total[k] = self.total.get(k, 0) + v
+
+    def bootstrap(self) -> dict:
+        """Isi ulang dari Mongo (sekali saat start / setelah feed tertinggal melewati ring server).
+
+        Total (beserta live_seq) dibaca sebelum rollup: rollup yang sudah tertulis selalu
+        tercakup. Event yang sudah diterapkan tapi belum ada di snapshot diterapkan ulang,
+        sehingga feed lain tidak kehilangan increment-nya. Return live_seq per epoch.
+        """
+        with self._boot_lock:
+            total_doc = totals.find_one({"_id": "all"}) or {}
+            docs = list(rollups.find({"window": self.window}, {"_id": 0}).sort("ts", -1).limit(self.ring.capacity))
+            covered = dict(total_doc.get("live_seq", {}))
+            with self._lock:
+                self.ring.clear()
+                # Beberapa sensor per (jendela, mode) dijumlah ke satu baris
+                self._load(reversed(docs), accumulate=True)
+                self._set_total(total_doc)
+                self.covered = covered
+                for epoch, events in self._recent.items():
+                    pending = [e for e in events if e["seq"] > covered.get(epoch, 0)]
+                    events.clear()
+                    events.extend(pending)
+                    for event in pending:
+                        self._apply(event)
+                self.updated_at = time.time()
+            return covered
+
+    def apply(self, event: dict, epoch: str):
+        """Terapkan event feed `epoch`, kecuali sudah tercakup snapshot Mongo"""
+        with self._lock:
+            if event["seq"] <= self.covered.get(epoch, 0):
+                return
+            recent = self._recent.get(epoch)
+            if recent is None:
+                recent = self._recent[epoch] = deque(maxlen=REPLAY_EVENTS)
+            recent.append(event)
+            self._apply(event)
+            self.updated_at = time.time()
+
+    def snapshot(self):
+        with self._lock:
+            return self.ring.view(), dict(self.total)
+
+    def _resync(self, epoch: str, seq: int, refill):
+        """Feed `epoch` kehilangan basis di `seq`: return seq untuk minta ulang event dari ring server, atau None.
+
+        Event setelah snapshot Mongo diminta ulang dari server (since=covered); kalau itu sudah
+        dicoba dan tetap tertinggal, baru snapshot baru diambil dari Mongo.
+        """
+        with self._lock:
+            covered = self.covered.get(epoch, 0)
+        if refill == (epoch, covered):
+            covered = self.bootstrap().get(epoch, 0)
+        if covered < seq and refill != (epoch, covered):
+            return covered
+        return None
+
+    @staticmethod
+    def _events(resp):
+        event_type, data = "message", None
+        for line in resp.iter_lines(decode_unicode=True):
+            if line.startswith("event:"):
+                event_type = line[6:].strip()
+            elif line.startswith("data:"):
+                data = json.loads(line[5:])
+            elif line == "" and data is not None:
+                yield event_type, data
+                event_type, data = "message", None
+
+    def _follow_sse(self, url: str):
+        # Posisi feed ini sendiri; snapshot Mongo dibagi semua feed
+        epoch, seq = None, None
+        refill = None
+        while True:
+            params = {"window": self.window}
+            if epoch is not None:
+                params.update(epoch=epoch, since=seq)
+            reconnect = False
+            try:
+                with requests.get(url, params=params, stream=True, timeout=(3, 60)) as resp:
+                    resp.raise_for_status()
+                    for event_type, data in self._events(resp):
+                        if event_type not in ("hello", "reset"):
+                            self.apply(data, epoch)
+                            seq = data["seq"]
+                            continue
+                        epoch, seq = data["epoch"], data["seq"]
+                        if data["reset"]:
+                            # Klien baru / tertinggal melewati ring server / server restart
+                            since = self._resync(epoch, seq, refill)
+                            if since is not None:
+                                refill, seq, reconnect = (epoch, since), since, True
+                                break
+                        refill = None
+                        self.status = "🟢 live (push)"
+            except Exception as exc:
+                self.status = f"🔴 feed terputus: {exc.__class__.__name__}"
+            if not reconnect:
+                time.sleep(2)
+
+    def _poll_mongo(self):
+        # Fallback tanpa feed: hanya jendela terbaru yang diambil ulang (nilai Mongo = kumulatif)
+        self.bootstrap()
+        self.status = "🟡 polling Mongo"
+        while True:
+            time.sleep(REFRESH_S)
+            try:
+                with self._lock:
+                    newest = float(self.ring.ts[:self.ring.size].max()) if self.ring.size else 0.0
+                since = datetime.fromtimestamp(newest - 5 * self.window, tz=timezone.utc)
+                docs = list(rollups.find({"window": self.window, "ts": {"$gte": since}}, {"_id": 0}))
+                total_doc = totals.find_one({"_id": "all"}) or {}
+
+                # Jumlahkan antar sensor dulu, baru timpa baris ring
+                merged = {}
+                for d in docs:
+                    key = (d["ts"], d["compression_type"])
+                    m = merged.setdefault(key, {"ts": d["ts"], "compression_type": d["compression_type"],
+                                                "count": 0, "bytes_sent": 0, "bytes_original": 0, "latency_sum": 0.0,
+                                                "decompress_us": 0.0})
+                    for k in ("count", "bytes_sent", "bytes_original", "latency_sum", "decompress_us"):
+                        m[k] += d.get(k, 0)
+                with self._lock:
+                    self._load(merged.values(), accumulate=False)
+                    self._set_total(total_doc)
+                    self.updated_at = time.time()
+            except Exception as exc:
+                self.status = f"🔴 polling gagal: {exc.__class__.__name__}"
+
+    def _follow_all(self):
+        # Satu snapshot Mongo untuk semua replika, lalu tiap follower menyusul dari seq yang tercakup
+        while True:
+            try:
+                self.bootstrap()
+                break
+            except Exception as exc:
+                self.status = f"🔴 bootstrap gagal: {exc.__class__.__name__}"
+                time.sleep(2)
+        for i, url in enumerate(LIVE_FEED_URLS):
+            threading.Thread(target=self._follow_sse, args=(url,), name=f"live-feed-{i}", daemon=True).start()
+
+    def start(self):
+        target = self._follow_all if LIVE_FEED_URLS else self._poll_mongo
+        threading.Thread(target=target, name="live-feed", daemon=True).start()
+        return self
+
+
+@st.cache_resource
+def live_store() -> LiveStore:
+    # Satu koneksi feed per proses, berapa pun jumlah viewer
+    return LiveStore(ROLLUP_WINDOW, RING_CAPACITY).start()
 
 def send_command(case_id: int):
     try:
@@ -34,7 +246,8 @@ def send_command(case_id: int):
 COLOR_MAP = {
     "RAW": "#00CC96",  # Hijau
     "LZ4": "#FFA15A",  # Oranye
-    "GZIP": "#EF553B"  # Merah
+    "GZIP": "#EF553B",  # Merah
+    "ZSTD": "#AB63FA",  # Ungu
 }
 
 # --- 3. LOGIKA UTAMA ---
@@ -63,97 +276,93 @@ def main():
             st.toast("✅ Mode: KRITIS!", icon="🔥")
 
         st.divider()
-        st.info(f"🕒 Update: {time.strftime('%H:%M:%S')}")
+        st.caption(f"Feed: {live_store().status}")
 
     # --- B. JUDUL ---
     st.title("📡 Real-time IoT Compression Analysis")
-    
-    # Placeholder Besar
-    dashboard_placeholder = st.empty()
-
-    with dashboard_placeholder.container():
-        # --- AMBIL DATA ---
-        cursor = collection.find().sort("timestamp_kirim", -1).limit(100)
-        data = list(cursor)
-
-        if not data:
-            st.warning("⏳ Menunggu data dari Edge Node...")
-            time.sleep(2)
-            st.rerun()
-            return
-
-        df = pd.DataFrame(data)
-
-        # Preprocessing
-        if "timestamp_kirim" in df.columns:
-            df["timestamp_kirim"] = pd.to_datetime(df["timestamp_kirim"])
-        df = df.sort_values(by="timestamp_kirim")
-
-        # Fix Data Size
-        if "raw_data" not in df.columns: df["raw_data"] = b""
-        if "data_size" not in df.columns: df["data_size"] = df["raw_data"].apply(len)
-        
-        # Logika Estimasi Ukuran Asli
-        if "original_size" not in df.columns:
-            df["original_size"] = df["data_size"]
-        
-        mask_fix = (df["compression_type"] == "GZIP") & (df["original_size"] <= df["data_size"])
-        df.loc[mask_fix, "original_size"] = 2720
 
-        # Data Terakhir
-        latest = df.iloc[-1]
-        mode = latest.get("compression_type", "RAW")
-        latency = latest.get("latensi_ms", 0.0)
-        
-        orig = latest.get("original_size", 2720)
-        net = latest.get("data_size", 2720)
-        saving = 100 - (net / orig * 100) if orig > 0 else 0
-
-        # Smoothing Latensi
-        if "latensi_ms" in df.columns:
-            df["latensi_smooth"] = df["latensi_ms"].rolling(window=5, min_periods=1).mean()
-        else:
-            df["latensi_smooth"] = 0
-
-        # --- RENDER KPI ---
-        kpi_cols = st.columns(4)
-        kpi_cols[0].metric("Total Paket", f"{collection.count_documents({})}")
-        
-        if mode == "GZIP":
-            kpi_cols[1].error(f"🔥 Mode: {mode}")
-        elif mode == "LZ4":
-            kpi_cols[1].warning(f"⚠️ Mode: {mode}")
-        else:
-            kpi_cols[1].success(f"✅ Mode: {mode}")
+    live_panel()
 
-        kpi_cols[2].metric("Latensi", f"{latency:.2f} ms")
-        kpi_cols[3].metric("Hemat Bandwidth", f"{saving:.1f}%")
 
-        st.divider()
+# Hanya fragment ini yang dijalankan ulang tiap REFRESH_S; data dibaca dari ring buffer
+# bersama (tanpa query Mongo per viewer), key grafik tetap supaya state zoom tidak hilang
+@st.fragment(run_every=REFRESH_S)
+def live_panel():
+    store = live_store()
+    view, total = store.snapshot()
 
-        # --- RENDER GRAFIK (VERTIKAL / ATAS BAWAH) ---
-        
-        # 1. Grafik Latensi (Full Width)
-        st.subheader("📉 Latensi (ms)")
-        fig_lat = px.line(df, x="timestamp_kirim", y="latensi_smooth", 
-                            color="compression_type", color_discrete_map=COLOR_MAP, markers=True)
-        st.plotly_chart(fig_lat, use_container_width=True, key=f"lat_chart_{time.time()}")
-
-        st.write("") # Jarak
-
-        # 2. Grafik Ukuran Data (Full Width)
-        st.subheader("📊 Ukuran Data (Bytes)")
-        df_melt = df.melt(id_vars=["timestamp_kirim"], value_vars=["data_size", "original_size"], 
-                            var_name="Tipe", value_name="Bytes")
-        df_melt["Tipe"] = df_melt["Tipe"].replace({"data_size": "Network (Kirim)", "original_size": "Sensor (Asli)"})
-        
-        fig_bar = px.bar(df_melt, x="timestamp_kirim", y="Bytes", color="Tipe", 
-                            barmode="group", color_discrete_sequence=["#EF553B", "#636EFA"])
-        st.plotly_chart(fig_bar, use_container_width=True, key=f"bar_chart_{time.time()}")
+    if len(view["ts"]) == 0:
+        st.warning(f"⏳ Menunggu data dari Edge Node... ({store.status})")
+        return
+
+    # Kolom NumPy: semua hitungan vektor, tanpa DataFrame per tick
+    modes = view["mode"]
+    names = view["modes"]
+    x = (view["ts"] * 1e3).astype("datetime64[ms]")
+    latency = safe_div(view["latency_sum"], view["count"])
+    latency_smooth = smooth_by_mode(latency, modes, SMOOTH_POINTS)
+
+    # Data Terakhir: mode dengan paket terbanyak di jendela terbaru
+    last = view["ts"][-1]
+    in_last = np.flatnonzero(view["ts"] == last)
+    latest = in_last[np.argmax(view["count"][in_last])]
+    mode = names[modes[latest]]
+    latency_now = latency[latest]
+    saving = savings_percent(view["bytes_sent"][in_last].sum(keepdims=True),
+                             view["bytes_original"][in_last].sum(keepdims=True))[0]
+
+    # --- RENDER KPI ---
+    kpi_cols = st.columns(4)
+    kpi_cols[0].metric("Total Paket", f"{total.get('count', 0)}")
+
+    if mode == "GZIP":
+        kpi_cols[1].error(f"🔥 Mode: {mode}")
+    elif mode == "LZ4":
+        kpi_cols[1].warning(f"⚠️ Mode: {mode}")
+    else:
+        kpi_cols[1].success(f"✅ Mode: {mode}")
+
+    kpi_cols[2].metric("Latensi", f"{latency_now:.2f} ms")
+    kpi_cols[3].metric("Hemat Bandwidth", f"{saving:.1f}%")
+
+    # Efisiensi per mode: byte dihemat per ms CPU dekompresi server (apakah biaya CPU GZIP sepadan)
+    codes, saved_pct, per_cpu_ms = savings_per_mode(view)
+    eff_cols = st.columns(len(codes))
+    for col, code, pct, eff in zip(eff_cols, codes, saved_pct, per_cpu_ms):
+        col.metric(f"{names[code]} · byte/ms CPU", f"{eff:,.0f}", f"hemat {pct:.1f}%", delta_color="off")
+
+    st.caption(f"🕒 Update: {time.strftime('%H:%M:%S', time.localtime(store.updated_at))} | {len(x)} titik")
+    st.divider()
+
+    # --- RENDER GRAFIK (VERTIKAL / ATAS BAWAH) ---
+    # Scattergl (WebGL) supaya puluhan ribu titik tetap ringan di browser
+
+    # 1. Grafik Latensi (Full Width)
+    st.subheader("📉 Latensi (ms)")
+    fig_lat = go.Figure()
+    for code in np.unique(modes):
+        mask = modes == code
+        name = names[code]
+        fig_lat.add_trace(go.Scattergl(
+            x=x[mask], y=latency_smooth[mask], name=name, mode="lines+markers",
+            line={"color": COLOR_MAP.get(name.split("-")[0])}, marker={"size": 4},
+        ))
+    fig_lat.update_layout(uirevision="live", legend_title_text="compression_type")
+    st.plotly_chart(fig_lat, use_container_width=True, key="lat_chart")
+
+    st.write("") # Jarak
 
-    # --- AUTO REFRESH ---
-    time.sleep(1)
-    st.rerun()
+    # 2. Grafik Ukuran Data (Full Width): rata-rata byte per paket tiap jendela
+    st.subheader("📊 Ukuran Data (Bytes)")
+    ts, packets, sent, orig = per_window(view)
+    xw = (ts * 1e3).astype("datetime64[ms]")
+    fig_size = go.Figure()
+    fig_size.add_trace(go.Scattergl(x=xw, y=safe_div(sent, packets), name="Network (Kirim)",
+                                    mode="lines", line={"color": "#EF553B"}, fill="tozeroy"))
+    fig_size.add_trace(go.Scattergl(x=xw, y=safe_div(orig, packets), name="Sensor (Asli)",
+                                    mode="lines", line={"color": "#636EFA"}))
+    fig_size.update_layout(uirevision="live", legend_title_text="Tipe")
+    st.plotly_chart(fig_size, use_container_width=True, key="bar_chart")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
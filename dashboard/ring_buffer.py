@@ -0,0 +1,131 @@
+import numpy as np
+
+# Kode mode kompresi (int8); tipe baru (mis. ZSTD-19) didaftarkan saat pertama muncul
+MODES = ["RAW", "LZ4", "GZIP", "ZSTD"]
+
+
+class TelemetryRing:
+    """Ring buffer kolomar (NumPy) untuk rollup terbaru: satu baris per (jendela, mode).
+
+    Baris baru di-append tanpa realokasi; increment untuk jendela yang sudah ada
+    (paket telat) dijumlahkan ke slot lama lewat index (ts, mode).
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.ts = np.zeros(capacity, dtype=np.float64)
+        self.mode = np.zeros(capacity, dtype=np.int8)
+        self.count = np.zeros(capacity, dtype=np.int64)
+        self.bytes_sent = np.zeros(capacity, dtype=np.int64)
+        self.bytes_original = np.zeros(capacity, dtype=np.int64)
+        self.decompress_us = np.zeros(capacity, dtype=np.float64)
+        self.latency_sum = np.zeros(capacity, dtype=np.float64)
+        self.modes = list(MODES)
+        self._codes = {m: i for i, m in enumerate(self.modes)}
+        self._index = {}
+        self.size = 0
+        self.head = 0
+
+    def mode_code(self, name: str) -> int:
+        code = self._codes.get(name)
+        if code is None:
+            code = self._codes[name] = len(self.modes)
+            self.modes.append(name)
+        return code
+
+    def clear(self):
+        self._index.clear()
+        self.size = 0
+        self.head = 0
+
+    def add(self, ts: float, mode: str, count: int, bytes_sent: int, bytes_original: int,
+            latency_sum: float, decompress_us: float = 0.0, accumulate: bool = True):
+        """accumulate=True: jumlahkan (event increment), False: timpa (nilai kumulatif dari Mongo)"""
+        code = self.mode_code(mode)
+        slot = self._index.get((ts, code))
+        if slot is None:
+            slot = self.head
+            if self.size == self.capacity:
+                # Slot tertua ditimpa
+                del self._index[(self.ts[slot], int(self.mode[slot]))]
+            else:
+                self.size += 1
+            self.head = (self.head + 1) % self.capacity
+            self._index[(ts, code)] = slot
+            self.ts[slot] = ts
+            self.mode[slot] = code
+            accumulate = False
+        if accumulate:
+            self.count[slot] += count
+            self.bytes_sent[slot] += bytes_sent
+            self.bytes_original[slot] += bytes_original
+            self.decompress_us[slot] += decompress_us
+            self.latency_sum[slot] += latency_sum
+        else:
+            self.count[slot] = count
+            self.bytes_sent[slot] = bytes_sent
+            self.bytes_original[slot] = bytes_original
+            self.decompress_us[slot] = decompress_us
+            self.latency_sum[slot] = latency_sum
+
+    def view(self) -> dict:
+        """Salinan kolom terurut waktu (aman dibaca di luar lock)"""
+        n = self.size
+        order = np.argsort(self.ts[:n], kind="stable")
+        return {
+            "ts": self.ts[:n][order],
+            "mode": self.mode[:n][order],
+            "count": self.count[:n][order],
+            "bytes_sent": self.bytes_sent[:n][order],
+            "bytes_original": self.bytes_original[:n][order],
+            "decompress_us": self.decompress_us[:n][order],
+            "latency_sum": self.latency_sum[:n][order],
+            "modes": list(self.modes),
+        }
+
+
+def safe_div(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return np.divide(a, b, out=np.zeros(len(a), dtype=np.float64), where=b > 0)
+
+
+def rolling_mean(values: np.ndarray, n: int) -> np.ndarray:
+    """Rata-rata bergerak n titik via cumsum (O(len), titik awal memakai jendela parsial)"""
+    if n <= 1 or len(values) == 0:
+        return values.astype(np.float64)
+    c = np.concatenate(([0.0], np.cumsum(values, dtype=np.float64)))
+    idx = np.arange(1, len(values) + 1)
+    lo = np.maximum(idx - n, 0)
+    return (c[idx] - c[lo]) / (idx - lo)
+
+
+def smooth_by_mode(values: np.ndarray, modes: np.ndarray, n: int) -> np.ndarray:
+    """Rolling mean terpisah per mode (urutan waktu tiap mode dipertahankan)"""
+    out = np.empty(len(values), dtype=np.float64)
+    for code in np.unique(modes):
+        mask = modes == code
+        out[mask] = rolling_mean(values[mask], n)
+    return out
+
+
+def savings_percent(bytes_sent: np.ndarray, bytes_original: np.ndarray) -> np.ndarray:
+    return 100.0 - safe_div(bytes_sent, bytes_original) * 100.0
+
+
+def per_window(view: dict):
+    """Gabung semua mode per jendela: (ts unik, paket, bytes_sent, bytes_original)"""
+    ts, inverse = np.unique(view["ts"], return_inverse=True)
+    return (
+        ts,
+        np.bincount(inverse, weights=view["count"], minlength=len(ts)),
+        np.bincount(inverse, weights=view["bytes_sent"], minlength=len(ts)),
+        np.bincount(inverse, weights=view["bytes_original"], minlength=len(ts)),
+    )
+
+
+def savings_per_mode(view: dict):
+    """Per mode di seluruh ring: (kode mode, hemat %, byte dihemat per ms CPU dekompresi server)"""
+    codes, inverse = np.unique(view["mode"], return_inverse=True)
+    sent = np.bincount(inverse, weights=view["bytes_sent"], minlength=len(codes))
+    orig = np.bincount(inverse, weights=view["bytes_original"], minlength=len(codes))
+    cpu_ms = np.bincount(inverse, weights=view["decompress_us"], minlength=len(codes)) / 1000
+    return codes, savings_percent(sent, orig), safe_div(orig - sent, cpu_ms)
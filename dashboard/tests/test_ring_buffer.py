@@ -0,0 +1,72 @@
+import numpy as np
+
+from ring_buffer import TelemetryRing, per_window, rolling_mean, savings_per_mode
+
+
+def add(ring, ts, mode="LZ4", count=1, sent=10, orig=100, **kwargs):
+    ring.add(ts, mode, count, sent, orig, latency_sum=float(count), **kwargs)
+
+
+def test_wraparound_overwrites_oldest():
+    ring = TelemetryRing(3)
+    for ts in (1.0, 2.0, 3.0, 4.0, 5.0):
+        add(ring, ts)
+
+    view = ring.view()
+    assert ring.size == 3
+    assert view["ts"].tolist() == [3.0, 4.0, 5.0]
+    # Index slot tertua ikut dibuang: jendela 1.0 datang lagi jadi baris baru
+    assert len(ring._index) == 3
+    add(ring, 1.0, count=7)
+    view = ring.view()
+    assert view["ts"].tolist() == [1.0, 4.0, 5.0]
+    assert view["count"].tolist() == [7, 1, 1]
+
+
+def test_accumulate_vs_overwrite_same_window():
+    ring = TelemetryRing(4)
+    add(ring, 10.0, count=2)
+    add(ring, 10.0, count=3)
+    add(ring, 10.0, mode="GZIP", count=5)
+    assert ring.size == 2
+    view = ring.view()
+    by_mode = {view["modes"][m]: c for m, c in zip(view["mode"], view["count"])}
+    assert by_mode == {"LZ4": 5, "GZIP": 5}
+
+    # Nilai kumulatif dari Mongo menimpa, bukan menjumlah
+    add(ring, 10.0, count=9, accumulate=False)
+    assert ring.count[ring._index[(10.0, ring.mode_code("LZ4"))]] == 9
+
+
+def test_new_mode_registered_on_first_use():
+    ring = TelemetryRing(2)
+    add(ring, 1.0, mode="ZSTD-19")
+    assert ring.view()["modes"][ring.mode[0]] == "ZSTD-19"
+
+
+def test_view_sorted_and_clear():
+    ring = TelemetryRing(4)
+    for ts in (5.0, 2.0, 9.0):
+        add(ring, ts)
+    assert ring.view()["ts"].tolist() == [2.0, 5.0, 9.0]
+    ring.clear()
+    assert ring.size == 0 and ring.view()["ts"].size == 0
+
+
+def test_aggregates():
+    ring = TelemetryRing(8)
+    add(ring, 1.0, mode="LZ4", count=2, sent=50, orig=100, decompress_us=500.0)
+    add(ring, 1.0, mode="RAW", count=1, sent=100, orig=100)
+    add(ring, 2.0, mode="LZ4", count=4, sent=50, orig=100, decompress_us=500.0)
+    view = ring.view()
+
+    ts, packets, sent, orig = per_window(view)
+    assert ts.tolist() == [1.0, 2.0]
+    assert packets.tolist() == [3, 4] and sent.tolist() == [150, 50] and orig.tolist() == [200, 100]
+
+    codes, saved_pct, per_cpu_ms = savings_per_mode(view)
+    result = {view["modes"][c]: (p, e) for c, p, e in zip(codes, saved_pct, per_cpu_ms)}
+    assert result["LZ4"] == (50.0, 100.0)
+    assert result["RAW"] == (0.0, 0.0)
+
+    assert rolling_mean(np.array([2.0, 4.0, 6.0]), 2).tolist() == [2.0, 3.0, 5.0]
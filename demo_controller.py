@@ -10,6 +10,7 @@ API_URL = "http://localhost:8080"
 MONGO_URI = "mongodb://localhost:27018"
 DB_NAME = "iot_data"
 COL_NAME = "sensor_stream"
+TOTALS_COL = "ingest_totals"
 
 def clear_screen():
     os.system('cls' if os.name == 'nt' else 'clear')
@@ -28,31 +29,54 @@ def check_db_stats():
         db = client[DB_NAME]
         col = db[COL_NAME]
         
-        pipeline = [
-            {
-                "$group": {
-                    "_id": "$compression_type",
-                    "count": {"$sum": 1},
-                    "avg_size": {"$avg": "$data_size"}
-                }
-            }
-        ]
-        
-        results = list(col.aggregate(pipeline))
-        total = col.count_documents({})
-        
+        # Running total per tipe dari central node (O(1), tidak scan sensor_stream)
+        totals = db[TOTALS_COL].find_one({"_id": "all"})
+        if totals:
+            total = totals.get("count", 0)
+            by_type = totals.get("by_type", {})
+        else:
+            # Fallback: $group di data mentah (dibatasi TTL, pakai index compression_type)
+            # Dokumen tanpa compression_type masuk ke RAW (sama seperti totals), bukan _id None
+            pipeline = [
+                {
+                    "$group": {
+                        "_id": {"$ifNull": ["$compression_type", "RAW"]},
+                        "count": {"$sum": 1},
+                        "bytes_sent": {"$sum": "$data_size"},
+                        "bytes_original": {"$sum": "$original_size"},
+                        "decompress_us": {"$sum": {"$ifNull": ["$decompress_us", 0]}},
+                    }
+                },
+                {"$sort": {"_id": 1}},
+            ]
+            by_type = {r["_id"]: r for r in col.aggregate(pipeline)}
+            total = col.estimated_document_count()
+
+        results = []
+        for mode, t in sorted(by_type.items()):
+            count, sent, orig = t.get("count", 0), t.get("bytes_sent", 0), t.get("bytes_original", 0)
+            # Efisiensi = byte dihemat per ms CPU dekompresi server
+            cpu_ms = t.get("decompress_us", 0) / 1000
+            results.append({
+                "_id": mode,
+                "count": count,
+                "avg_size": sent / count if count else 0.0,
+                "saving": 100 - sent / orig * 100 if orig else 0.0,
+                "efficiency": (orig - sent) / cpu_ms if cpu_ms > 0 else 0.0,
+            })
+
         print(f"\nDATABASE STATS (MongoDB)")
         print(f"   Total Records: {total}")
-        print("   ------------------------------------------------")
-        print(f"   {'MODE':<10} | {'COUNT':<8} | {'AVG SIZE (Bytes)':<15}")
-        print("   ------------------------------------------------")
-        
+        print("   ------------------------------------------------------------------------")
+        print(f"   {'MODE':<10} | {'COUNT':<8} | {'AVG SIZE (Bytes)':<16} | {'HEMAT %':<8} | {'BYTES/CPU ms':<12}")
+        print("   ------------------------------------------------------------------------")
+
         for r in results:
             mode = r['_id']
             count = r['count']
             avg = round(r['avg_size'], 1)
-            print(f"   {mode:<10} | {count:<8} | {avg:<15}")
-            
+            print(f"   {mode:<10} | {count:<8} | {avg:<16} | {r['saving']:<8.1f} | {r['efficiency']:<12.0f}")
+
     except Exception as e:
         print(f"Error checking DB: {e}")
 
@@ -25,8 +25,14 @@ func main() {
 	logger := slog.New(slog.NewTextHandler(os.Stdout, nil))
 	slog.SetDefault(logger)
 
-	slog.Info("Menghubungkan ke Central Node", "address", config.ServerAddress)
-	conn, err := grpc.Dial(config.ServerAddress, grpc.WithTransportCredentials(insecure.NewCredentials()))
+	// SERVER_ADDRESS: central node langsung atau router (mode multi-replika)
+	serverAddress := config.ServerAddress
+	if addr := os.Getenv("SERVER_ADDRESS"); addr != "" {
+		serverAddress = addr
+	}
+
+	slog.Info("Menghubungkan ke Central Node", "address", serverAddress)
+	conn, err := grpc.Dial(serverAddress, grpc.WithTransportCredentials(insecure.NewCredentials()))
 	if err != nil {
 		log.Fatalf("Gagal konek ke server: %v", err)
 	}
@@ -77,6 +83,7 @@ func main() {
 			Timestamp:       data.Time,
 			CompressionType: compType,
 			Data:            finalPayload,
+			Seq:             data.Seq,
 		}
 
 		if err := stream.Send(req); err != nil {
@@ -5,4 +5,5 @@ type LocalData struct {
 	Temp     float32
 	Time     float64
 	Payload  []byte
+	Seq      uint64 // nomor urut per sensor, dipakai server untuk deteksi loss/reorder
 }
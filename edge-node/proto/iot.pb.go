@@ -1,7 +1,7 @@
 // Code generated by protoc-gen-go. DO NOT EDIT.
 // versions:
 // 	protoc-gen-go v1.36.10
-// 	protoc        v3.19.6
+// 	protoc        v3.21.12
 // source: proto/iot.proto
 
 package proto
@@ -21,13 +21,67 @@ const (
 	_ = protoimpl.EnforceVersion(protoimpl.MaxVersion - 20)
 )
 
+type Compression int32
+
+const (
+	Compression_RAW  Compression = 0
+	Compression_LZ4  Compression = 1
+	Compression_GZIP Compression = 2
+	Compression_ZSTD Compression = 3
+)
+
+// Enum value maps for Compression.
+var (
+	Compression_name = map[int32]string{
+		0: "RAW",
+		1: "LZ4",
+		2: "GZIP",
+		3: "ZSTD",
+	}
+	Compression_value = map[string]int32{
+		"RAW":  0,
+		"LZ4":  1,
+		"GZIP": 2,
+		"ZSTD": 3,
+	}
+)
+
+func (x Compression) Enum() *Compression {
+	p := new(Compression)
+	*p = x
+	return p
+}
+
+func (x Compression) String() string {
+	return protoimpl.X.EnumStringOf(x.Descriptor(), protoreflect.EnumNumber(x))
+}
+
+func (Compression) Descriptor() protoreflect.EnumDescriptor {
+	return file_proto_iot_proto_enumTypes[0].Descriptor()
+}
+
+func (Compression) Type() protoreflect.EnumType {
+	return &file_proto_iot_proto_enumTypes[0]
+}
+
+func (x Compression) Number() protoreflect.EnumNumber {
+	return protoreflect.EnumNumber(x)
+}
+
+// Deprecated: Use Compression.Descriptor instead.
+func (Compression) EnumDescriptor() ([]byte, []int) {
+	return file_proto_iot_proto_rawDescGZIP(), []int{0}
+}
+
 // Struktur Data yang dikirim
 type SensorData struct {
 	state           protoimpl.MessageState `protogen:"open.v1"`
 	SensorId        string                 `protobuf:"bytes,1,opt,name=sensor_id,json=sensorId,proto3" json:"sensor_id,omitempty"`
 	Timestamp       float64                `protobuf:"fixed64,2,opt,name=timestamp,proto3" json:"timestamp,omitempty"`
-	CompressionType string                 `protobuf:"bytes,3,opt,name=compression_type,json=compressionType,proto3" json:"compression_type,omitempty"`
+	CompressionType string                 `protobuf:"bytes,3,opt,name=compression_type,json=compressionType,proto3" json:"compression_type,omitempty"` // RAW | LZ4 | GZIP | ZSTD (boleh "ZSTD-<level>")
 	Data            []byte                 `protobuf:"bytes,4,opt,name=data,proto3" json:"data,omitempty"`
+	DictId          uint32                 `protobuf:"varint,5,opt,name=dict_id,json=dictId,proto3" json:"dict_id,omitempty"` // dictionary zstd yang dipakai (0 = tanpa / dari header frame)
+	Seq             uint64                 `protobuf:"varint,6,opt,name=seq,proto3" json:"seq,omitempty"`                     // nomor urut per sensor, naik 1 tiap reading (0 = tidak diisi)
 	unknownFields   protoimpl.UnknownFields
 	sizeCache       protoimpl.SizeCache
 }
@@ -90,6 +144,113 @@ func (x *SensorData) GetData() []byte {
 	return nil
 }
 
+func (x *SensorData) GetDictId() uint32 {
+	if x != nil {
+		return x.DictId
+	}
+	return 0
+}
+
+func (x *SensorData) GetSeq() uint64 {
+	if x != nil {
+		return x.Seq
+	}
+	return 0
+}
+
+// Batch reading: data = gabungan reading (panjang sesuai lengths) yang dikompresi sekali
+type SensorBatch struct {
+	state         protoimpl.MessageState `protogen:"open.v1"`
+	SensorId      string                 `protobuf:"bytes,1,opt,name=sensor_id,json=sensorId,proto3" json:"sensor_id,omitempty"`
+	Compression   Compression            `protobuf:"varint,2,opt,name=compression,proto3,enum=iot.Compression" json:"compression,omitempty"`
+	Timestamps    []float64              `protobuf:"fixed64,3,rep,packed,name=timestamps,proto3" json:"timestamps,omitempty"` // satu per reading
+	Lengths       []uint32               `protobuf:"varint,4,rep,packed,name=lengths,proto3" json:"lengths,omitempty"`        // panjang tiap reading di block terdekompresi
+	Data          []byte                 `protobuf:"bytes,5,opt,name=data,proto3" json:"data,omitempty"`
+	DictId        uint32                 `protobuf:"varint,6,opt,name=dict_id,json=dictId,proto3" json:"dict_id,omitempty"`       // dictionary zstd (0 = tanpa / dari header frame)
+	FirstSeq      uint64                 `protobuf:"varint,7,opt,name=first_seq,json=firstSeq,proto3" json:"first_seq,omitempty"` // seq reading pertama; reading ke-i = first_seq + i (0 = tidak diisi)
+	unknownFields protoimpl.UnknownFields
+	sizeCache     protoimpl.SizeCache
+}
+
+func (x *SensorBatch) Reset() {
+	*x = SensorBatch{}
+	mi := &file_proto_iot_proto_msgTypes[1]
+	ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+	ms.StoreMessageInfo(mi)
+}
+
+func (x *SensorBatch) String() string {
+	return protoimpl.X.MessageStringOf(x)
+}
+
+func (*SensorBatch) ProtoMessage() {}
+
+func (x *SensorBatch) ProtoReflect() protoreflect.Message {
+	mi := &file_proto_iot_proto_msgTypes[1]
+	if x != nil {
+		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+		if ms.LoadMessageInfo() == nil {
+			ms.StoreMessageInfo(mi)
+		}
+		return ms
+	}
+	return mi.MessageOf(x)
+}
+
+// Deprecated: Use SensorBatch.ProtoReflect.Descriptor instead.
+func (*SensorBatch) Descriptor() ([]byte, []int) {
+	return file_proto_iot_proto_rawDescGZIP(), []int{1}
+}
+
+func (x *SensorBatch) GetSensorId() string {
+	if x != nil {
+		return x.SensorId
+	}
+	return ""
+}
+
+func (x *SensorBatch) GetCompression() Compression {
+	if x != nil {
+		return x.Compression
+	}
+	return Compression_RAW
+}
+
+func (x *SensorBatch) GetTimestamps() []float64 {
+	if x != nil {
+		return x.Timestamps
+	}
+	return nil
+}
+
+func (x *SensorBatch) GetLengths() []uint32 {
+	if x != nil {
+		return x.Lengths
+	}
+	return nil
+}
+
+func (x *SensorBatch) GetData() []byte {
+	if x != nil {
+		return x.Data
+	}
+	return nil
+}
+
+func (x *SensorBatch) GetDictId() uint32 {
+	if x != nil {
+		return x.DictId
+	}
+	return 0
+}
+
+func (x *SensorBatch) GetFirstSeq() uint64 {
+	if x != nil {
+		return x.FirstSeq
+	}
+	return 0
+}
+
 // Balasan dari Server
 type ServerResponse struct {
 	state         protoimpl.MessageState `protogen:"open.v1"`
@@ -101,7 +262,7 @@ type ServerResponse struct {
 
 func (x *ServerResponse) Reset() {
 	*x = ServerResponse{}
-	mi := &file_proto_iot_proto_msgTypes[1]
+	mi := &file_proto_iot_proto_msgTypes[2]
 	ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
 	ms.StoreMessageInfo(mi)
 }
@@ -113,7 +274,7 @@ func (x *ServerResponse) String() string {
 func (*ServerResponse) ProtoMessage() {}
 
 func (x *ServerResponse) ProtoReflect() protoreflect.Message {
-	mi := &file_proto_iot_proto_msgTypes[1]
+	mi := &file_proto_iot_proto_msgTypes[2]
 	if x != nil {
 		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
 		if ms.LoadMessageInfo() == nil {
@@ -126,7 +287,7 @@ func (x *ServerResponse) ProtoReflect() protoreflect.Message {
 
 // Deprecated: Use ServerResponse.ProtoReflect.Descriptor instead.
 func (*ServerResponse) Descriptor() ([]byte, []int) {
-	return file_proto_iot_proto_rawDescGZIP(), []int{1}
+	return file_proto_iot_proto_rawDescGZIP(), []int{2}
 }
 
 func (x *ServerResponse) GetSuccess() bool {
@@ -143,23 +304,378 @@ func (x *ServerResponse) GetMessage() string {
 	return ""
 }
 
+// Statistik per mode kompresi selama satu interval feedback
+type ModeStats struct {
+	state              protoimpl.MessageState `protogen:"open.v1"`
+	CompressionType    string                 `protobuf:"bytes,1,opt,name=compression_type,json=compressionType,proto3" json:"compression_type,omitempty"`
+	Packets            uint64                 `protobuf:"varint,2,opt,name=packets,proto3" json:"packets,omitempty"`
+	LatencyP50Ms       float64                `protobuf:"fixed64,3,opt,name=latency_p50_ms,json=latencyP50Ms,proto3" json:"latency_p50_ms,omitempty"`
+	LatencyP95Ms       float64                `protobuf:"fixed64,4,opt,name=latency_p95_ms,json=latencyP95Ms,proto3" json:"latency_p95_ms,omitempty"`
+	DecompressUs       float64                `protobuf:"fixed64,5,opt,name=decompress_us,json=decompressUs,proto3" json:"decompress_us,omitempty"`                         // rata-rata biaya dekompresi server
+	Ratio              float64                `protobuf:"fixed64,6,opt,name=ratio,proto3" json:"ratio,omitempty"`                                                           // bytes_sent / bytes_original
+	BytesSavedPerCpuMs float64                `protobuf:"fixed64,7,opt,name=bytes_saved_per_cpu_ms,json=bytesSavedPerCpuMs,proto3" json:"bytes_saved_per_cpu_ms,omitempty"` // efisiensi: byte hemat per ms CPU dekompresi
+	unknownFields      protoimpl.UnknownFields
+	sizeCache          protoimpl.SizeCache
+}
+
+func (x *ModeStats) Reset() {
+	*x = ModeStats{}
+	mi := &file_proto_iot_proto_msgTypes[3]
+	ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+	ms.StoreMessageInfo(mi)
+}
+
+func (x *ModeStats) String() string {
+	return protoimpl.X.MessageStringOf(x)
+}
+
+func (*ModeStats) ProtoMessage() {}
+
+func (x *ModeStats) ProtoReflect() protoreflect.Message {
+	mi := &file_proto_iot_proto_msgTypes[3]
+	if x != nil {
+		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+		if ms.LoadMessageInfo() == nil {
+			ms.StoreMessageInfo(mi)
+		}
+		return ms
+	}
+	return mi.MessageOf(x)
+}
+
+// Deprecated: Use ModeStats.ProtoReflect.Descriptor instead.
+func (*ModeStats) Descriptor() ([]byte, []int) {
+	return file_proto_iot_proto_rawDescGZIP(), []int{3}
+}
+
+func (x *ModeStats) GetCompressionType() string {
+	if x != nil {
+		return x.CompressionType
+	}
+	return ""
+}
+
+func (x *ModeStats) GetPackets() uint64 {
+	if x != nil {
+		return x.Packets
+	}
+	return 0
+}
+
+func (x *ModeStats) GetLatencyP50Ms() float64 {
+	if x != nil {
+		return x.LatencyP50Ms
+	}
+	return 0
+}
+
+func (x *ModeStats) GetLatencyP95Ms() float64 {
+	if x != nil {
+		return x.LatencyP95Ms
+	}
+	return 0
+}
+
+func (x *ModeStats) GetDecompressUs() float64 {
+	if x != nil {
+		return x.DecompressUs
+	}
+	return 0
+}
+
+func (x *ModeStats) GetRatio() float64 {
+	if x != nil {
+		return x.Ratio
+	}
+	return 0
+}
+
+func (x *ModeStats) GetBytesSavedPerCpuMs() float64 {
+	if x != nil {
+		return x.BytesSavedPerCpuMs
+	}
+	return 0
+}
+
+// Ack periodik dari server (StreamWithFeedback)
+type ServerFeedback struct {
+	state               protoimpl.MessageState `protogen:"open.v1"`
+	Acked               uint64                 `protobuf:"varint,1,opt,name=acked,proto3" json:"acked,omitempty"` // total paket stream ini yang sudah diproses
+	ServerTime          float64                `protobuf:"fixed64,2,opt,name=server_time,json=serverTime,proto3" json:"server_time,omitempty"`
+	IngestLagMs         float64                `protobuf:"fixed64,3,opt,name=ingest_lag_ms,json=ingestLagMs,proto3" json:"ingest_lag_ms,omitempty"` // p95 latensi interval terakhir
+	QueueDepth          uint32                 `protobuf:"varint,4,opt,name=queue_depth,json=queueDepth,proto3" json:"queue_depth,omitempty"`       // antrian writer DB
+	DecompressSaturated bool                   `protobuf:"varint,5,opt,name=decompress_saturated,json=decompressSaturated,proto3" json:"decompress_saturated,omitempty"`
+	Modes               []*ModeStats           `protobuf:"bytes,6,rep,name=modes,proto3" json:"modes,omitempty"`
+	RecommendedMode     string                 `protobuf:"bytes,7,opt,name=recommended_mode,json=recommendedMode,proto3" json:"recommended_mode,omitempty"`
+	unknownFields       protoimpl.UnknownFields
+	sizeCache           protoimpl.SizeCache
+}
+
+func (x *ServerFeedback) Reset() {
+	*x = ServerFeedback{}
+	mi := &file_proto_iot_proto_msgTypes[4]
+	ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+	ms.StoreMessageInfo(mi)
+}
+
+func (x *ServerFeedback) String() string {
+	return protoimpl.X.MessageStringOf(x)
+}
+
+func (*ServerFeedback) ProtoMessage() {}
+
+func (x *ServerFeedback) ProtoReflect() protoreflect.Message {
+	mi := &file_proto_iot_proto_msgTypes[4]
+	if x != nil {
+		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+		if ms.LoadMessageInfo() == nil {
+			ms.StoreMessageInfo(mi)
+		}
+		return ms
+	}
+	return mi.MessageOf(x)
+}
+
+// Deprecated: Use ServerFeedback.ProtoReflect.Descriptor instead.
+func (*ServerFeedback) Descriptor() ([]byte, []int) {
+	return file_proto_iot_proto_rawDescGZIP(), []int{4}
+}
+
+func (x *ServerFeedback) GetAcked() uint64 {
+	if x != nil {
+		return x.Acked
+	}
+	return 0
+}
+
+func (x *ServerFeedback) GetServerTime() float64 {
+	if x != nil {
+		return x.ServerTime
+	}
+	return 0
+}
+
+func (x *ServerFeedback) GetIngestLagMs() float64 {
+	if x != nil {
+		return x.IngestLagMs
+	}
+	return 0
+}
+
+func (x *ServerFeedback) GetQueueDepth() uint32 {
+	if x != nil {
+		return x.QueueDepth
+	}
+	return 0
+}
+
+func (x *ServerFeedback) GetDecompressSaturated() bool {
+	if x != nil {
+		return x.DecompressSaturated
+	}
+	return false
+}
+
+func (x *ServerFeedback) GetModes() []*ModeStats {
+	if x != nil {
+		return x.Modes
+	}
+	return nil
+}
+
+func (x *ServerFeedback) GetRecommendedMode() string {
+	if x != nil {
+		return x.RecommendedMode
+	}
+	return ""
+}
+
+type HealthRequest struct {
+	state         protoimpl.MessageState `protogen:"open.v1"`
+	unknownFields protoimpl.UnknownFields
+	sizeCache     protoimpl.SizeCache
+}
+
+func (x *HealthRequest) Reset() {
+	*x = HealthRequest{}
+	mi := &file_proto_iot_proto_msgTypes[5]
+	ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+	ms.StoreMessageInfo(mi)
+}
+
+func (x *HealthRequest) String() string {
+	return protoimpl.X.MessageStringOf(x)
+}
+
+func (*HealthRequest) ProtoMessage() {}
+
+func (x *HealthRequest) ProtoReflect() protoreflect.Message {
+	mi := &file_proto_iot_proto_msgTypes[5]
+	if x != nil {
+		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+		if ms.LoadMessageInfo() == nil {
+			ms.StoreMessageInfo(mi)
+		}
+		return ms
+	}
+	return mi.MessageOf(x)
+}
+
+// Deprecated: Use HealthRequest.ProtoReflect.Descriptor instead.
+func (*HealthRequest) Descriptor() ([]byte, []int) {
+	return file_proto_iot_proto_rawDescGZIP(), []int{5}
+}
+
+// Status replika central node
+type HealthStatus struct {
+	state         protoimpl.MessageState `protogen:"open.v1"`
+	ReplicaId     string                 `protobuf:"bytes,1,opt,name=replica_id,json=replicaId,proto3" json:"replica_id,omitempty"`
+	Ready         bool                   `protobuf:"varint,2,opt,name=ready,proto3" json:"ready,omitempty"`       // siap menerima stream baru
+	Draining      bool                   `protobuf:"varint,3,opt,name=draining,proto3" json:"draining,omitempty"` // sedang shutdown: router harus memindahkan sensor
+	ActiveStreams uint32                 `protobuf:"varint,4,opt,name=active_streams,json=activeStreams,proto3" json:"active_streams,omitempty"`
+	Received      uint64                 `protobuf:"varint,5,opt,name=received,proto3" json:"received,omitempty"`                       // total paket diterima sejak start
+	QueueDepth    uint32                 `protobuf:"varint,6,opt,name=queue_depth,json=queueDepth,proto3" json:"queue_depth,omitempty"` // antrian writer DB
+	unknownFields protoimpl.UnknownFields
+	sizeCache     protoimpl.SizeCache
+}
+
+func (x *HealthStatus) Reset() {
+	*x = HealthStatus{}
+	mi := &file_proto_iot_proto_msgTypes[6]
+	ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+	ms.StoreMessageInfo(mi)
+}
+
+func (x *HealthStatus) String() string {
+	return protoimpl.X.MessageStringOf(x)
+}
+
+func (*HealthStatus) ProtoMessage() {}
+
+func (x *HealthStatus) ProtoReflect() protoreflect.Message {
+	mi := &file_proto_iot_proto_msgTypes[6]
+	if x != nil {
+		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+		if ms.LoadMessageInfo() == nil {
+			ms.StoreMessageInfo(mi)
+		}
+		return ms
+	}
+	return mi.MessageOf(x)
+}
+
+// Deprecated: Use HealthStatus.ProtoReflect.Descriptor instead.
+func (*HealthStatus) Descriptor() ([]byte, []int) {
+	return file_proto_iot_proto_rawDescGZIP(), []int{6}
+}
+
+func (x *HealthStatus) GetReplicaId() string {
+	if x != nil {
+		return x.ReplicaId
+	}
+	return ""
+}
+
+func (x *HealthStatus) GetReady() bool {
+	if x != nil {
+		return x.Ready
+	}
+	return false
+}
+
+func (x *HealthStatus) GetDraining() bool {
+	if x != nil {
+		return x.Draining
+	}
+	return false
+}
+
+func (x *HealthStatus) GetActiveStreams() uint32 {
+	if x != nil {
+		return x.ActiveStreams
+	}
+	return 0
+}
+
+func (x *HealthStatus) GetReceived() uint64 {
+	if x != nil {
+		return x.Received
+	}
+	return 0
+}
+
+func (x *HealthStatus) GetQueueDepth() uint32 {
+	if x != nil {
+		return x.QueueDepth
+	}
+	return 0
+}
+
 var File_proto_iot_proto protoreflect.FileDescriptor
 
 const file_proto_iot_proto_rawDesc = "" +
 	"\n" +
-	"\x0fproto/iot.proto\x12\x03iot\"\x86\x01\n" +
+	"\x0fproto/iot.proto\x12\x03iot\"\xb1\x01\n" +
 	"\n" +
 	"SensorData\x12\x1b\n" +
 	"\tsensor_id\x18\x01 \x01(\tR\bsensorId\x12\x1c\n" +
 	"\ttimestamp\x18\x02 \x01(\x01R\ttimestamp\x12)\n" +
 	"\x10compression_type\x18\x03 \x01(\tR\x0fcompressionType\x12\x12\n" +
-	"\x04data\x18\x04 \x01(\fR\x04data\"D\n" +
+	"\x04data\x18\x04 \x01(\fR\x04data\x12\x17\n" +
+	"\adict_id\x18\x05 \x01(\rR\x06dictId\x12\x10\n" +
+	"\x03seq\x18\x06 \x01(\x04R\x03seq\"\xe2\x01\n" +
+	"\vSensorBatch\x12\x1b\n" +
+	"\tsensor_id\x18\x01 \x01(\tR\bsensorId\x122\n" +
+	"\vcompression\x18\x02 \x01(\x0e2\x10.iot.CompressionR\vcompression\x12\x1e\n" +
+	"\n" +
+	"timestamps\x18\x03 \x03(\x01R\n" +
+	"timestamps\x12\x18\n" +
+	"\alengths\x18\x04 \x03(\rR\alengths\x12\x12\n" +
+	"\x04data\x18\x05 \x01(\fR\x04data\x12\x17\n" +
+	"\adict_id\x18\x06 \x01(\rR\x06dictId\x12\x1b\n" +
+	"\tfirst_seq\x18\a \x01(\x04R\bfirstSeq\"D\n" +
 	"\x0eServerResponse\x12\x18\n" +
 	"\asuccess\x18\x01 \x01(\bR\asuccess\x12\x18\n" +
-	"\amessage\x18\x02 \x01(\tR\amessage2D\n" +
+	"\amessage\x18\x02 \x01(\tR\amessage\"\x8b\x02\n" +
+	"\tModeStats\x12)\n" +
+	"\x10compression_type\x18\x01 \x01(\tR\x0fcompressionType\x12\x18\n" +
+	"\apackets\x18\x02 \x01(\x04R\apackets\x12$\n" +
+	"\x0elatency_p50_ms\x18\x03 \x01(\x01R\flatencyP50Ms\x12$\n" +
+	"\x0elatency_p95_ms\x18\x04 \x01(\x01R\flatencyP95Ms\x12#\n" +
+	"\rdecompress_us\x18\x05 \x01(\x01R\fdecompressUs\x12\x14\n" +
+	"\x05ratio\x18\x06 \x01(\x01R\x05ratio\x122\n" +
+	"\x16bytes_saved_per_cpu_ms\x18\a \x01(\x01R\x12bytesSavedPerCpuMs\"\x90\x02\n" +
+	"\x0eServerFeedback\x12\x14\n" +
+	"\x05acked\x18\x01 \x01(\x04R\x05acked\x12\x1f\n" +
+	"\vserver_time\x18\x02 \x01(\x01R\n" +
+	"serverTime\x12\"\n" +
+	"\ringest_lag_ms\x18\x03 \x01(\x01R\vingestLagMs\x12\x1f\n" +
+	"\vqueue_depth\x18\x04 \x01(\rR\n" +
+	"queueDepth\x121\n" +
+	"\x14decompress_saturated\x18\x05 \x01(\bR\x13decompressSaturated\x12$\n" +
+	"\x05modes\x18\x06 \x03(\v2\x0e.iot.ModeStatsR\x05modes\x12)\n" +
+	"\x10recommended_mode\x18\a \x01(\tR\x0frecommendedMode\"\x0f\n" +
+	"\rHealthRequest\"\xc3\x01\n" +
+	"\fHealthStatus\x12\x1d\n" +
+	"\n" +
+	"replica_id\x18\x01 \x01(\tR\treplicaId\x12\x14\n" +
+	"\x05ready\x18\x02 \x01(\bR\x05ready\x12\x1a\n" +
+	"\bdraining\x18\x03 \x01(\bR\bdraining\x12%\n" +
+	"\x0eactive_streams\x18\x04 \x01(\rR\ractiveStreams\x12\x1a\n" +
+	"\breceived\x18\x05 \x01(\x04R\breceived\x12\x1f\n" +
+	"\vqueue_depth\x18\x06 \x01(\rR\n" +
+	"queueDepth*3\n" +
+	"\vCompression\x12\a\n" +
+	"\x03RAW\x10\x00\x12\a\n" +
+	"\x03LZ4\x10\x01\x12\b\n" +
+	"\x04GZIP\x10\x02\x12\b\n" +
+	"\x04ZSTD\x10\x032\xf1\x01\n" +
 	"\fDataTransfer\x124\n" +
 	"\n" +
-	"SendStream\x12\x0f.iot.SensorData\x1a\x13.iot.ServerResponse(\x01B\tZ\a./protob\x06proto3"
+	"SendStream\x12\x0f.iot.SensorData\x1a\x13.iot.ServerResponse(\x01\x12>\n" +
+	"\x12StreamWithFeedback\x12\x0f.iot.SensorData\x1a\x13.iot.ServerFeedback(\x010\x01\x12:\n" +
+	"\x0fSendBatchStream\x12\x10.iot.SensorBatch\x1a\x13.iot.ServerResponse(\x01\x12/\n" +
+	"\x06Health\x12\x12.iot.HealthRequest\x1a\x11.iot.HealthStatusB\tZ\a./protob\x06proto3"
 
 var (
 	file_proto_iot_proto_rawDescOnce sync.Once
@@ -173,19 +689,34 @@ func file_proto_iot_proto_rawDescGZIP() []byte {
 	return file_proto_iot_proto_rawDescData
 }
 
-var file_proto_iot_proto_msgTypes = make([]protoimpl.MessageInfo, 2)
+var file_proto_iot_proto_enumTypes = make([]protoimpl.EnumInfo, 1)
+var file_proto_iot_proto_msgTypes = make([]protoimpl.MessageInfo, 7)
 var file_proto_iot_proto_goTypes = []any{
-	(*SensorData)(nil),     // 0: iot.SensorData
-	(*ServerResponse)(nil), // 1: iot.ServerResponse
+	(Compression)(0),       // 0: iot.Compression
+	(*SensorData)(nil),     // 1: iot.SensorData
+	(*SensorBatch)(nil),    // 2: iot.SensorBatch
+	(*ServerResponse)(nil), // 3: iot.ServerResponse
+	(*ModeStats)(nil),      // 4: iot.ModeStats
+	(*ServerFeedback)(nil), // 5: iot.ServerFeedback
+	(*HealthRequest)(nil),  // 6: iot.HealthRequest
+	(*HealthStatus)(nil),   // 7: iot.HealthStatus
 }
 var file_proto_iot_proto_depIdxs = []int32{
-	0, // 0: iot.DataTransfer.SendStream:input_type -> iot.SensorData
-	1, // 1: iot.DataTransfer.SendStream:output_type -> iot.ServerResponse
-	1, // [1:2] is the sub-list for method output_type
-	0, // [0:1] is the sub-list for method input_type
-	0, // [0:0] is the sub-list for extension type_name
-	0, // [0:0] is the sub-list for extension extendee
-	0, // [0:0] is the sub-list for field type_name
+	0, // 0: iot.SensorBatch.compression:type_name -> iot.Compression
+	4, // 1: iot.ServerFeedback.modes:type_name -> iot.ModeStats
+	1, // 2: iot.DataTransfer.SendStream:input_type -> iot.SensorData
+	1, // 3: iot.DataTransfer.StreamWithFeedback:input_type -> iot.SensorData
+	2, // 4: iot.DataTransfer.SendBatchStream:input_type -> iot.SensorBatch
+	6, // 5: iot.DataTransfer.Health:input_type -> iot.HealthRequest
+	3, // 6: iot.DataTransfer.SendStream:output_type -> iot.ServerResponse
+	5, // 7: iot.DataTransfer.StreamWithFeedback:output_type -> iot.ServerFeedback
+	3, // 8: iot.DataTransfer.SendBatchStream:output_type -> iot.ServerResponse
+	7, // 9: iot.DataTransfer.Health:output_type -> iot.HealthStatus
+	6, // [6:10] is the sub-list for method output_type
+	2, // [2:6] is the sub-list for method input_type
+	2, // [2:2] is the sub-list for extension type_name
+	2, // [2:2] is the sub-list for extension extendee
+	0, // [0:2] is the sub-list for field type_name
 }
 
 func init() { file_proto_iot_proto_init() }
@@ -198,13 +729,14 @@ func file_proto_iot_proto_init() {
 		File: protoimpl.DescBuilder{
 			GoPackagePath: reflect.TypeOf(x{}).PkgPath(),
 			RawDescriptor: unsafe.Slice(unsafe.StringData(file_proto_iot_proto_rawDesc), len(file_proto_iot_proto_rawDesc)),
-			NumEnums:      0,
-			NumMessages:   2,
+			NumEnums:      1,
+			NumMessages:   7,
 			NumExtensions: 0,
 			NumServices:   1,
 		},
 		GoTypes:           file_proto_iot_proto_goTypes,
 		DependencyIndexes: file_proto_iot_proto_depIdxs,
+		EnumInfos:         file_proto_iot_proto_enumTypes,
 		MessageInfos:      file_proto_iot_proto_msgTypes,
 	}.Build()
 	File_proto_iot_proto = out.File
@@ -1,7 +1,7 @@
 // Code generated by protoc-gen-go-grpc. DO NOT EDIT.
 // versions:
 // - protoc-gen-go-grpc v1.6.0
-// - protoc             v3.19.6
+// - protoc             v3.21.12
 // source: proto/iot.proto
 
 package proto
@@ -19,7 +19,10 @@ import (
 const _ = grpc.SupportPackageIsVersion9
 
 const (
-	DataTransfer_SendStream_FullMethodName = "/iot.DataTransfer/SendStream"
+	DataTransfer_SendStream_FullMethodName         = "/iot.DataTransfer/SendStream"
+	DataTransfer_StreamWithFeedback_FullMethodName = "/iot.DataTransfer/StreamWithFeedback"
+	DataTransfer_SendBatchStream_FullMethodName    = "/iot.DataTransfer/SendBatchStream"
+	DataTransfer_Health_FullMethodName             = "/iot.DataTransfer/Health"
 )
 
 // DataTransferClient is the client API for DataTransfer service.
@@ -30,6 +33,13 @@ const (
 type DataTransferClient interface {
 	// Menggunakan "stream" agar data bisa mengalir terus menerus tanpa putus koneksi
 	SendStream(ctx context.Context, opts ...grpc.CallOption) (grpc.ClientStreamingClient[SensorData, ServerResponse], error)
+	// Dua arah: server mengirim ack periodik berisi kondisi ingest & efisiensi tiap mode,
+	// supaya edge bisa memilih RAW / LZ4 / GZIP berdasarkan kondisi end-to-end
+	StreamWithFeedback(ctx context.Context, opts ...grpc.CallOption) (grpc.BidiStreamingClient[SensorData, ServerFeedback], error)
+	// Batch: N reading dikompresi sebagai satu block, framing gRPC/HTTP2 dibayar sekali
+	SendBatchStream(ctx context.Context, opts ...grpc.CallOption) (grpc.ClientStreamingClient[SensorBatch, ServerResponse], error)
+	// Kesiapan replika (dipakai router untuk memilih / men-drain replika)
+	Health(ctx context.Context, in *HealthRequest, opts ...grpc.CallOption) (*HealthStatus, error)
 }
 
 type dataTransferClient struct {
@@ -53,6 +63,42 @@ func (c *dataTransferClient) SendStream(ctx context.Context, opts ...grpc.CallOp
 // This type alias is provided for backwards compatibility with existing code that references the prior non-generic stream type by name.
 type DataTransfer_SendStreamClient = grpc.ClientStreamingClient[SensorData, ServerResponse]
 
+func (c *dataTransferClient) StreamWithFeedback(ctx context.Context, opts ...grpc.CallOption) (grpc.BidiStreamingClient[SensorData, ServerFeedback], error) {
+	cOpts := append([]grpc.CallOption{grpc.StaticMethod()}, opts...)
+	stream, err := c.cc.NewStream(ctx, &DataTransfer_ServiceDesc.Streams[1], DataTransfer_StreamWithFeedback_FullMethodName, cOpts...)
+	if err != nil {
+		return nil, err
+	}
+	x := &grpc.GenericClientStream[SensorData, ServerFeedback]{ClientStream: stream}
+	return x, nil
+}
+
+// This type alias is provided for backwards compatibility with existing code that references the prior non-generic stream type by name.
+type DataTransfer_StreamWithFeedbackClient = grpc.BidiStreamingClient[SensorData, ServerFeedback]
+
+func (c *dataTransferClient) SendBatchStream(ctx context.Context, opts ...grpc.CallOption) (grpc.ClientStreamingClient[SensorBatch, ServerResponse], error) {
+	cOpts := append([]grpc.CallOption{grpc.StaticMethod()}, opts...)
+	stream, err := c.cc.NewStream(ctx, &DataTransfer_ServiceDesc.Streams[2], DataTransfer_SendBatchStream_FullMethodName, cOpts...)
+	if err != nil {
+		return nil, err
+	}
+	x := &grpc.GenericClientStream[SensorBatch, ServerResponse]{ClientStream: stream}
+	return x, nil
+}
+
+// This type alias is provided for backwards compatibility with existing code that references the prior non-generic stream type by name.
+type DataTransfer_SendBatchStreamClient = grpc.ClientStreamingClient[SensorBatch, ServerResponse]
+
+func (c *dataTransferClient) Health(ctx context.Context, in *HealthRequest, opts ...grpc.CallOption) (*HealthStatus, error) {
+	cOpts := append([]grpc.CallOption{grpc.StaticMethod()}, opts...)
+	out := new(HealthStatus)
+	err := c.cc.Invoke(ctx, DataTransfer_Health_FullMethodName, in, out, cOpts...)
+	if err != nil {
+		return nil, err
+	}
+	return out, nil
+}
+
 // DataTransferServer is the server API for DataTransfer service.
 // All implementations must embed UnimplementedDataTransferServer
 // for forward compatibility.
@@ -61,6 +107,13 @@ type DataTransfer_SendStreamClient = grpc.ClientStreamingClient[SensorData, Serv
 type DataTransferServer interface {
 	// Menggunakan "stream" agar data bisa mengalir terus menerus tanpa putus koneksi
 	SendStream(grpc.ClientStreamingServer[SensorData, ServerResponse]) error
+	// Dua arah: server mengirim ack periodik berisi kondisi ingest & efisiensi tiap mode,
+	// supaya edge bisa memilih RAW / LZ4 / GZIP berdasarkan kondisi end-to-end
+	StreamWithFeedback(grpc.BidiStreamingServer[SensorData, ServerFeedback]) error
+	// Batch: N reading dikompresi sebagai satu block, framing gRPC/HTTP2 dibayar sekali
+	SendBatchStream(grpc.ClientStreamingServer[SensorBatch, ServerResponse]) error
+	// Kesiapan replika (dipakai router untuk memilih / men-drain replika)
+	Health(context.Context, *HealthRequest) (*HealthStatus, error)
 	mustEmbedUnimplementedDataTransferServer()
 }
 
@@ -74,6 +127,15 @@ type UnimplementedDataTransferServer struct{}
 func (UnimplementedDataTransferServer) SendStream(grpc.ClientStreamingServer[SensorData, ServerResponse]) error {
 	return status.Error(codes.Unimplemented, "method SendStream not implemented")
 }
+func (UnimplementedDataTransferServer) StreamWithFeedback(grpc.BidiStreamingServer[SensorData, ServerFeedback]) error {
+	return status.Error(codes.Unimplemented, "method StreamWithFeedback not implemented")
+}
+func (UnimplementedDataTransferServer) SendBatchStream(grpc.ClientStreamingServer[SensorBatch, ServerResponse]) error {
+	return status.Error(codes.Unimplemented, "method SendBatchStream not implemented")
+}
+func (UnimplementedDataTransferServer) Health(context.Context, *HealthRequest) (*HealthStatus, error) {
+	return nil, status.Error(codes.Unimplemented, "method Health not implemented")
+}
 func (UnimplementedDataTransferServer) mustEmbedUnimplementedDataTransferServer() {}
 func (UnimplementedDataTransferServer) testEmbeddedByValue()                      {}
 
@@ -102,19 +164,67 @@ func _DataTransfer_SendStream_Handler(srv interface{}, stream grpc.ServerStream)
 // This type alias is provided for backwards compatibility with existing code that references the prior non-generic stream type by name.
 type DataTransfer_SendStreamServer = grpc.ClientStreamingServer[SensorData, ServerResponse]
 
+func _DataTransfer_StreamWithFeedback_Handler(srv interface{}, stream grpc.ServerStream) error {
+	return srv.(DataTransferServer).StreamWithFeedback(&grpc.GenericServerStream[SensorData, ServerFeedback]{ServerStream: stream})
+}
+
+// This type alias is provided for backwards compatibility with existing code that references the prior non-generic stream type by name.
+type DataTransfer_StreamWithFeedbackServer = grpc.BidiStreamingServer[SensorData, ServerFeedback]
+
+func _DataTransfer_SendBatchStream_Handler(srv interface{}, stream grpc.ServerStream) error {
+	return srv.(DataTransferServer).SendBatchStream(&grpc.GenericServerStream[SensorBatch, ServerResponse]{ServerStream: stream})
+}
+
+// This type alias is provided for backwards compatibility with existing code that references the prior non-generic stream type by name.
+type DataTransfer_SendBatchStreamServer = grpc.ClientStreamingServer[SensorBatch, ServerResponse]
+
+func _DataTransfer_Health_Handler(srv interface{}, ctx context.Context, dec func(interface{}) error, interceptor grpc.UnaryServerInterceptor) (interface{}, error) {
+	in := new(HealthRequest)
+	if err := dec(in); err != nil {
+		return nil, err
+	}
+	if interceptor == nil {
+		return srv.(DataTransferServer).Health(ctx, in)
+	}
+	info := &grpc.UnaryServerInfo{
+		Server:     srv,
+		FullMethod: DataTransfer_Health_FullMethodName,
+	}
+	handler := func(ctx context.Context, req interface{}) (interface{}, error) {
+		return srv.(DataTransferServer).Health(ctx, req.(*HealthRequest))
+	}
+	return interceptor(ctx, in, info, handler)
+}
+
 // DataTransfer_ServiceDesc is the grpc.ServiceDesc for DataTransfer service.
 // It's only intended for direct use with grpc.RegisterService,
 // and not to be introspected or modified (even as a copy)
 var DataTransfer_ServiceDesc = grpc.ServiceDesc{
 	ServiceName: "iot.DataTransfer",
 	HandlerType: (*DataTransferServer)(nil),
-	Methods:     []grpc.MethodDesc{},
+	Methods: []grpc.MethodDesc{
+		{
+			MethodName: "Health",
+			Handler:    _DataTransfer_Health_Handler,
+		},
+	},
 	Streams: []grpc.StreamDesc{
 		{
 			StreamName:    "SendStream",
 			Handler:       _DataTransfer_SendStream_Handler,
 			ClientStreams: true,
 		},
+		{
+			StreamName:    "StreamWithFeedback",
+			Handler:       _DataTransfer_StreamWithFeedback_Handler,
+			ServerStreams: true,
+			ClientStreams: true,
+		},
+		{
+			StreamName:    "SendBatchStream",
+			Handler:       _DataTransfer_SendBatchStream_Handler,
+			ClientStreams: true,
+		},
 	},
 	Metadata: "proto/iot.proto",
 }
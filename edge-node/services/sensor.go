@@ -3,7 +3,9 @@ package services
 import (
 	"bytes"
 	"fmt"
+	"log/slog"
 	"math/rand"
+	"os"
 	"time"
 
 	"edge-node/config"
@@ -12,8 +14,18 @@ import (
 
 func GenerateDummyData(queue chan<- models.LocalData) {
 	sensorID := "Edge-Node-01"
+	// Beberapa edge node -> sensor_id berbeda (dasar sharding di router)
+	if id := os.Getenv("SENSOR_ID"); id != "" {
+		sensorID = id
+	}
+
+	// Seq naik untuk setiap reading, termasuk yang dibuang saat antrian penuh,
+	// sehingga reading yang hilang terlihat sebagai gap seq di central node
+	var seq, dropped uint64
 
 	for {
+		seq++
+
 		// Buat data dummy ~2KB
 		baseString := fmt.Sprintf(`{"id":"%s","temp":%.2f,"vibration":%.4f,"status":"OK"}`,
 			sensorID, rand.Float32()*100, rand.Float32()*10)
@@ -29,11 +41,16 @@ func GenerateDummyData(queue chan<- models.LocalData) {
 			Temp:     rand.Float32() * 100,
 			Time:     float64(time.Now().UnixNano()) / 1e9,
 			Payload:  buffer.Bytes(),
+			Seq:      seq,
 		}
 
 		select {
 		case queue <- newData:
 		default:
+			dropped++
+			if dropped == 1 || dropped%100 == 0 {
+				slog.Warn("Antrian penuh, reading dibuang", "seq", seq, "total_dibuang", dropped)
+			}
 		}
 
 		sensorDelay, _ := config.Current.GetValues()